@@ -1,6 +1,10 @@
 from flask import Flask, jsonify, request
 import psycopg2
+import psycopg2.extensions
 import os
+import select
+import threading
+import time
 from dotenv import load_dotenv
 from datetime import date
 
@@ -35,28 +39,112 @@ def home():
     return "API de Contexto de Eventos está online!"
 
 
-@app.route("/contexto_evento/<string:event_id>", methods=["GET"])
-def get_event_context(event_id):
-    """
-    Retorna os dados contextuais para um determinado ID de evento.
-    Exemplo: /contexto_evento/EDUARDO_COSTA_CUIABA_20250820
-    """
+# --- Cache das respostas de /contexto_evento ---
+# Respostas (já serializadas) ficam em memória por CONTEXT_CACHE_TTL segundos e são
+# invalidadas quando o data_ingestion/weather_ingestor.py grava dados do evento: ele
+# envia NOTIFY no canal abaixo e um thread deste processo escuta com LISTEN.
+CONTEXT_CACHE_TTL = int(os.getenv("CONTEXT_CACHE_TTL", 60))
+# Mesmo canal usado pelo data_ingestion/weather_ingestor.py
+EVENT_CONTEXT_CHANNEL = "event_context_changed"
+
+
+class ContextCache:
+    """Cache TTL por event_id: {"body", "etag", "last_modified"}, body None para 404."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Muda a cada invalidação: uma leitura do banco iniciada antes dela não é guardada
+        self.generation = 0
+
+    def get(self, event_id):
+        with self._lock:
+            entry = self._entries.get(event_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(event_id, None)
+                return None
+            return entry[1]
+
+    def set(self, event_id, value, generation):
+        with self._lock:
+            if generation == self.generation:
+                self._entries[event_id] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, event_id=None):
+        """Remove a entrada do evento (ou todas, com event_id None)."""
+        with self._lock:
+            self.generation += 1
+            if event_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(event_id, None)
+
+
+context_cache = ContextCache(CONTEXT_CACHE_TTL)
+_listener_thread = None
+_listener_lock = threading.Lock()
+
+
+def _listen_for_invalidations():
+    """LISTEN no canal de invalidação; reconecta em caso de erro."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(**DB_CONFIG)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {EVENT_CONTEXT_CHANNEL};")
+            # Notificações enviadas enquanto estávamos desconectados se perderam
+            context_cache.invalidate()
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    context_cache.invalidate(conn.notifies.pop(0).payload)
+        except Exception as e:
+            # Qualquer falha (banco, select em socket morto, ...) reconecta: se o
+            # thread morresse, a invalidação ficaria só por conta do TTL
+            print(f"Erro na escuta de invalidações do cache de contexto: {e}")
+            time.sleep(5)
+        finally:
+            if conn:
+                conn.close()
+
+
+def start_invalidation_listener():
+    """Inicia (uma vez por processo) o thread que escuta as invalidações."""
+    global _listener_thread
+    with _listener_lock:
+        if _listener_thread is None:
+            _listener_thread = threading.Thread(
+                target=_listen_for_invalidations,
+                name="event-context-listener",
+                daemon=True,
+            )
+            _listener_thread.start()
+
+
+def _load_event_context(event_id):
+    """Busca o dado contextual mais recente do evento e monta a entrada do cache."""
     conn = None
     cur = None
     try:
         conn = get_db_connection()
         if not conn:
-            return jsonify({"error": "Falha na conexão com o banco de dados."}), 500
+            return None
 
         cur = conn.cursor()
 
-        # Busca o dado contextual mais recente para o event_id
+        # Busca o dado contextual mais recente para o event_id (previsão diária; as
+        # linhas horárias WEATHER_FORECAST_HOURLY ficam de fora)
         # Ordena por data_retrieval_timestamp para pegar a informação mais fresca, se houver múltiplas
         cur.execute(
             """
-            SELECT context_data
+            SELECT id, data_retrieval_timestamp, context_data
             FROM event_context_data
-            WHERE event_id = %s
+            WHERE event_id = %s AND context_type = 'WEATHER_FORECAST_DAILY'
             ORDER BY data_retrieval_timestamp DESC
             LIMIT 1;
             """,
@@ -64,10 +152,50 @@ def get_event_context(event_id):
         )
 
         result = cur.fetchone()
+        if not result:
+            return {"body": None, "etag": None, "last_modified": None}
+
+        row_id, retrieved_at, context_data = result
+        # context_data é armazenado como JSONB, então psycopg2 o retorna como um dicionário Python
+        return {
+            "body": jsonify(context_data).get_data(),
+            "etag": f"{row_id}-{retrieved_at.timestamp()}",
+            "last_modified": retrieved_at,
+        }
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
 
-        if result:
-            # context_data é armazenado como JSONB, então psycopg2 o retorna como um dicionário Python
-            return jsonify(result[0]), 200
+
+@app.route("/contexto_evento/<string:event_id>", methods=["GET"])
+def get_event_context(event_id):
+    """
+    Retorna os dados contextuais para um determinado ID de evento.
+    Exemplo: /contexto_evento/EDUARDO_COSTA_CUIABA_20250820
+    """
+    start_invalidation_listener()
+    try:
+        entry = context_cache.get(event_id)
+        if entry is None:
+            generation = context_cache.generation
+            entry = _load_event_context(event_id)
+            if entry is None:
+                return (
+                    jsonify({"error": "Falha na conexão com o banco de dados."}),
+                    500,
+                )
+            context_cache.set(event_id, entry, generation)
+
+        if entry["body"] is not None:
+            response = app.response_class(entry["body"], mimetype="application/json")
+            response.set_etag(entry["etag"])
+            response.last_modified = entry["last_modified"]
+            # O cliente pode guardar a resposta, mas deve revalidá-la a cada uso
+            response.cache_control.no_cache = True
+            # If-None-Match / If-Modified-Since: 304 sem corpo se nada mudou
+            return response.make_conditional(request)
         else:
             return (
                 jsonify(
@@ -84,11 +212,6 @@ def get_event_context(event_id):
     except Exception as e:
         print(f"Erro inesperado: {e}")
         return jsonify({"error": "Erro interno inesperado."}), 500
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
 
 
 # Esta parte só é executada se você rodar o script Python diretamente,
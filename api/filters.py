@@ -0,0 +1,97 @@
+# api/filters.py
+"""
+Filtros da listagem de WeatherRecord (/api/weather-records/).
+
+Parâmetros aceitos (todos opcionais e combináveis):
+
+    location          event_location exato
+    date_from/date_to intervalo de event_date (AAAA-MM-DD, inclusive)
+    event_id_prefix   event_id começando com o valor
+    api_source        api_source exato
+    latest=true       apenas a versão mais recente de cada (evento, localização, data)
+
+Cada filtro é atendido por um índice declarado em weather_data/models.py. O modo
+latest é uma anti-junção (NOT EXISTS de uma versão maior) sobre a restrição única
+(event_id, event_location, event_date, load_version): cada linha candidata custa uma
+busca no índice e a ordenação da paginação por cursor é preservada.
+"""
+import datetime
+
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Data inválida. Use o formato AAAA-MM-DD."})
+
+
+def latest_versions_only(queryset):
+    """Restringe o queryset de WeatherRecord à maior load_version de cada chave."""
+    newer = queryset.model.objects.filter(
+        event_id=OuterRef("event_id"),
+        event_location=OuterRef("event_location"),
+        event_date=OuterRef("event_date"),
+        load_version__gt=OuterRef("load_version"),
+    )
+    return queryset.filter(~Exists(newer))
+
+
+class WeatherRecordFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        location = params.get("location")
+        if location:
+            queryset = queryset.filter(event_location=location)
+
+        date_from = _parse_date(params, "date_from")
+        date_to = _parse_date(params, "date_to")
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError(
+                {"date_to": "date_to deve ser igual ou posterior a date_from."}
+            )
+        if date_from:
+            queryset = queryset.filter(event_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(event_date__lte=date_to)
+
+        event_id_prefix = params.get("event_id_prefix")
+        if event_id_prefix:
+            queryset = queryset.filter(event_id__startswith=event_id_prefix)
+
+        api_source = params.get("api_source")
+        if api_source:
+            queryset = queryset.filter(api_source=api_source)
+
+        if params.get("latest", "").lower() in TRUE_VALUES:
+            queryset = latest_versions_only(queryset)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        descriptions = {
+            "location": "Localização do evento (event_location exato).",
+            "date_from": "Primeira data do evento (AAAA-MM-DD).",
+            "date_to": "Última data do evento (AAAA-MM-DD).",
+            "event_id_prefix": "Prefixo do event_id.",
+            "api_source": "Fonte da previsão (api_source exato).",
+            "latest": "true para retornar apenas a versão mais recente de cada evento.",
+        }
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": "string"},
+            }
+            for name, description in descriptions.items()
+        ]
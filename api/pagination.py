@@ -0,0 +1,147 @@
+# api/pagination.py
+"""
+Paginação por cursor (keyset) da listagem de WeatherRecord.
+
+Em vez de OFFSET, cada página começa logo depois da última linha da página anterior
+com a comparação de tupla (event_date, event_id, load_version, id) > (...), atendida
+pelo índice composto nas mesmas colunas. Assim uma página profunda custa o mesmo que
+a primeira e a resposta nunca passa de page_size linhas. O cursor é opaco (base64 da
+chave da linha de referência e do sentido da navegação).
+"""
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from decouple import config
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    # Ordenação estável: o id desempata linhas com a mesma chave
+    ordering = ("event_date", "event_id", "load_version", "id")
+    cursor_query_param = "cursor"
+    # Tamanho padrão da página; o cliente pode pedir ?page_size= até max_page_size
+    page_size = config("API_PAGE_SIZE", default=100, cast=int)
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(request)
+
+        if position is not None:
+            queryset = queryset.filter(self._after(queryset.model, position))
+        order = [f"-{field}" if self.reverse else field for field in self.ordering]
+        rows = list(queryset.order_by(*order)[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if self.reverse:
+            rows.reverse()
+
+        # Vindo de um cursor, há linhas do outro lado da posição de referência
+        self.has_next = position is not None if self.reverse else has_more
+        self.has_previous = has_more if self.reverse else position is not None
+        self.first_key = self._key(rows[0]) if rows else position
+        self.last_key = self._key(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        page_size = self.page_size
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_key, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_key, reverse=True)
+
+    def encode_cursor(self, key, reverse):
+        payload = {"k": [self._dump(value) for value in key]}
+        if reverse:
+            payload["r"] = 1
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Retorna (chave da linha de referência ou None, navegação para trás)."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            event_date, event_id, load_version, record_id = payload["k"]
+            key = (
+                datetime.date.fromisoformat(event_date),
+                str(event_id),
+                int(load_version),
+                int(record_id),
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return key, bool(payload.get("r"))
+
+    def _after(self, model, position):
+        """Condição (colunas da ordenação) > posição (ou < navegando para trás)."""
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            f"{table}.{connection.ops.quote_name(model._meta.get_field(field).column)}"
+            for field in self.ordering
+        )
+        placeholders = ", ".join(["%s"] * len(self.ordering))
+        operator = "<" if self.reverse else ">"
+        return RawSQL(
+            f"({columns}) {operator} ({placeholders})",
+            position,
+            output_field=BooleanField(),
+        )
+
+    def _key(self, record):
+        return tuple(getattr(record, field) for field in self.ordering)
+
+    @staticmethod
+    def _dump(value):
+        return value.isoformat() if isinstance(value, datetime.date) else value
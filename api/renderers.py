@@ -0,0 +1,97 @@
+# api/renderers.py
+import csv
+import datetime
+import io
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderizador JSON com orjson. Datas, datetimes (UTC com sufixo "Z", como o
+    JSONRenderer do DRF) e floats são codificados em C; demais tipos (Decimal,
+    textos traduzíveis, ...) passam pelo codificador do DRF.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_UTC_Z
+
+    _fallback_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        option = self.options
+        # Accept: application/json; indent=N (usado pela API navegável)
+        if accepted_media_type and "indent=" in accepted_media_type:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self._fallback_encoder.default, option=option)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Um objeto JSON por linha (application/x-ndjson), usado na exportação."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(self.iter_render(data if isinstance(data, list) else [data]))
+
+    def iter_render(self, items, fields=None, batch_size=1000):
+        """Gera o conteúdo em blocos de `batch_size` linhas (para StreamingHttpResponse)."""
+        default = ORJSONRenderer._fallback_encoder.default
+        batch = []
+        for item in items:
+            batch.append(orjson.dumps(item, default=default, option=self.options))
+            if len(batch) >= batch_size:
+                yield b"".join(batch)
+                batch = []
+        if batch:
+            yield b"".join(batch)
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV com cabeçalho (text/csv), usado na exportação."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        fields = list(items[0]) if items else []
+        return b"".join(self.iter_render(items, fields))
+
+    def iter_render(self, items, fields=None, batch_size=1000):
+        """Gera o cabeçalho e as linhas em blocos de `batch_size` (para StreamingHttpResponse)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        count = 0
+        for item in items:
+            writer.writerow([_csv_value(item.get(name)) for name in fields])
+            count += 1
+            if count % batch_size == 0:
+                yield buffer.getvalue().encode(self.charset)
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode(self.charset)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    return value
@@ -1,4 +1,6 @@
 # api/serializers.py
+from django.db import models
+from django.db.models.functions import Cast
 from rest_framework import serializers
 from weather_data.models import WeatherRecord  # Importa o modelo WeatherRecord
 
@@ -14,3 +16,57 @@ class WeatherRecordSerializer(serializers.ModelSerializer):
         # Inclui todos os campos do modelo WeatherRecord na serialização.
         # Alternativamente, pode listar campos específicos: fields = ['event_id', 'event_name', ...]
         fields = "__all__"
+
+
+class FastRecordSerializer:
+    """
+    Serialização somente leitura sem instanciar o modelo: as linhas vêm de
+    values_list() e os campos Decimal são convertidos para texto pelo próprio banco
+    (CAST de numeric mantém as casas decimais: "80.00"), então não há objetos
+    Decimal nem conversão campo a campo em Python. Datas e datetimes ficam como
+    objetos e são codificados pelo renderizador (api.renderers.ORJSONRenderer). O
+    JSON gerado é o mesmo do ModelSerializer, com os decimais como strings.
+    """
+
+    def __init__(self, model, fields=None):
+        concrete_fields = model._meta.concrete_fields
+        self.fields = fields or [field.attname for field in concrete_fields]
+        decimal_fields = {
+            field.attname
+            for field in concrete_fields
+            if isinstance(field, models.DecimalField)
+        }
+        self._annotations = {
+            f"{name}_text": Cast(name, models.TextField())
+            for name in self.fields
+            if name in decimal_fields
+        }
+        self._columns = [
+            f"{name}_text" if name in decimal_fields else name for name in self.fields
+        ]
+
+    def rows(self, queryset):
+        """Linhas do queryset como namedtuples (atributos acessíveis pela paginação)."""
+        return queryset.annotate(**self._annotations).values_list(
+            *self._columns, named=True
+        )
+
+    def to_representation(self, rows):
+        names = self.fields
+        return [dict(zip(names, row)) for row in rows]
+
+
+_LATEST_RECORD_SERIALIZER = FastRecordSerializer(WeatherRecord)
+
+
+def load_latest_record(event_id):
+    """
+    Registro mais recente do evento, serializado pelo caminho rápido (ou None).
+    Carregador usado com weather_data.context_cache.get_event_context.
+    """
+    records = _LATEST_RECORD_SERIALIZER.to_representation(
+        _LATEST_RECORD_SERIALIZER.rows(
+            WeatherRecord.objects.filter(event_id=event_id).order_by("-loaded_at")
+        )[:1]
+    )
+    return records[0] if records else None
@@ -1,52 +1,153 @@
 # api/views.py
+from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from weather_data.context_cache import get_event_context
 from weather_data.models import WeatherRecord  # Importa o modelo WeatherRecord
-from .serializers import WeatherRecordSerializer  # Importa o serializador
+from .filters import WeatherRecordFilterBackend
+from .pagination import KeysetPagination
+from .renderers import CSVRenderer, NDJSONRenderer, ORJSONRenderer
+from .serializers import (
+    FastRecordSerializer,
+    WeatherRecordSerializer,
+    load_latest_record,
+)  # Importa os serializadores
 import re  # Já usado para sanitização
 import logging  # Para logging
 
 logger = logging.getLogger(__name__)
 
 
+class FastReadMixin:
+    """
+    Caminho rápido de leitura para ViewSets: com `fast_serializer` definido,
+    list e retrieve usam FastRecordSerializer (values_list, sem instâncias do
+    modelo) em vez de serializer_class. Filtros e paginação continuam valendo.
+    """
+
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.fast_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.fast_serializer.to_representation(page)
+            )
+        return Response(self.fast_serializer.to_representation(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.fast_serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # Mesmo tratamento do get_object_or_404 do DRF (ex.: /abc/ para um id inteiro)
+            raise Http404
+        data = self.fast_serializer.to_representation(
+            self.fast_serializer.rows(queryset)[:1]
+        )
+        if not data:
+            raise Http404
+        return Response(data[0])
+
+
+_FAST_RECORD_SERIALIZER = FastRecordSerializer(WeatherRecord)
+
+
 # ViewSet para listar e recuperar registos de dados meteorológicos.
-class WeatherRecordViewSet(viewsets.ReadOnlyModelViewSet):
+class WeatherRecordViewSet(FastReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     Um ViewSet que fornece automaticamente ações de 'list' e 'retrieve'.
     Utiliza ReadOnlyModelViewSet porque a API é apenas para leitura destes registos.
     """
 
     queryset = WeatherRecord.objects.all().order_by(
-        "event_date", "event_id"
+        "event_date", "event_id", "load_version", "id"
     )  # Consulta base para todos os registos
     serializer_class = WeatherRecordSerializer  # O serializador a ser usado
+    # Paginação por cursor sobre a mesma ordenação (índice composto no modelo)
+    pagination_class = KeysetPagination
+    # ?location=, ?date_from=, ?date_to=, ?event_id_prefix=, ?api_source=, ?latest=true
+    filter_backends = [WeatherRecordFilterBackend]
+    # Leitura rápida (values_list + orjson); serializer_class fica para o schema
+    fast_serializer = _FAST_RECORD_SERIALIZER
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    # Linhas lidas por vez do cursor do servidor na exportação
+    export_chunk_size = 2000
 
-    # Opcional: Pode adicionar filtros ou lógica personalizada aqui, se necessário.
-    # Exemplo: def get_queryset(self): return WeatherRecord.objects.filter(event_location='São Paulo')
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Exporta todos os registros filtrados (mesmos filtros da listagem, sem
+        paginação) em NDJSON (padrão) ou CSV (?format=csv ou Accept: text/csv).
+        A resposta é gerada aos poucos a partir de um cursor do servidor, então a
+        memória do worker não cresce com o número de linhas.
+        """
+        serializer = _FAST_RECORD_SERIALIZER
+        rows = serializer.rows(self.filter_queryset(self.get_queryset())).iterator(
+            chunk_size=self.export_chunk_size
+        )
+        fields = serializer.fields
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        response = StreamingHttpResponse(
+            renderer.iter_render(
+                (dict(zip(fields, row)) for row in rows),
+                fields,
+                batch_size=self.export_chunk_size,
+            ),
+            content_type=content_type,
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="weather_records.{renderer.format}"'
+        return response
 
 
 # Esta é a view existente para o contexto de um único evento.
 @api_view(["GET"])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
 def event_context_api_view(request, event_id):
     """
     Endpoint REST para obter dados contextuais de um evento específico pelo seu ID.
     """
     try:
         # Tenta encontrar o registo mais recente para o event_id fornecido
-        weather_record = (
-            WeatherRecord.objects.filter(event_id=event_id)
-            .order_by("-loaded_at")
-            .first()
-        )
+        # Registro em cache até a próxima versão do evento (weather_data.context_cache)
+        context = get_event_context(event_id, load_latest_record)
 
-        if weather_record:
-            # Serializa o objeto WeatherRecord para JSON
-            serializer = WeatherRecordSerializer(weather_record)
+        if context["data"]:
+            last_modified = int(context["last_modified"].timestamp())
+            # If-None-Match / If-Modified-Since: 304 sem corpo se nada mudou
+            not_modified = get_conditional_response(
+                request, etag=context["etag"], last_modified=last_modified
+            )
+            response = not_modified or Response(context["data"])
+            response["ETag"] = context["etag"]
+            response["Last-Modified"] = http_date(last_modified)
+            # O cliente pode guardar a resposta, mas deve revalidá-la a cada uso
+            response["Cache-Control"] = "no-cache"
             logger.info(
                 f"Dados do evento ID '{event_id}' encontrados e retornados via API."
             )
-            return Response(serializer.data)
+            return response
         else:
             logger.warning(
                 f"Dados do evento ID '{event_id}' não encontrados na base de dados."
@@ -0,0 +1,531 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark da ingestão contra o servidor stub local (benchmarks/stub_server.py).
+
+Cenários:
+- single: `manage.py ingest_weather` por evento (--city/--date/...), um processo por
+  evento, incluindo o custo de inicialização do Python e do Django.
+- batch: `manage.py ingest_weather --from-file`.
+- persist_data: Open-Meteo uma localização por vez + persist_data (data_ingestion).
+- persist_data_bulk: Open-Meteo em lote + persist_data_bulk.
+
+Cada cenário roda em um subprocesso próprio (para que o pico de RSS seja só dele),
+com um diretório de cache de previsões vazio (um cenário não reaproveita as respostas
+guardadas por outro), e informa registros/s, latência por registro (p50/p99), idas
+ao banco e pico de RSS.
+A latência de um registro é o tempo até ele estar gravado: por chamada nos cenários
+single e persist_data, e até o commit do bloco que o contém nos cenários em lote.
+Idas ao banco contam os comandos SQL enviados (commits não entram na conta),
+incluindo os INSERTs em lote que o LoadLogSink faz no seu próprio thread.
+
+Os resultados são salvos em JSON (benchmarks/results/ por padrão) para comparar
+execuções. Usa o banco configurado no .env; as linhas criadas (event_id BENCH_*)
+são apagadas ao final de cada cenário.
+
+    python benchmarks/run_benchmarks.py --events 300 --cities 30 --latency-ms 50
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+SCENARIOS = ["single", "batch", "persist_data", "persist_data_bulk"]
+EVENT_PREFIX = "BENCH_"
+BENCH_SOURCE = "Benchmark"
+
+
+def percentile(values, fraction):
+    """Percentil por interpolação linear (values não precisa estar ordenado)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def bench_events(count, cities):
+    """Eventos sintéticos distribuídos entre `cities` cidades e os 3 dias da janela."""
+    today = datetime.date.today()
+    return [
+        {
+            "event_id": f"{EVENT_PREFIX}{index:06d}",
+            "event_name": f"Benchmark {index}",
+            "city": f"Bench City {index % cities:03d}",
+            "event_date": today + datetime.timedelta(days=index % 3),
+        }
+        for index in range(count)
+    ]
+
+
+def bench_coordinates(cities):
+    return [(-30 + index * 0.25, -60 + index * 0.25) for index in range(cities)]
+
+
+# --- Cenários (executados no subprocesso) ---
+
+
+def _setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
+    import django
+
+    django.setup()
+
+
+def _cleanup_django():
+    from weather_data.models import (
+        IngestionJob,
+        Location,
+        WeatherLoadLog,
+        WeatherRecord,
+    )
+
+    WeatherRecord.objects.filter(event_id__startswith=EVENT_PREFIX).delete()
+    WeatherLoadLog.objects.filter(event_id__startswith=EVENT_PREFIX).delete()
+    IngestionJob.objects.filter(event_location__startswith="Bench City").delete()
+    # Os aliases são removidos em cascata
+    Location.objects.filter(name__startswith="Bench City").delete()
+
+
+def _log_sink_writes(sink):
+    """
+    INSERTs em lote feitos pelo thread do LoadLogSink, que usa a própria conexão e
+    não aparece no CaptureQueriesContext. Sem buffer, a gravação acontece na
+    conexão do chamador e já é contada.
+    """
+    return sink.stats()["writes"] if sink.buffered else 0
+
+
+def _ingest_single_event(event, result_file):
+    """
+    Executa `ingest_weather` para um evento em um processo novo (cenário single) e
+    grava em result_file as idas ao banco do processo.
+    """
+    _setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from weather_data.log_sink import get_default_log_sink
+
+    output = io.StringIO()
+    sink = get_default_log_sink()
+    with CaptureQueriesContext(connection) as queries:
+        call_command(
+            "ingest_weather",
+            city=event["city"],
+            date=event["event_date"],
+            event_id=event["event_id"],
+            event_name=event["event_name"],
+            stdout=output,
+            stderr=output,
+        )
+        sink.flush()
+    db_round_trips = len(queries.captured_queries) + _log_sink_writes(sink)
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump({"db_round_trips": db_round_trips}, f)
+
+
+def _run_single_event_process(event):
+    """Roda _ingest_single_event em um subprocesso; retorna as idas ao banco ou None."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        pass
+    try:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--ingest-event",
+                json.dumps(dict(event, event_date=event["event_date"].isoformat())),
+                "--result-file",
+                result_file.name,
+            ],
+            cwd=REPO_ROOT,
+            capture_output=True,
+        )
+        if completed.returncode != 0:
+            return None
+        with open(result_file.name, encoding="utf-8") as f:
+            return json.load(f)["db_round_trips"]
+    finally:
+        os.unlink(result_file.name)
+
+
+def _run_django_scenario(scenario, options):
+    _setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    import weather_data.management.commands.ingest_weather as ingest_weather
+    from weather_data.log_sink import get_default_log_sink
+
+    _cleanup_django()
+    events = bench_events(options["events"], options["cities"])
+    latencies = []
+    failed = 0
+    child_round_trips = 0
+    output = io.StringIO()
+    sink = get_default_log_sink()
+    sink_writes_before = _log_sink_writes(sink)
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        if scenario == "single":
+            # Um processo por evento, como um cron/script chamando manage.py
+            for event in events:
+                call_started = time.perf_counter()
+                round_trips = _run_single_event_process(event)
+                latencies.append(time.perf_counter() - call_started)
+                if round_trips is None:
+                    failed += 1
+                else:
+                    child_round_trips += round_trips
+        else:
+            # Registra o instante do commit de cada bloco gravado pelo comando
+            persist_forecasts = ingest_weather.persist_forecasts
+
+            def timed_persist_forecasts(results, *args, **kwargs):
+                outcomes = persist_forecasts(results, *args, **kwargs)
+                committed_at = time.perf_counter() - started
+                latencies.extend(committed_at for _ in outcomes)
+                return outcomes
+
+            ingest_weather.persist_forecasts = timed_persist_forecasts
+            with tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False, newline=""
+            ) as events_file:
+                writer = csv.writer(events_file)
+                writer.writerow(["event_id", "event_name", "city", "date"])
+                for event in events:
+                    writer.writerow(
+                        [
+                            event["event_id"],
+                            event["event_name"],
+                            event["city"],
+                            event["event_date"].isoformat(),
+                        ]
+                    )
+            try:
+                call_command(
+                    "ingest_weather",
+                    from_file=events_file.name,
+                    workers=options["workers"],
+                    stdout=output,
+                    stderr=output,
+                )
+            finally:
+                os.unlink(events_file.name)
+                ingest_weather.persist_forecasts = persist_forecasts
+        # Inclui a gravação dos logs de carga que ainda estão no buffer
+        sink.flush()
+        elapsed = time.perf_counter() - started
+
+    from weather_data.models import WeatherRecord
+
+    imported = WeatherRecord.objects.filter(event_id__startswith=EVENT_PREFIX).count()
+    failed = max(failed, len(events) - imported)
+    _cleanup_django()
+    db_round_trips = (
+        len(queries.captured_queries)
+        + _log_sink_writes(sink)
+        - sink_writes_before
+        + child_round_trips
+    )
+    return imported, failed, elapsed, latencies, db_round_trips
+
+
+def _run_openmeteo_scenario(scenario, options):
+    import psycopg2.extensions
+
+    from data_ingestion import weather_ingestor
+
+    statements = 0
+
+    class CountingCursor(psycopg2.extensions.cursor):
+        def execute(self, query, vars=None):
+            nonlocal statements
+            statements += 1
+            return super().execute(query, vars)
+
+        def executemany(self, query, vars_list):
+            nonlocal statements
+            statements += 1
+            return super().executemany(query, vars_list)
+
+    pool = weather_ingestor.get_db_pool()
+    getconn = pool.getconn
+
+    def counting_getconn(*args, **kwargs):
+        conn = getconn(*args, **kwargs)
+        conn.cursor_factory = CountingCursor
+        return conn
+
+    pool.getconn = counting_getconn
+
+    def cleanup():
+        conn = getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM event_context_data WHERE event_id LIKE %s",
+                    (EVENT_PREFIX + "%",),
+                )
+                cur.execute(
+                    "DELETE FROM data_load_log WHERE source_name = %s",
+                    (BENCH_SOURCE,),
+                )
+            conn.commit()
+        finally:
+            pool.putconn(conn)
+
+    cleanup()
+    statements = 0
+    coordinates = bench_coordinates(options["cities"])
+    start_date = datetime.date.today()
+    end_date = start_date + datetime.timedelta(days=options["days"] - 1)
+    event_ids = [f"{EVENT_PREFIX}{index:06d}" for index in range(len(coordinates))]
+    latencies = []
+    imported = 0
+    failed = 0
+    quiet = io.StringIO()
+
+    started = time.perf_counter()
+    if scenario == "persist_data":
+        target_date_str = start_date.strftime("%d/%m/%Y")
+        for (lat, lon), event_id in zip(coordinates, event_ids):
+            call_started = time.perf_counter()
+            with contextlib.redirect_stdout(quiet):
+                raw = weather_ingestor.fetch_openmeteo_weather_data(
+                    lat, lon, start_date, end_date
+                )
+                normalized = weather_ingestor.normalize_openmeteo_daily_data(
+                    raw, target_date_str
+                )
+                ok = weather_ingestor.persist_data(
+                    normalized, event_id, source_name=BENCH_SOURCE
+                )
+            latencies.append(time.perf_counter() - call_started)
+            if ok:
+                imported += 1
+            else:
+                failed += 1
+    else:
+        with contextlib.redirect_stdout(quiet):
+            raw_results = weather_ingestor.fetch_openmeteo_weather_data_batch(
+                coordinates, start_date, end_date
+            )
+            count = weather_ingestor.persist_data_bulk(
+                weather_ingestor.normalize_openmeteo_daily_rows(raw_results, event_ids),
+                source_name=BENCH_SOURCE,
+            )
+        committed_at = time.perf_counter() - started
+        imported = count or 0
+        failed = len(coordinates) * options["days"] - imported
+        latencies = [committed_at] * imported
+    elapsed = time.perf_counter() - started
+    db_round_trips = statements
+
+    cleanup()
+    return imported, failed, elapsed, latencies, db_round_trips
+
+
+def run_scenario(scenario, options):
+    if scenario in ("single", "batch"):
+        imported, failed, elapsed, latencies, db_round_trips = _run_django_scenario(
+            scenario, options
+        )
+    else:
+        imported, failed, elapsed, latencies, db_round_trips = _run_openmeteo_scenario(
+            scenario, options
+        )
+    p50 = percentile(latencies, 0.50)
+    p99 = percentile(latencies, 0.99)
+    return {
+        "scenario": scenario,
+        "records": imported,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 4),
+        "records_per_s": round(imported / elapsed, 2) if elapsed > 0 else None,
+        "latency_p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+        "latency_p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        "db_round_trips": db_round_trips,
+        # ru_maxrss é informado em KB no Linux; no cenário single vale o maior
+        # processo por evento
+        "peak_rss_mb": round(
+            max(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+            )
+            / 1024,
+            1,
+        ),
+    }
+
+
+# --- Processo principal ---
+
+
+def _child_environment(stub_url, state_dir, scenario):
+    env = dict(os.environ)
+    env.update(
+        {
+            "WEATHER_API_BASE_URL": f"{stub_url}/v1",
+            "OPENMETEO_BASE_URL": f"{stub_url}/v1/forecast",
+            # Os limitadores e o cache não podem interferir na medição nem nos
+            # contadores reais: diretórios próprios e limites altos. O cache de
+            # previsões começa vazio em cada cenário
+            "RATE_LIMIT_DIR": os.path.join(state_dir, "rate_limits"),
+            "WEATHER_CACHE_LOCATION": os.path.join(
+                state_dir, "forecast_cache", scenario
+            ),
+            "WEATHER_API_RATE_LIMIT_PER_MINUTE": "1000000",
+            "WEATHER_API_RATE_LIMIT_BURST": "100000",
+            "OPENMETEO_RATE_LIMIT_PER_MINUTE": "1000000",
+            "OPENMETEO_RATE_LIMIT_BURST": "100000",
+        }
+    )
+    env.setdefault("WEATHER_API_KEY", "benchmark")
+    return env
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark da ingestão contra um servidor stub local."
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)}).",
+    )
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument(
+        "--days", type=int, default=3, help="Dias por localização (Open-Meteo)."
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--hours", type=int, default=24, help="Entradas horárias por dia no payload."
+    )
+    parser.add_argument("--output", help="Arquivo JSON de saída.")
+    # Uso interno: execução de um cenário no subprocesso
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--ingest-event", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    options = vars(args)
+
+    if args.ingest_event:
+        _ingest_single_event(json.loads(args.ingest_event), args.result_file)
+        return
+
+    if args.child:
+        result = run_scenario(args.child, options)
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    from benchmarks.stub_server import StubWeatherServer
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(unknown)}")
+
+    results = []
+    with StubWeatherServer(
+        latency_ms=args.latency_ms, error_rate=args.error_rate, hours=args.hours
+    ) as stub, tempfile.TemporaryDirectory() as state_dir:
+        for scenario in scenarios:
+            result_file = os.path.join(state_dir, f"{scenario}.json")
+            command = [sys.executable, os.path.abspath(__file__), "--child", scenario]
+            command += ["--result-file", result_file]
+            for name in ("events", "cities", "days", "workers"):
+                command += [f"--{name}", str(options[name])]
+            requests_before = stub.request_count
+            completed = subprocess.run(
+                command,
+                cwd=REPO_ROOT,
+                env=_child_environment(stub.url, state_dir, scenario),
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                print(f"{scenario}: falhou\n{completed.stderr}", file=sys.stderr)
+                continue
+            with open(result_file, encoding="utf-8") as f:
+                result = json.load(f)
+            result["http_requests"] = stub.request_count - requests_before
+            results.append(result)
+            print(
+                f"{scenario:18} {result['records']:6d} registros  "
+                f"{result['records_per_s'] or 0:9.1f} reg/s  "
+                f"p50 {result['latency_p50_ms'] or 0:8.1f} ms  "
+                f"p99 {result['latency_p99_ms'] or 0:8.1f} ms  "
+                f"{result['db_round_trips']:6d} idas ao banco  "
+                f"{result['http_requests']:5d} req HTTP  "
+                f"RSS {result['peak_rss_mb']:.1f} MB"
+            )
+        stub_errors = stub.error_count
+
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    output = args.output or os.path.join(
+        REPO_ROOT,
+        "benchmarks",
+        "results",
+        f"bench-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "created_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            name: options[name]
+            for name in (
+                "events",
+                "cities",
+                "days",
+                "workers",
+                "latency_ms",
+                "error_rate",
+                "hours",
+            )
+        },
+        "stub_errors": stub_errors,
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
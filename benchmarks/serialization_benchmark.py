@@ -0,0 +1,203 @@
+# benchmarks/serialization_benchmark.py
+"""
+Benchmark da leitura de /api/weather-records/: serializador do DRF
+(ModelSerializer + JSONRenderer) contra o caminho rápido (FastRecordSerializer +
+ORJSONRenderer).
+
+Grava --rows registros sintéticos (event_id BENCH_*, apagados ao final) e mede, para
+cada caminho, linhas/s em dois cenários (mediana de --repeat execuções), depois de
+conferir que os dois geram o mesmo JSON:
+- serialize: queryset inteiro serializado e renderizado em JSON;
+- endpoint: a listagem percorrida página a página (--page-size), com filtros e
+  paginação por cursor, como um cliente faria.
+
+Os resultados são salvos em JSON (benchmarks/results/ por padrão).
+
+    python benchmarks/serialization_benchmark.py --rows 20000 --page-size 1000
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+from benchmarks.run_benchmarks import EVENT_PREFIX, _git_commit, _setup_django
+
+
+def _create_records(count):
+    from decimal import Decimal
+
+    from weather_data.models import WeatherRecord
+
+    today = datetime.date.today()
+    WeatherRecord.objects.bulk_create(
+        [
+            WeatherRecord(
+                event_id=f"{EVENT_PREFIX}{index:06d}",
+                event_name=f"Benchmark {index}",
+                event_location=f"Bench City {index % 50:03d}",
+                event_date=today + datetime.timedelta(days=index % 90),
+                temperature=Decimal("21.35"),
+                feels_like=Decimal("22.10"),
+                min_temperature=Decimal("17.80"),
+                max_temperature=Decimal("26.40"),
+                humidity=Decimal("81.00"),
+                pressure=Decimal("1013.25"),
+                wind_speed=Decimal("4.70"),
+                weather_main="Rain",
+                weather_description="Chuva moderada",
+                api_source="Benchmark",
+                content_hash="0" * 64,
+            )
+            for index in range(count)
+        ],
+        batch_size=2000,
+    )
+
+
+def _serialize_drf(queryset):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import WeatherRecordSerializer
+
+    data = WeatherRecordSerializer(queryset, many=True).data
+    return JSONRenderer().render(data)
+
+
+def _serialize_fast(queryset):
+    from api.renderers import ORJSONRenderer
+    from api.serializers import FastRecordSerializer
+    from weather_data.models import WeatherRecord
+
+    serializer = FastRecordSerializer(WeatherRecord)
+    return ORJSONRenderer().render(
+        serializer.to_representation(serializer.rows(queryset))
+    )
+
+
+def _endpoint_views():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.views import WeatherRecordViewSet
+
+    return {
+        "drf": WeatherRecordViewSet.as_view(
+            {"get": "list"}, fast_serializer=None, renderer_classes=[JSONRenderer]
+        ),
+        "fast": WeatherRecordViewSet.as_view({"get": "list"}),
+    }
+
+
+def _walk_endpoint(view, page_size):
+    """Percorre todas as páginas da listagem; retorna o número de linhas lidas."""
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    params = {"event_id_prefix": EVENT_PREFIX, "page_size": page_size}
+    rows = 0
+    while True:
+        response = view(factory.get("/api/weather-records/", params))
+        response.render()
+        body = json.loads(response.content)
+        rows += len(body["results"])
+        if not body["next"]:
+            return rows
+        params = {
+            name: values[0]
+            for name, values in parse_qs(urlsplit(body["next"]).query).items()
+        }
+
+
+def _measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = function()
+        timings.append(time.perf_counter() - started)
+    elapsed = statistics.median(timings)
+    return {
+        "rows": rows,
+        "elapsed_s": round(elapsed, 4),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark da serialização de /api/weather-records/."
+    )
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Arquivo JSON de saída.")
+    args = parser.parse_args()
+
+    _setup_django()
+    from weather_data.models import WeatherRecord
+
+    WeatherRecord.objects.filter(event_id__startswith=EVENT_PREFIX).delete()
+    _create_records(args.rows)
+    try:
+        queryset = WeatherRecord.objects.filter(
+            event_id__startswith=EVENT_PREFIX
+        ).order_by("event_date", "event_id", "load_version", "id")
+        if _serialize_drf(queryset) != _serialize_fast(queryset):
+            sys.exit("O caminho rápido não gera o mesmo JSON do DRF.")
+        views = _endpoint_views()
+        measurements = {
+            ("serialize", "drf"): lambda: len(json.loads(_serialize_drf(queryset))),
+            ("serialize", "fast"): lambda: len(json.loads(_serialize_fast(queryset))),
+            ("endpoint", "drf"): lambda: _walk_endpoint(views["drf"], args.page_size),
+            ("endpoint", "fast"): lambda: _walk_endpoint(views["fast"], args.page_size),
+        }
+        results = []
+        for (scenario, path), function in measurements.items():
+            result = dict(_measure(function, args.repeat), scenario=scenario, path=path)
+            results.append(result)
+            print(
+                f"{scenario:10} {path:5} {result['rows']:7d} linhas  "
+                f"{result['elapsed_s']:8.3f} s  {result['rows_per_s'] or 0:10.1f} linhas/s"
+            )
+        for scenario in ("serialize", "endpoint"):
+            drf, fast = (
+                next(r for r in results if r["scenario"] == scenario and r["path"] == p)
+                for p in ("drf", "fast")
+            )
+            print(
+                f"{scenario}: {drf['elapsed_s'] / fast['elapsed_s']:.1f}x mais rápido"
+            )
+    finally:
+        WeatherRecord.objects.filter(event_id__startswith=EVENT_PREFIX).delete()
+
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    output = args.output or os.path.join(
+        REPO_ROOT,
+        "benchmarks",
+        "results",
+        f"serialization-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "created_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "rows": args.rows,
+            "page_size": args.page_size,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# benchmarks/stub_server.py
+"""
+Servidor HTTP local que imita as APIs de clima usadas pela ingestão, para medir o
+throughput sem consumir a cota real.
+
+Rotas:
+- /v1/forecast.json e /v1/search.json: formato da WeatherAPI.com (WEATHER_API_BASE_URL
+  deve apontar para <url>/v1).
+- /v1/forecast: formato da Open-Meteo, inclusive listas de coordenadas separadas por
+  vírgula (OPENMETEO_BASE_URL deve apontar para <url>/v1/forecast).
+
+Latência, taxa de erro (respostas 503) e tamanho do payload (entradas horárias por
+dia) são configuráveis. Pode ser usado sozinho:
+
+    python benchmarks/stub_server.py --port 8765 --latency-ms 50 --error-rate 0.01
+"""
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _stable_coordinate(text, span):
+    """Coordenada determinística (e distinta por texto) para resultados de search.json."""
+    return round(
+        (zlib.crc32(text.encode("utf-8")) % 100000) / 100000 * span - span / 2, 4
+    )
+
+
+class StubWeatherServer:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0,
+        error_rate=0.0,
+        hours=24,
+        seed=None,
+    ):
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.hours = hours
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self.error_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Atende no thread atual (uso pela linha de comando)."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- Respostas ---
+
+    def _should_fail(self):
+        with self._lock:
+            self.request_count += 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.error_count += 1
+                return True
+            return False
+
+    def weatherapi_search(self, params):
+        query = params.get("q", [""])[0]
+        name = query.split(",")[0].strip() or query
+        return [
+            {
+                "name": name,
+                "region": "Benchmark",
+                "country": "Stub",
+                "lat": _stable_coordinate(query, 160),
+                "lon": _stable_coordinate(query[::-1], 340),
+            }
+        ]
+
+    def weatherapi_forecast(self, params):
+        days = int(params.get("days", ["3"])[0])
+        first_day = datetime.date.today()
+        if "dt" in params:
+            # dt restringe a resposta a um único dia
+            first_day = datetime.date.fromisoformat(params["dt"][0])
+            days = 1
+        forecastday = []
+        for offset in range(days):
+            day = first_day + datetime.timedelta(days=offset)
+            temperature = round(self.random.uniform(10, 35), 1)
+            forecastday.append(
+                {
+                    "date": day.isoformat(),
+                    "day": {
+                        "avgtemp_c": temperature,
+                        "mintemp_c": temperature - 5,
+                        "maxtemp_c": temperature + 5,
+                        "avghumidity": self.random.randint(20, 95),
+                        "maxwind_kph": round(self.random.uniform(0, 60), 1),
+                        "condition": {"text": "Parcialmente nublado"},
+                    },
+                    "hour": [
+                        {
+                            "time_epoch": int(
+                                datetime.datetime.combine(
+                                    day, datetime.time(hour % 24)
+                                ).timestamp()
+                            ),
+                            "time": f"{day.isoformat()} {hour % 24:02d}:00",
+                            "temp_c": temperature,
+                            "feelslike_c": temperature,
+                            "precip_mm": 0.0,
+                            "chance_of_rain": 10,
+                            "humidity": 50,
+                            "wind_kph": 10.0,
+                            "condition": {"text": "Parcialmente nublado", "code": 1003},
+                        }
+                        for hour in range(self.hours)
+                    ],
+                }
+            )
+        return {
+            "location": {"name": params.get("q", [""])[0]},
+            "forecast": {"forecastday": forecastday},
+        }
+
+    def openmeteo_forecast(self, params):
+        latitudes = params.get("latitude", ["0"])[0].split(",")
+        longitudes = params.get("longitude", ["0"])[0].split(",")
+        start = datetime.date.fromisoformat(params["start_date"][0])
+        end = datetime.date.fromisoformat(params["end_date"][0])
+        days = [
+            (start + datetime.timedelta(days=offset)).isoformat()
+            for offset in range((end - start).days + 1)
+        ]
+        results = []
+        for latitude, longitude in zip(latitudes, longitudes):
+            results.append(
+                {
+                    "latitude": float(latitude),
+                    "longitude": float(longitude),
+                    "timezone": "America/Sao_Paulo",
+                    "daily": {
+                        "time": days,
+                        "temperature_2m_max": [
+                            round(self.random.uniform(20, 35), 1) for _ in days
+                        ],
+                        "temperature_2m_min": [
+                            round(self.random.uniform(10, 20), 1) for _ in days
+                        ],
+                        "weather_code": [
+                            self.random.choice([0, 1, 2, 3, 61, 95]) for _ in days
+                        ],
+                        "precipitation_sum": [
+                            round(self.random.uniform(0, 20), 1) for _ in days
+                        ],
+                        "wind_speed_10m_max": [
+                            round(self.random.uniform(0, 60), 1) for _ in days
+                        ],
+                        "uv_index_max": [
+                            round(self.random.uniform(0, 11), 1) for _ in days
+                        ],
+                    },
+                    "hourly": {
+                        "time": [
+                            f"{day}T{hour % 24:02d}:00"
+                            for day in days
+                            for hour in range(self.hours)
+                        ],
+                        "temperature_2m": [20.0] * (len(days) * self.hours),
+                        "apparent_temperature": [21.0] * (len(days) * self.hours),
+                        "precipitation": [0.0] * (len(days) * self.hours),
+                        "precipitation_probability": [10] * (len(days) * self.hours),
+                        "relative_humidity_2m": [50] * (len(days) * self.hours),
+                        "wind_speed_10m": [2.8] * (len(days) * self.hours),
+                        "weather_code": [3] * (len(days) * self.hours),
+                    },
+                }
+            )
+        return results[0] if len(results) == 1 else results
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como as APIs reais
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+                routes = {
+                    "/v1/forecast.json": stub.weatherapi_forecast,
+                    "/v1/search.json": stub.weatherapi_search,
+                    "/v1/forecast": stub.openmeteo_forecast,
+                }
+                route = routes.get(parsed.path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if route is None:
+                    return self._send(404, {"error": "not found"})
+                if stub._should_fail():
+                    return self._send(503, {"error": "stub error"})
+                try:
+                    return self._send(200, route(params))
+                except (KeyError, ValueError) as e:
+                    return self._send(400, {"error": str(e)})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # sem log por requisição
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hours", type=int, default=24)
+    args = parser.parse_args()
+
+    server = StubWeatherServer(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        hours=args.hours,
+    )
+    print(f"Servidor stub em {server.url} (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
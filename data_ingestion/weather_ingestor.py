@@ -1,9 +1,24 @@
+import asyncio
+import httpx
+import ijson
+import numpy as np
 import requests
 from datetime import datetime, timezone, date, timedelta
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# Permite executar este script diretamente (python data_ingestion/weather_ingestor.py)
+# e ainda assim importar os módulos do projeto a partir da raiz do repositório.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_data.async_http import async_request_with_retry, build_async_client
+from weather_data.http_session import get_shared_session, request_with_retry
+from weather_data.rate_limit import get_rate_limiter
+from weather_data.streaming import iter_openmeteo_hourly, open_stream
+from weather_data.weather_codes import describe_weather_code
+
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
@@ -14,6 +29,9 @@ LONGITUDE_CUIABA = -56.0984
 
 DATA_EVENTO_STR = "20/08/2025"  # Data simulada do evento no formato DD/MM/YYYY
 ID_EVENTO_SIMULADO = "EDUARDO_COSTA_CUIABA_20250820"  # ID único para o evento simulado
+# Janela do evento simulado (horário local) para a previsão hora a hora (--hourly)
+HORA_INICIO_EVENTO = 18
+HORA_FIM_EVENTO = 23
 
 # --- Configuração do Banco de Dados (PostgreSQL) ---
 DB_CONFIG = {
@@ -24,26 +42,76 @@ DB_CONFIG = {
     "port": os.getenv("POSTGRES_PORT"),
 }
 
+# --- Configuração HTTP da Open-Meteo ---
+OPENMETEO_BASE_URL = os.getenv(
+    "OPENMETEO_BASE_URL", "https://api.open-meteo.com/v1/forecast"
+)
+OPENMETEO_TIMEOUT = (
+    float(os.getenv("OPENMETEO_CONNECT_TIMEOUT", 3.05)),
+    float(os.getenv("OPENMETEO_READ_TIMEOUT", 10)),
+)
+OPENMETEO_MAX_RETRIES = int(os.getenv("OPENMETEO_MAX_RETRIES", 3))
+OPENMETEO_POOL_SIZE = int(os.getenv("OPENMETEO_POOL_SIZE", 10))
+OPENMETEO_ASYNC_CONCURRENCY = int(os.getenv("OPENMETEO_ASYNC_CONCURRENCY", 100))
+# Quantidade de coordenadas enviadas em uma única requisição no modo em lote
+OPENMETEO_BATCH_SIZE = int(os.getenv("OPENMETEO_BATCH_SIZE", 100))
+# Variáveis da previsão hora a hora (vento pedido direto em m/s)
+OPENMETEO_HOURLY_VARIABLES = (
+    "temperature_2m,apparent_temperature,precipitation,precipitation_probability,"
+    "relative_humidity_2m,wind_speed_10m,weather_code"
+)
+# Limite compartilhado entre processos (token bucket em arquivo, ver weather_data/rate_limit.py)
+OPENMETEO_RATE_LIMITER = get_rate_limiter(
+    "openmeteo",
+    int(os.getenv("OPENMETEO_RATE_LIMIT_PER_MINUTE", 500)),
+    int(os.getenv("OPENMETEO_RATE_LIMIT_BURST", 50)),
+)
+
 # --- Importar a função persist_data (permanece a mesma, mas está aqui para referência) ---
+import threading
+
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
+# Pool de conexões reaproveitado por persist_data e persist_data_bulk
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", 5))
+# Canal do NOTIFY enviado a cada gravação de dados de um evento: o api/api_service.py
+# escuta com LISTEN e invalida o cache de /contexto_evento desses eventos
+EVENT_CONTEXT_CHANNEL = "event_context_changed"
+_db_pool = None
+_db_pool_lock = threading.Lock()
 
-def fetch_openmeteo_weather_data(lat, lon, start_date, end_date):
-    """
-    Busca dados de previsão diária da Open-Meteo Weather API.
-    A API é gratuita e não requer chave.
-    """
-    base_url = "https://api.open-meteo.com/v1/forecast"
-    params = {
+
+def _openmeteo_daily_params(
+    lat, lon, start_date, end_date, timezone_name="America/Sao_Paulo"
+):
+    return {
         "latitude": lat,
         "longitude": lon,
         "daily": "temperature_2m_max,temperature_2m_min,weather_code,precipitation_sum,wind_speed_10m_max,uv_index_max",
-        "timezone": "America/Sao_Paulo",  # Cuiabá está no fuso horário de São Paulo (-3)
+        "timezone": timezone_name,  # Cuiabá está no fuso horário de São Paulo (-3)
         "start_date": start_date.isoformat(),  # Formato YYYY-MM-DD
         "end_date": end_date.isoformat(),  # Formato YYYY-MM-DD
     }
+
+
+def fetch_openmeteo_weather_data(lat, lon, start_date, end_date, timeout=None):
+    """
+    Busca dados de previsão diária da Open-Meteo Weather API.
+    A API é gratuita e não requer chave.
+    Usa a sessão compartilhada (keep-alive) com timeout e retentativas em 429/5xx.
+    """
     try:
-        response = requests.get(base_url, params=params)
+        response = request_with_retry(
+            get_shared_session("openmeteo", OPENMETEO_POOL_SIZE),
+            "GET",
+            OPENMETEO_BASE_URL,
+            params=_openmeteo_daily_params(lat, lon, start_date, end_date),
+            timeout=timeout or OPENMETEO_TIMEOUT,
+            max_retries=OPENMETEO_MAX_RETRIES,
+            rate_limiter=OPENMETEO_RATE_LIMITER,
+        )
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -51,44 +119,311 @@ def fetch_openmeteo_weather_data(lat, lon, start_date, end_date):
         return None
 
 
+def fetch_openmeteo_weather_data_batch(
+    locations,
+    start_date,
+    end_date,
+    chunk_size=OPENMETEO_BATCH_SIZE,
+    timezone_name="auto",
+    timeout=None,
+):
+    """
+    Busca a previsão diária de várias localizações (lista de (lat, lon)).
+    A Open-Meteo aceita listas de coordenadas separadas por vírgula e devolve um
+    resultado por localização, então fazemos uma requisição por bloco de `chunk_size`
+    coordenadas em vez de uma por localização. Com timezone "auto" cada localização
+    usa o próprio fuso horário.
+
+    Retorna uma lista alinhada com `locations`, no mesmo formato de
+    fetch_openmeteo_weather_data (None para as localizações de blocos que falharam).
+    """
+    session = get_shared_session("openmeteo", OPENMETEO_POOL_SIZE)
+    results = []
+    for start in range(0, len(locations), chunk_size):
+        chunk = locations[start : start + chunk_size]
+        params = _openmeteo_daily_params(
+            ",".join(str(lat) for lat, _ in chunk),
+            ",".join(str(lon) for _, lon in chunk),
+            start_date,
+            end_date,
+            timezone_name,
+        )
+        try:
+            response = request_with_retry(
+                session,
+                "GET",
+                OPENMETEO_BASE_URL,
+                params=params,
+                timeout=timeout or OPENMETEO_TIMEOUT,
+                max_retries=OPENMETEO_MAX_RETRIES,
+                rate_limiter=OPENMETEO_RATE_LIMITER,
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(
+                f"Erro ao buscar dados climáticos da Open-Meteo API (bloco de {len(chunk)} localizações): {e}"
+            )
+            results.extend([None] * len(chunk))
+            continue
+
+        # Com uma única coordenada a API devolve um objeto, com várias devolve uma lista
+        if isinstance(data, dict):
+            data = [data]
+        if len(data) != len(chunk):
+            print(
+                f"Resposta inesperada da Open-Meteo: {len(data)} resultados para {len(chunk)} localizações."
+            )
+            results.extend([None] * len(chunk))
+            continue
+        results.extend(data)
+    return results
+
+
+async def fetch_openmeteo_weather_data_async(
+    client, lat, lon, start_date, end_date, semaphore=None, timeout=None
+):
+    """
+    Versão assíncrona de fetch_openmeteo_weather_data. Recebe o httpx.AsyncClient
+    (pool de conexões compartilhado) e, opcionalmente, o semáforo que limita a concorrência.
+    """
+    try:
+        response = await async_request_with_retry(
+            client,
+            "GET",
+            OPENMETEO_BASE_URL,
+            semaphore=semaphore,
+            params=_openmeteo_daily_params(lat, lon, start_date, end_date),
+            timeout=timeout or OPENMETEO_TIMEOUT,
+            max_retries=OPENMETEO_MAX_RETRIES,
+            rate_limiter=OPENMETEO_RATE_LIMITER,
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        print(f"Erro ao buscar dados climáticos da Open-Meteo API: {e}")
+        return None
+
+
+async def fetch_openmeteo_weather_data_many_async(
+    coordinates, start_date, end_date, concurrency=OPENMETEO_ASYNC_CONCURRENCY
+):
+    """
+    Busca a previsão de várias coordenadas (lista de (lat, lon)) mantendo até
+    `concurrency` requisições em andamento sobre um único pool de conexões.
+    Retorna os resultados na mesma ordem das coordenadas (None em caso de erro).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    async with build_async_client(concurrency, OPENMETEO_TIMEOUT) as client:
+        return await asyncio.gather(
+            *(
+                fetch_openmeteo_weather_data_async(
+                    client, lat, lon, start_date, end_date, semaphore=semaphore
+                )
+                for lat, lon in coordinates
+            )
+        )
+
+
+def _openmeteo_hourly_params(lat, lon, start_date, end_date):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": OPENMETEO_HOURLY_VARIABLES,
+        "wind_speed_unit": "ms",
+        # Horários no fuso de cada localização, o mesmo das janelas dos eventos
+        "timezone": "auto",
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+
+
+def normalize_openmeteo_hourly_row(event, hour, collected_at):
+    """Linha compacta de uma hora da janela do evento (context_type WEATHER_FORECAST_HOURLY)."""
+    weather_code = hour.get("weather_code")
+    return {
+        "event_id": event["event_id"],
+        "context_type": "WEATHER_FORECAST_HOURLY",
+        "hora_previsao": hour["time"],  # Horário local, YYYY-MM-DDTHH:MM
+        "temperatura_celsius": hour.get("temperature_2m"),
+        "sensacao_termica_celsius": hour.get("apparent_temperature"),
+        "precipitacao_mm": hour.get("precipitation"),
+        "probabilidade_precipitacao": hour.get("precipitation_probability"),
+        "umidade_relativa": hour.get("relative_humidity_2m"),
+        "velocidade_vento_ms": hour.get("wind_speed_10m"),
+        "codigo_clima": None if weather_code is None else int(weather_code),
+        "timestamp_coleta_dados": collected_at,
+        "data_evento_simulado": event["window_start"].date().isoformat(),
+    }
+
+
+def stream_openmeteo_hourly_rows(events, chunk_size=OPENMETEO_BATCH_SIZE, timeout=None):
+    """
+    Gera as linhas da previsão hora a hora de vários eventos, uma por hora da janela
+    de cada evento. `events` é uma lista de dicionários com event_id, latitude,
+    longitude, window_start e window_end (datetime no horário local da localização).
+
+    As coordenadas vão em blocos de `chunk_size` por requisição e cada resposta é
+    lida de forma incremental (weather_data.streaming): o documento completo nunca
+    fica em memória, só as horas das janelas. O gerador pode ser passado direto para
+    persist_data_bulk. Blocos que falham são apenas registrados.
+    """
+    session = get_shared_session("openmeteo", OPENMETEO_POOL_SIZE)
+    for start in range(0, len(events), chunk_size):
+        chunk = events[start : start + chunk_size]
+        params = _openmeteo_hourly_params(
+            ",".join(str(event["latitude"]) for event in chunk),
+            ",".join(str(event["longitude"]) for event in chunk),
+            min(event["window_start"].date() for event in chunk),
+            max(event["window_end"].date() for event in chunk),
+        )
+        try:
+            response = request_with_retry(
+                session,
+                "GET",
+                OPENMETEO_BASE_URL,
+                params=params,
+                timeout=timeout or OPENMETEO_TIMEOUT,
+                max_retries=OPENMETEO_MAX_RETRIES,
+                rate_limiter=OPENMETEO_RATE_LIMITER,
+                stream=True,
+            )
+            with response:
+                response.raise_for_status()
+                collected_at = datetime.now(timezone.utc).isoformat()
+                windows = [
+                    (event["window_start"], event["window_end"]) for event in chunk
+                ]
+                for position, _, hours in iter_openmeteo_hourly(
+                    open_stream(response), windows
+                ):
+                    for hour in hours:
+                        yield normalize_openmeteo_hourly_row(
+                            chunk[position], hour, collected_at
+                        )
+        except (requests.exceptions.RequestException, ijson.JSONError) as e:
+            print(
+                f"Erro ao buscar a previsão horária da Open-Meteo API (bloco de {len(chunk)} localizações): {e}"
+            )
+
+
 def get_weather_code_description(code):
     """
     Mapeia os códigos de clima da Open-Meteo para descrições legíveis.
     Fonte: https://www.open-meteo.com/en/docs
     """
-    # Exemplo simplificado. Uma implementação completa usaria um dicionário maior.
-    # Você pode expandir isso para todos os códigos da documentação.
-    descriptions = {
-        0: "Céu limpo",
-        1: "Principalmente limpo",
-        2: "Parcialmente nublado",
-        3: "Nublado",
-        45: "Nevoeiro",
-        48: "Nevoeiro com deposição de orvalho",
-        51: "Chuvisco leve",
-        53: "Chuvisco moderado",
-        55: "Chuvisco denso",
-        56: "Chuvisco congelante leve",
-        57: "Chuvisco congelante denso",
-        61: "Chuva leve",
-        63: "Chuva moderada",
-        65: "Chuva forte",
-        66: "Chuva congelante leve",
-        67: "Chuva congelante forte",
-        71: "Queda de neve leve",
-        73: "Queda de neve moderada",
-        75: "Queda de neve forte",
-        77: "Grãos de neve",
-        80: "Pancadas de chuva leves",
-        81: "Pancadas de chuva moderadas",
-        82: "Pancadas de chuva violentas",
-        85: "Pancadas de neve leves",
-        86: "Pancadas de neve fortes",
-        95: "Tempestade com chuva leve e moderada",
-        96: "Tempestade com granizo leve",
-        99: "Tempestade com granizo forte",
-    }
-    return descriptions.get(code, "Desconhecido")
+    return describe_weather_code(code)
+
+
+# Tabela indexada pelo código (0-99) para o mapeamento vetorizado em describe_weather_codes
+_WEATHER_CODE_TABLE = np.array(
+    [describe_weather_code(code) for code in range(100)],
+    dtype=object,
+)
+
+
+def openmeteo_block_to_columns(raw_data, block="daily"):
+    """
+    Converte um bloco da resposta da Open-Meteo ('daily' ou 'hourly') em colunas
+    NumPy, em uma única passada: 'time' vira datetime64 e as demais variáveis
+    viram float64 (valores nulos viram NaN).
+    """
+    section = raw_data[block]
+    time_unit = "D" if block == "daily" else "m"
+    columns = {"time": np.array(section["time"], dtype=f"datetime64[{time_unit}]")}
+    for name, values in section.items():
+        if name != "time":
+            columns[name] = np.array(values, dtype=np.float64)
+    return columns
+
+
+def describe_weather_codes(codes):
+    """Versão vetorizada de get_weather_code_description para uma coluna de códigos."""
+    valid = ~np.isnan(codes)
+    indexes = np.where(valid, codes, -1).astype(np.int64)
+    in_table = valid & (indexes >= 0) & (indexes < len(_WEATHER_CODE_TABLE))
+    return np.where(
+        in_table,
+        _WEATHER_CODE_TABLE[np.clip(indexes, 0, len(_WEATHER_CODE_TABLE) - 1)],
+        "Desconhecido",
+    )
+
+
+def _column_to_list(values):
+    """Converte a coluna para valores Python, trocando NaN por None."""
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result.tolist()
+
+
+def normalize_openmeteo_daily_rows(raw_results, event_ids=None):
+    """
+    Normaliza todos os dias de uma ou várias respostas da Open-Meteo (como as devolvidas
+    por fetch_openmeteo_weather_data_batch) e gera uma linha normalizada por dia e
+    localização, no mesmo formato de normalize_openmeteo_daily_data.
+
+    `event_ids` (opcional) é alinhado com `raw_results`; sem ele é usado o evento simulado.
+    """
+    if isinstance(raw_results, dict):
+        raw_results = [raw_results]
+    collected_at = datetime.now(timezone.utc).isoformat()
+
+    for position, raw_data in enumerate(raw_results):
+        if not raw_data or "daily" not in raw_data or "time" not in raw_data["daily"]:
+            print(
+                "Dados brutos inválidos ou estrutura 'daily' ausente na resposta da Open-Meteo."
+            )
+            continue
+
+        event_id = event_ids[position] if event_ids else ID_EVENTO_SIMULADO
+        columns = openmeteo_block_to_columns(raw_data, "daily")
+        missing = np.full(len(columns["time"]), np.nan)
+
+        weather_codes = columns.get("weather_code", missing)
+        # A Open-Meteo devolve km/h por padrão; armazenamos m/s
+        wind_speed_ms = np.round(columns.get("wind_speed_10m_max", missing) / 3.6, 2)
+
+        dates = np.datetime_as_string(columns["time"], unit="D").tolist()
+        rows = zip(
+            dates,
+            _column_to_list(columns.get("temperature_2m_max", missing)),
+            _column_to_list(columns.get("temperature_2m_min", missing)),
+            [
+                None if code is None else int(code)
+                for code in _column_to_list(weather_codes)
+            ],
+            describe_weather_codes(weather_codes).tolist(),
+            _column_to_list(columns.get("precipitation_sum", missing)),
+            _column_to_list(wind_speed_ms),
+            _column_to_list(columns.get("uv_index_max", missing)),
+        )
+        for (
+            day,
+            temperature_max,
+            temperature_min,
+            weather_code,
+            description,
+            precipitation,
+            wind_speed,
+            uv_index,
+        ) in rows:
+            yield {
+                "event_id": event_id,
+                "context_type": "WEATHER_FORECAST_DAILY",
+                "nome_cidade_fuso_horario": raw_data.get("timezone", "N/A"),
+                "latitude": raw_data.get("latitude"),
+                "longitude": raw_data.get("longitude"),
+                "data_previsao": day,  # Já está em YYYY-MM-DD
+                "temperatura_max_celsius": temperature_max,
+                "temperatura_min_celsius": temperature_min,
+                "codigo_clima": weather_code,
+                "descricao_clima": description,
+                "soma_precipitacao_mm": precipitation,
+                "velocidade_vento_max_ms": wind_speed,
+                "uv_index_max": uv_index,
+                "timestamp_coleta_dados": collected_at,  # Quando coletamos este dado
+                "data_evento_simulado": day,  # Data do evento para a qual a previsão é
+            }
 
 
 def normalize_openmeteo_daily_data(raw_data, target_date_str):
@@ -104,62 +439,35 @@ def normalize_openmeteo_daily_data(raw_data, target_date_str):
 
     target_date_dt = datetime.strptime(target_date_str, "%d/%m/%Y").date()
 
-    # A API retorna listas de dados, onde cada índice corresponde a um dia na lista 'time'
-    daily_times = [datetime.fromisoformat(t).date() for t in raw_data["daily"]["time"]]
-
-    try:
-        # Encontra o índice da data do evento na lista de tempos
-        day_index = daily_times.index(target_date_dt)
-    except ValueError:
-        print(
-            f"Previsão para a data {target_date_str} não encontrada na resposta da API."
-        )
-        return None
-
-    # Extrai os dados para o dia específico usando o índice
-    daily_data_for_target_date = {
-        "time": raw_data["daily"]["time"][day_index],
-        "temperature_2m_max": raw_data["daily"]["temperature_2m_max"][day_index],
-        "temperature_2m_min": raw_data["daily"]["temperature_2m_min"][day_index],
-        "weather_code": raw_data["daily"]["weather_code"][day_index],
-        "precipitation_sum": raw_data["daily"]["precipitation_sum"][day_index],
-        "wind_speed_10m_max": raw_data["daily"]["wind_speed_10m_max"][day_index],
-        "uv_index_max": raw_data["daily"]["uv_index_max"][day_index],
-    }
-
     try:
-        normalized = {
-            "event_id": ID_EVENTO_SIMULADO,
-            "context_type": "WEATHER_FORECAST_DAILY",
-            "nome_cidade_fuso_horario": raw_data.get("timezone", "N/A"),
-            "latitude": raw_data.get("latitude"),
-            "longitude": raw_data.get("longitude"),
-            "data_previsao": daily_data_for_target_date[
-                "time"
-            ],  # Já está em YYYY-MM-DD
-            "temperatura_max_celsius": daily_data_for_target_date["temperature_2m_max"],
-            "temperatura_min_celsius": daily_data_for_target_date["temperature_2m_min"],
-            "codigo_clima": daily_data_for_target_date["weather_code"],
-            "descricao_clima": get_weather_code_description(
-                daily_data_for_target_date["weather_code"]
-            ),
-            "soma_precipitacao_mm": daily_data_for_target_date["precipitation_sum"],
-            "velocidade_vento_max_ms": daily_data_for_target_date["wind_speed_10m_max"],
-            "uv_index_max": daily_data_for_target_date["uv_index_max"],
-            "timestamp_coleta_dados": datetime.now(
-                timezone.utc
-            ).isoformat(),  # Quando coletamos este dado
-            "data_evento_simulado": target_date_dt.isoformat(),  # Data do evento para a qual a previsão é
-        }
-        return normalized
+        for normalized in normalize_openmeteo_daily_rows(raw_data):
+            if normalized["data_previsao"] == target_date_dt.isoformat():
+                return normalized
     except Exception as e:
         print(f"Erro ao normalizar dados diários específicos da Open-Meteo: {e}")
         return None
 
+    print(f"Previsão para a data {target_date_str} não encontrada na resposta da API.")
+    return None
+
 
 # --- Funções de Persistência (Mantidas as mesmas do script anterior) ---
 
 
+def get_db_pool():
+    """Cria (na primeira chamada) e retorna o pool de conexões do processo."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = ThreadedConnectionPool(1, DB_POOL_MAX_CONNECTIONS, **DB_CONFIG)
+        return _db_pool
+
+
+def _release_connection(conn):
+    """Devolve a conexão ao pool, descartando-a se estiver quebrada."""
+    get_db_pool().putconn(conn, close=bool(conn.closed))
+
+
 def persist_data(
     normalized_data, simulated_event_id, source_name="Open-Meteo Weather API"
 ):
@@ -168,7 +476,7 @@ def persist_data(
     cur = None
     load_id = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = get_db_pool().getconn()
         cur = conn.cursor()
 
         cur.execute(
@@ -204,6 +512,11 @@ def persist_data(
                     load_id,
                 ),
             )
+            # Entregue no commit, junto com os dados
+            cur.execute(
+                "SELECT pg_notify(%s, %s);",
+                (EVENT_CONTEXT_CHANNEL, simulated_event_id),
+            )
             cur.execute(
                 """
                 UPDATE data_load_log
@@ -255,10 +568,131 @@ def persist_data(
         if cur:
             cur.close()
         if conn:
-            conn.close()
+            _release_connection(conn)
+
+
+def persist_data_bulk(
+    normalized_records, source_name="Open-Meteo Weather API", page_size=1000
+):
+    """
+    Persiste um iterável de dados normalizados (ex.: normalize_openmeteo_daily_rows)
+    em uma única carga: uma conexão do pool, um INSERT multi-linha por página
+    (execute_values) e um único registro em data_load_log com a quantidade real
+    importada, tudo em uma transação. O event_id de cada linha vem do próprio registro.
+
+    Retorna a quantidade de registros importados, ou None em caso de erro.
+    """
+    conn = None
+    imported_count = 0
+    event_ids = set()
+
+    def rows(load_id):
+        nonlocal imported_count
+        for normalized_data in normalized_records:
+            imported_count += 1
+            event_ids.add(normalized_data["event_id"])
+            yield (
+                normalized_data["event_id"],
+                normalized_data["context_type"],
+                json.dumps(normalized_data),
+                date.fromisoformat(normalized_data["data_evento_simulado"]),
+                datetime.fromisoformat(normalized_data["timestamp_coleta_dados"]),
+                load_id,
+            )
+
+    try:
+        conn = get_db_pool().getconn()
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO data_load_log (source_name, status, records_imported)
+                VALUES (%s, %s, %s)
+                RETURNING load_id;
+                """,
+                (source_name, "IN_PROGRESS", 0),
+            )
+            load_id = cur.fetchone()[0]
+
+            execute_values(
+                cur,
+                """
+                INSERT INTO event_context_data (
+                    event_id, context_type, context_data,
+                    event_simulated_date, data_retrieval_timestamp, load_id
+                ) VALUES %s;
+                """,
+                rows(load_id),
+                page_size=page_size,
+            )
+            # Um NOTIFY por evento gravado, entregue no commit
+            cur.execute(
+                "SELECT pg_notify(%s, event_id) FROM unnest(%s::text[]) AS event_id;",
+                (EVENT_CONTEXT_CHANNEL, sorted(event_ids)),
+            )
+            cur.execute(
+                """
+                UPDATE data_load_log
+                SET status = %s, records_imported = %s
+                WHERE load_id = %s;
+                """,
+                ("SUCCESS", imported_count, load_id),
+            )
+        conn.commit()
+        print(
+            f"{imported_count} registros persistidos com sucesso com load_id: {load_id}"
+        )
+        return imported_count
+
+    except (Exception, psycopg2.Error) as error:
+        print(f"Erro durante a persistência em lote dos dados: {error}")
+        if conn:
+            conn.rollback()
+            # A carga inteira foi desfeita; registra a falha em um novo log
+            try:
+                with conn.cursor() as cur_error:
+                    cur_error.execute(
+                        """
+                        INSERT INTO data_load_log
+                            (source_name, status, records_imported, error_message)
+                        VALUES (%s, %s, %s, %s);
+                        """,
+                        (source_name, "ERROR", 0, str(error)),
+                    )
+                conn.commit()
+            except Exception as log_error:
+                print(f"Erro ao registrar a falha da carga em lote: {log_error}")
+        return None
+    finally:
+        if conn:
+            _release_connection(conn)
+
+
+def run_hourly_ingestion():
+    """Ingere a previsão hora a hora da janela do evento simulado (--hourly)."""
+    event_day = datetime.strptime(DATA_EVENTO_STR, "%d/%m/%Y")
+    event = {
+        "event_id": ID_EVENTO_SIMULADO,
+        "latitude": LATITUDE_CUIABA,
+        "longitude": LONGITUDE_CUIABA,
+        "window_start": event_day + timedelta(hours=HORA_INICIO_EVENTO),
+        "window_end": event_day + timedelta(hours=HORA_FIM_EVENTO),
+    }
+    print(
+        f"Iniciando ingestão da previsão horária ({HORA_INICIO_EVENTO}h-{HORA_FIM_EVENTO}h) para o evento: {ID_EVENTO_SIMULADO}"
+    )
+    # As linhas vão da resposta (lida em fluxo) direto para o INSERT em lote
+    imported_count = persist_data_bulk(stream_openmeteo_hourly_rows([event]))
+    if imported_count:
+        print("\nProcesso de ingestão da previsão horária concluído com sucesso.")
+    else:
+        print("\nNenhuma hora da previsão foi persistida.")
 
 
 if __name__ == "__main__":
+    if "--hourly" in sys.argv[1:]:
+        run_hourly_ingestion()
+        sys.exit(0)
+
     print(
         f"Iniciando processo de ingestão de previsão diária para o evento: {ID_EVENTO_SIMULADO}"
     )
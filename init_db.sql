@@ -4,18 +4,44 @@
 -- IF NOT EXISTS garante que a tabela só será criada se não existir,
 -- evitando erros em reinicializações se o volume de dados persistir.
 CREATE TABLE IF NOT EXISTS event_context_data (
-    -- event_id: Identificador único do evento (ex: "EDUARDO_COSTA_CUIABA_20250820").
-    -- Definido como PRIMARY KEY para garantir unicidade e indexação automática.
-    event_id VARCHAR(255) PRIMARY KEY,
+    -- id: Chave substituta. Um mesmo evento pode ter vários dados contextuais
+    -- (vários dias de previsão, várias cargas), então event_id não é único.
+    id BIGSERIAL PRIMARY KEY,
+
+    -- event_id: Identificador do evento (ex: "EDUARDO_COSTA_CUIABA_20250820").
+    event_id VARCHAR(255) NOT NULL,
+
+    -- context_type: Tipo do dado contextual (ex: "WEATHER_FORECAST_DAILY").
+    context_type VARCHAR(100) NOT NULL,
     
     -- context_data: Armazena os dados contextuais (como informações meteorológicas)
     -- no formato JSONB. JSONB é otimizado para armazenamento e consulta de dados JSON.
     context_data JSONB NOT NULL,
+
+    -- event_simulated_date: Data do evento à qual o dado contextual se refere.
+    event_simulated_date DATE,
     
     -- data_retrieval_timestamp: Registra quando os dados foram coletados/armazenados.
     -- DEFAULT CURRENT_TIMESTAMP preenche automaticamente com a hora atual na inserção.
     -- TIMESTAMP WITH TIME ZONE é recomendado para lidar com fusos horários.
-    data_retrieval_timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    data_retrieval_timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    -- load_id: Carga (data_load_log) que importou este registro.
+    load_id INTEGER
+);
+
+-- Índice para buscar o dado mais recente de um evento (api/api_service.py).
+CREATE INDEX IF NOT EXISTS idx_event_context_event_id ON event_context_data (event_id, data_retrieval_timestamp DESC);
+
+-- Registro das cargas feitas por data_ingestion/weather_ingestor.py
+-- (uma linha por execução de persist_data ou por lote de persist_data_bulk).
+CREATE TABLE IF NOT EXISTS data_load_log (
+    load_id SERIAL PRIMARY KEY,
+    source_name VARCHAR(255) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    records_imported INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Opcional: Adiciona um índice na coluna data_retrieval_timestamp para otimizar
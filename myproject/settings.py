@@ -81,6 +81,31 @@ DATABASES = {
     }
 }
 
+# Cache
+# "weather_forecast" é a camada compartilhada do cache de previsões
+# (weather_data/forecast_cache.py), vista por todos os workers e pelo comando de ingestão.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "weather_forecast": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config(
+            "WEATHER_CACHE_LOCATION", default="/tmp/weather_forecast_cache"
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Registro mais recente por evento dos endpoints de contexto (weather_data/context_cache.py),
+    # invalidado pela ingestão a cada nova versão.
+    "event_context": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config(
+            "EVENT_CONTEXT_CACHE_LOCATION", default="/tmp/event_context_cache"
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -2,17 +2,41 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 import requests
-import re
 from datetime import date
 import os
 import logging
 import json
 
+from api.serializers import load_latest_record
 from weather_data.models import WeatherRecord, WeatherLoadLog
 from weather_data.api_client import WeatherApiClient
+from weather_data.context_cache import get_event_context, invalidate_event_contexts
+from weather_data.ingestion import build_event_id
+from weather_data.log_sink import get_default_log_sink
+from weather_data.providers import PROVIDER_API_SOURCES, get_default_forecast_fetcher
+from weather_data.versioning import forecast_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Campos do registro já salvo exibidos pela consulta do formulário
+_FORM_RECORD_FIELDS = [
+    "event_id",
+    "event_name",
+    "event_location",
+    "event_date",
+    "temperature",
+    "feels_like",
+    "min_temperature",
+    "max_temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "weather_main",
+    "weather_description",
+    "api_source",
+    "loaded_at",
+]
+
 
 # View para a página inicial que exibe o formulário de consulta de clima.
 def home_view(request):
@@ -42,18 +66,12 @@ def query_weather_data(request):
                 {"error": "Formato de data inválido. Use AAAA-MM-DD."}, status=400
             )
 
-        sanitized_event_name_for_id = re.sub(r"[^a-zA-Z0-9]", "", event_name).upper()
-        sanitized_city_for_id = re.sub(r"[^a-zA-Z0-9]", "", city).upper()
-        event_id = f"{sanitized_event_name_for_id}_{sanitized_city_for_id}_{date_str.replace('-', '')}"
-
-        client = WeatherApiClient()
+        # O ID continua derivado do texto informado (IDs já gravados não mudam)
+        event_id = build_event_id(event_name, city, event_date)
 
         try:
-            existing_record = (
-                WeatherRecord.objects.filter(event_id=event_id)
-                .order_by("-loaded_at")
-                .first()
-            )
+            # Registro mais recente do evento, do cache dos endpoints de contexto
+            existing_record = get_event_context(event_id, load_latest_record)["data"]
 
             if existing_record:
                 logger.info(
@@ -61,16 +79,28 @@ def query_weather_data(request):
                 )
                 return JsonResponse(
                     {
-                        "data": _serialize_weather_record(existing_record),
+                        "data": {
+                            name: existing_record[name] for name in _FORM_RECORD_FIELDS
+                        },
                         "status": "existing",
                     },
                     status=200,
                 )
 
             logger.info(
-                f"Dados para o evento ID '{event_id}' não encontrados. Iniciando ingestão da WeatherAPI.com."
+                f"Dados para o evento ID '{event_id}' não encontrados. Iniciando consulta aos provedores de previsão."
+            )
+            # Usa a localização canônica ("Cuiabá", "cuiaba" e "Cuiaba, Brazil" viram a
+            # mesma); só é resolvida quando a previsão precisa ser buscada
+            resolved_location = WeatherApiClient().resolve_location(city)
+            if resolved_location:
+                city = resolved_location.canonical_name
+
+            # WeatherAPI.com com hedging na Open-Meteo quando a resposta demora
+            fetcher = get_default_forecast_fetcher()
+            weather_data_raw, api_source = fetcher.get_weather_forecast(
+                city, event_date
             )
-            weather_data_raw = client.get_weather_forecast(city, event_date)
 
             if not weather_data_raw:
                 error_msg = f"Não foi possível obter dados meteorológicos para '{city}' em '{date_str}' da API externa. Verifique a chave da API ou a conectividade."
@@ -83,6 +113,7 @@ def query_weather_data(request):
                 "event_location": city,
                 "event_date": date_str,
                 "weather_data": weather_data_raw,
+                "api_source": api_source,
                 "status": "new_fetched",
             }
             return JsonResponse({"data": response_data}, status=200)
@@ -110,6 +141,9 @@ def save_weather_data(request):
             event_location = data.get("event_location")
             event_date_str = data.get("event_date")
             weather_data_raw = data.get("weather_data")
+            api_source = data.get("api_source")
+            if api_source not in PROVIDER_API_SOURCES:
+                api_source = "WeatherAPI.com"
 
             if not all(
                 [event_id, event_name, event_location, event_date_str, weather_data_raw]
@@ -142,18 +176,22 @@ def save_weather_data(request):
                 wind_speed=weather_data_raw.get("wind_speed"),
                 weather_main=weather_data_raw.get("weather_main"),
                 weather_description=weather_data_raw.get("weather_description"),
-                api_source="WeatherAPI.com",
+                api_source=api_source,
+                content_hash=forecast_fingerprint(weather_data_raw),
                 load_version=1,
             )
-
-            WeatherLoadLog.objects.create(
-                event_id=event_id,
-                log_level="SUCCESS",
-                message=f"Dados para '{event_location}' em '{event_date_str}' salvos com sucesso.",
-                event_name=event_name,
-                event_location=event_location,
-                event_date=event_date,
-                data_imported_count=1,
+            invalidate_event_contexts([event_id])
+
+            get_default_log_sink().emit(
+                WeatherLoadLog(
+                    event_id=event_id,
+                    log_level="SUCCESS",
+                    message=f"Dados para '{event_location}' em '{event_date_str}' salvos com sucesso.",
+                    event_name=event_name,
+                    event_location=event_location,
+                    event_date=event_date,
+                    data_imported_count=1,
+                )
             )
             logger.info(f"Dados do evento ID '{event_id}' salvos no DB com sucesso.")
 
@@ -173,37 +211,3 @@ def save_weather_data(request):
             return JsonResponse({"error": error_msg}, status=500)
 
     return JsonResponse({"error": "Método não permitido."}, status=405)
-
-
-def _serialize_weather_record(record):
-    return {
-        "event_id": record.event_id,
-        "event_name": record.event_name,
-        "event_location": record.event_location,
-        "event_date": record.event_date.isoformat(),
-        "temperature": (
-            float(record.temperature) if record.temperature is not None else None
-        ),
-        "feels_like": (
-            float(record.feels_like) if record.feels_like is not None else None
-        ),
-        "min_temperature": (
-            float(record.min_temperature)
-            if record.min_temperature is not None
-            else None
-        ),
-        "max_temperature": (
-            float(record.max_temperature)
-            if record.max_temperature is not None
-            else None
-        ),
-        "humidity": float(record.humidity) if record.humidity is not None else None,
-        "pressure": float(record.pressure) if record.pressure is not None else None,
-        "wind_speed": (
-            float(record.wind_speed) if record.wind_speed is not None else None
-        ),
-        "weather_main": record.weather_main,
-        "weather_description": record.weather_description,
-        "api_source": record.api_source,
-        "loaded_at": record.loaded_at.isoformat(),
-    }
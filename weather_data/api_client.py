@@ -1,102 +1,452 @@
+import asyncio
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from decouple import config
 import datetime
 from datetime import timedelta  # Importe timedelta aqui
 
+from weather_data.async_http import async_request_with_retry, build_async_client
+from weather_data.forecast_cache import get_default_forecast_cache
+from weather_data.http_session import get_shared_session, request_with_retry
+from weather_data.locations import get_default_location_resolver, location_query
+from weather_data.rate_limit import get_rate_limiter
+from weather_data.streaming import iter_weatherapi_hours, open_stream
+
+# Dias de previsão oferecidos pelo plano gratuito da WeatherAPI.com
+FORECAST_WINDOW_DAYS = 3
+# Código de erro da WeatherAPI.com para "No matching location found."
+UNKNOWN_LOCATION_ERROR_CODE = 1006
+
 
 class WeatherApiClient:
-    def __init__(self):
+    def __init__(self, session=None, cache=None, resolver=None):
         self.api_key = config("WEATHER_API_KEY")
-        self.base_url = "http://api.weatherapi.com/v1/forecast.json"
+        # Configurável para apontar para um servidor local (ex.: benchmarks/stub_server.py)
+        api_root = config(
+            "WEATHER_API_BASE_URL", default="http://api.weatherapi.com/v1"
+        ).rstrip("/")
+        self.base_url = f"{api_root}/forecast.json"
+        self.search_url = f"{api_root}/search.json"
+        self.timeout = (
+            config("WEATHER_API_CONNECT_TIMEOUT", default=3.05, cast=float),
+            config("WEATHER_API_READ_TIMEOUT", default=10.0, cast=float),
+        )
+        self.max_retries = config("WEATHER_API_MAX_RETRIES", default=3, cast=int)
+        # Por padrão todas as instâncias do processo compartilham o mesmo pool de conexões
+        self.session = session or get_shared_session(
+            "weatherapi", config("WEATHER_API_POOL_SIZE", default=10, cast=int)
+        )
+        self.cache = cache or get_default_forecast_cache()
+        self.resolver = resolver or get_default_location_resolver()
+        # Balde de tokens compartilhado por todos os processos que usam a mesma chave
+        self.rate_limiter = get_rate_limiter(
+            "weatherapi",
+            config("WEATHER_API_RATE_LIMIT_PER_MINUTE", default=60, cast=int),
+            config("WEATHER_API_RATE_LIMIT_BURST", default=10, cast=int),
+        )
+        # Pool assíncrono criado sob demanda, um por event loop (ver _async_pool)
+        self.async_concurrency = config(
+            "WEATHER_API_ASYNC_CONCURRENCY", default=100, cast=int
+        )
+        self._async_client = None
+        self._async_semaphore = None
+        self._async_loop = None
+
+    def is_in_forecast_window(self, forecast_date: datetime.date):
+        """Indica se a data está dentro da janela de previsão do plano gratuito."""
+        num_days = (forecast_date - datetime.date.today()).days + 1
+        return 1 <= num_days <= FORECAST_WINDOW_DAYS
 
     # forecast_date AGORA ESPERA UM OBJETO datetime.date
-    def get_weather_forecast(self, event_location, forecast_date: datetime.date):
+    def get_weather_forecast(
+        self, event_location, forecast_date: datetime.date, timeout=None
+    ):
         """
         Busca a previsão do tempo para uma localização e data específica usando WeatherAPI.com.
         A WeatherAPI.com (plano gratuito) oferece previsão de 3 dias.
         Queries podem ser por cidade, CEP, lat/lon. Usaremos a localização textual.
+        `timeout` aceita (connect, read) em segundos e substitui o padrão do cliente.
         """
-        query_location = event_location
+        if not self._check_forecast_window(forecast_date):
+            return None
 
-        today = datetime.date.today()
-        # AGORA forecast_date É UM OBJETO datetime.date, então a subtração funciona
-        num_days = (forecast_date - today).days + 1
+        location = self._location_key_and_query(event_location)
+        if location is None:
+            return None
+        location_key, _ = location
 
-        if num_days > 3 or num_days < 1:
-            print(
-                f"Atenção: A WeatherAPI.com (plano gratuito) só fornece previsão para os próximos 3 dias."
+        found, forecast = self.cache.get(location_key, forecast_date)
+        if found:
+            return forecast
+
+        forecasts = self.get_location_forecast(event_location, timeout=timeout)
+        return self._pick_forecast_date(location_key, forecast_date, forecasts)
+
+    def get_location_forecast(self, event_location, timeout=None):
+        """
+        Busca de uma só vez todos os dias da janela de previsão (days=3) para a
+        localização e devolve um dicionário {datetime.date: dados normalizados}.
+        Permite atender vários eventos da mesma cidade com uma única chamada.
+        Retorna None em caso de erro na requisição ou resposta inesperada.
+        Usa o cache de previsões quando todos os dias da janela já estão disponíveis.
+        """
+        location = self._location_key_and_query(event_location)
+        if location is None:
+            return None
+        location_key, query = location
+
+        found, forecasts = self._cached_location_forecast(location_key)
+        if found:
+            return forecasts
+
+        try:
+            response = request_with_retry(
+                self.session,
+                "GET",
+                self.base_url,
+                params=self._location_params(query),
+                timeout=timeout or self.timeout,
+                max_retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
             )
-            print(
-                f"A data do evento {forecast_date} está fora do período de cobertura."
+            return self._process_location_response(location_key, response)
+        except requests.exceptions.RequestException as e:
+            print(f"Erro na requisição à WeatherAPI.com: {e}")
+            return None
+        except Exception as e:
+            print(f"Erro inesperado ao processar dados da WeatherAPI.com: {e}")
+            return None
+
+    def get_hourly_forecast(
+        self, event_location, window_start, window_end, timeout=None
+    ):
+        """
+        Busca a previsão hora a hora da localização e devolve uma lista com as horas
+        entre window_start e window_end (datetime no horário local da localização),
+        no formato de _normalize_hourly_forecast. A resposta é lida de forma
+        incremental (weather_data.streaming): o documento completo nunca fica em
+        memória, só as horas da janela. Retorna None em caso de erro.
+        """
+        if not (
+            self._check_forecast_window(window_start.date())
+            and self._check_forecast_window(window_end.date())
+        ):
+            return None
+
+        location = self._location_key_and_query(event_location)
+        if location is None:
+            return None
+        location_key, query = location
+
+        # Pede só os dias necessários; com a janela em um único dia, dt restringe
+        # a resposta a esse dia
+        params = self._location_params(query)
+        params["days"] = (window_end.date() - datetime.date.today()).days + 1
+        if window_start.date() == window_end.date():
+            params["dt"] = window_start.date().isoformat()
+
+        try:
+            response = request_with_retry(
+                self.session,
+                "GET",
+                self.base_url,
+                params=params,
+                timeout=timeout or self.timeout,
+                max_retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
+                stream=True,
             )
+            with response:
+                if response.status_code == 400 and self._is_unknown_location(response):
+                    print(
+                        f"Localização não encontrada na WeatherAPI.com: {location_key}"
+                    )
+                    self.cache.set_unknown_location(location_key)
+                    return None
+                response.raise_for_status()
+                return [
+                    self._normalize_hourly_forecast(hour)
+                    for hour in iter_weatherapi_hours(
+                        open_stream(response), window_start, window_end
+                    )
+                ]
+        except requests.exceptions.RequestException as e:
+            print(f"Erro na requisição à WeatherAPI.com: {e}")
+            return None
+        except Exception as e:
+            print(f"Erro inesperado ao processar dados da WeatherAPI.com: {e}")
+            return None
+
+    # --- Variante assíncrona (httpx) ---
+
+    async def get_weather_forecast_async(
+        self, event_location, forecast_date: datetime.date, timeout=None
+    ):
+        """
+        Versão assíncrona de get_weather_forecast, para backfills com muitas requisições
+        simultâneas e views assíncronas do Django. Compartilha o cache com a versão
+        síncrona; as leituras e gravações no cache (disco) rodam em uma thread.
+        """
+        if not self._check_forecast_window(forecast_date):
             return None
 
-        params = {
+        location = await self._location_key_and_query_async(event_location)
+        if location is None:
+            return None
+        location_key, _ = location
+
+        found, forecast = await asyncio.to_thread(
+            self.cache.get, location_key, forecast_date
+        )
+        if found:
+            return forecast
+
+        forecasts = await self.get_location_forecast_async(
+            event_location, timeout=timeout
+        )
+        return await asyncio.to_thread(
+            self._pick_forecast_date, location_key, forecast_date, forecasts
+        )
+
+    async def get_location_forecast_async(self, event_location, timeout=None):
+        """Versão assíncrona de get_location_forecast."""
+        location = await self._location_key_and_query_async(event_location)
+        if location is None:
+            return None
+        location_key, query = location
+
+        found, forecasts = await asyncio.to_thread(
+            self._cached_location_forecast, location_key
+        )
+        if found:
+            return forecasts
+
+        client, semaphore = self._async_pool()
+        try:
+            response = await async_request_with_retry(
+                client,
+                "GET",
+                self.base_url,
+                semaphore=semaphore,
+                params=self._location_params(query),
+                timeout=timeout or self.timeout,
+                max_retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
+            )
+            return await asyncio.to_thread(
+                self._process_location_response, location_key, response
+            )
+        except httpx.HTTPError as e:
+            print(f"Erro na requisição à WeatherAPI.com: {e}")
+            return None
+        except Exception as e:
+            print(f"Erro inesperado ao processar dados da WeatherAPI.com: {e}")
+            return None
+
+    def _async_pool(self):
+        """
+        Cliente httpx e semáforo do event loop em execução. Ambos ficam ligados ao
+        loop em que foram criados, então são recriados quando o loop muda (ex.: um
+        asyncio.run() por chamada de backfill no mesmo processo).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = build_async_client(
+                self.async_concurrency, self.timeout
+            )
+            self._async_semaphore = asyncio.Semaphore(self.async_concurrency)
+            self._async_loop = loop
+        return self._async_client, self._async_semaphore
+
+    async def aclose(self):
+        """Fecha o pool de conexões assíncrono (se tiver sido criado neste loop)."""
+        client, loop = self._async_client, self._async_loop
+        self._async_client = None
+        self._async_semaphore = None
+        self._async_loop = None
+        # Um cliente de um loop já encerrado não pode mais ser fechado; é descartado
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    # --- Resolução de localizações ---
+
+    def search_locations(self, query):
+        """
+        Consulta o endpoint search.json da WeatherAPI.com e devolve a lista de
+        localizações encontradas (name, region, country, lat, lon).
+        Erros de requisição são propagados para o chamador.
+        """
+        response = request_with_retry(
+            self.session,
+            "GET",
+            self.search_url,
+            params={"key": self.api_key, "q": query},
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+            rate_limiter=self.rate_limiter,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def resolve_location(self, event_location):
+        """
+        Resolve o texto livre da localização para a localização canônica
+        (ResolvedLocation), ou None se não for encontrada ou a resolução falhar.
+        """
+        try:
+            return self._resolve(event_location)
+        except Exception as e:
+            print(f"Erro ao resolver a localização '{event_location}': {e}")
+            return None
+
+    def _resolve(self, event_location):
+        """Como resolve_location, mas propaga erros de banco/requisição."""
+        if self.cache.is_unknown_location(event_location):
+            return None
+        resolved = self.resolver.resolve(event_location, self.search_locations)
+        if resolved is None:
+            print(f"Localização não encontrada na WeatherAPI.com: {event_location}")
+            self.cache.set_unknown_location(event_location)
+        return resolved
+
+    def _location_key_and_query(self, event_location):
+        """
+        Retorna (chave de cache, parâmetro q) para a localização, ou None se ela for
+        sabidamente desconhecida. Se a resolução falhar, usa o próprio texto informado.
+        """
+        try:
+            resolved = self._resolve(event_location)
+        except Exception as e:
+            print(f"Erro ao resolver a localização '{event_location}': {e}")
+            return event_location, event_location
+        if resolved is None:
+            return None
+        return resolved.canonical_name, location_query(resolved)
+
+    async def _location_key_and_query_async(self, event_location):
+        resolved = self.resolver.resolve_cached(event_location)
+        if resolved is not None:
+            return resolved.canonical_name, location_query(resolved)
+        # Consulta ao banco/API de busca é síncrona; roda em uma thread
+        return await sync_to_async(self._location_key_and_query)(event_location)
+
+    # --- Auxiliares comuns às variantes síncrona e assíncrona ---
+
+    def _check_forecast_window(self, forecast_date):
+        if self.is_in_forecast_window(forecast_date):
+            return True
+        print(
+            f"Atenção: A WeatherAPI.com (plano gratuito) só fornece previsão para os próximos 3 dias."
+        )
+        print(f"A data do evento {forecast_date} está fora do período de cobertura.")
+        return False
+
+    def _window_dates(self):
+        today = datetime.date.today()
+        return [today + timedelta(days=i) for i in range(FORECAST_WINDOW_DAYS)]
+
+    def _cached_location_forecast(self, location_key):
+        """Retorna (encontrado, previsões) se todos os dias da janela estão no cache."""
+        cached = {}
+        for window_date in self._window_dates():
+            found, forecast = self.cache.get(location_key, window_date)
+            if not found:
+                return False, None
+            if forecast is not None:
+                cached[window_date] = forecast
+        return True, cached or None
+
+    def _location_params(self, query):
+        return {
             "key": self.api_key,
-            "q": query_location,
-            "days": num_days,
+            "q": query,
+            "days": FORECAST_WINDOW_DAYS,
             "aqi": "no",
             "alerts": "no",
         }
 
-        try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if (
-                not data
-                or "forecast" not in data
-                or "forecastday" not in data["forecast"]
-            ):
-                print(f"Resposta inesperada da WeatherAPI.com: {data}")
-                return None
-
-            daily_forecast_for_event = None
-            for daily_entry in data["forecast"]["forecastday"]:
-                entry_date_str = daily_entry["date"]
-                entry_date = datetime.datetime.strptime(
-                    entry_date_str, "%Y-%m-%d"
-                ).date()
-
-                if entry_date == forecast_date:
-                    daily_forecast_for_event = daily_entry["day"]
-                    break
-
-            if daily_forecast_for_event:
-                wind_speed_kph = daily_forecast_for_event.get("maxwind_kph")
-                wind_speed_mps = (
-                    round(wind_speed_kph / 3.6, 2)
-                    if wind_speed_kph is not None
-                    else None
-                )
-
-                return {
-                    "temperature": daily_forecast_for_event.get("avgtemp_c"),
-                    "min_temperature": daily_forecast_for_event.get("mintemp_c"),
-                    "max_temperature": daily_forecast_for_event.get("maxtemp_c"),
-                    "feels_like": daily_forecast_for_event.get("avgtemp_c"),
-                    "humidity": daily_forecast_for_event.get("avghumidity"),
-                    "pressure": None,
-                    "wind_speed": wind_speed_mps,
-                    "weather_main": daily_forecast_for_event["condition"].get("text"),
-                    "weather_description": daily_forecast_for_event["condition"].get(
-                        "text"
-                    ),
-                }
+    def _process_location_response(self, location_key, response):
+        """Valida a resposta (requests ou httpx), normaliza os dias e popula o cache."""
+        if response.status_code == 400 and self._is_unknown_location(response):
+            print(f"Localização não encontrada na WeatherAPI.com: {location_key}")
+            self.cache.set_unknown_location(location_key)
+            return None
+        response.raise_for_status()
+        data = response.json()
 
+        if not data or "forecast" not in data or "forecastday" not in data["forecast"]:
+            print(f"Resposta inesperada da WeatherAPI.com: {data}")
+            return None
+
+        forecasts = {}
+        for daily_entry in data["forecast"]["forecastday"]:
+            entry_date = datetime.datetime.strptime(
+                daily_entry["date"], "%Y-%m-%d"
+            ).date()
+            forecasts[entry_date] = self._normalize_daily_forecast(daily_entry["day"])
+            self.cache.set(location_key, entry_date, forecasts[entry_date])
+        return forecasts
+
+    def _pick_forecast_date(self, location_key, forecast_date, forecasts):
+        if forecasts is None:
+            return None
+
+        if forecast_date not in forecasts:
             print(
                 f"Previsão para {forecast_date} não encontrada na resposta da WeatherAPI.com."
             )
+            self.cache.set_negative(location_key, forecast_date)
             return None
+        return forecasts[forecast_date]
 
-        except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição à WeatherAPI.com: {e}")
-            return None
-        except Exception as e:
-            print(f"Erro inesperado ao processar dados da WeatherAPI.com: {e}")
-            return None
+    @staticmethod
+    def _is_unknown_location(response):
+        try:
+            error = response.json().get("error") or {}
+        except ValueError:
+            return False
+        return error.get("code") == UNKNOWN_LOCATION_ERROR_CODE
+
+    @staticmethod
+    def _normalize_daily_forecast(daily_forecast):
+        """Converte um item 'day' da WeatherAPI.com para os campos do WeatherRecord."""
+        wind_speed_kph = daily_forecast.get("maxwind_kph")
+        wind_speed_mps = (
+            round(wind_speed_kph / 3.6, 2) if wind_speed_kph is not None else None
+        )
+
+        return {
+            "temperature": daily_forecast.get("avgtemp_c"),
+            "min_temperature": daily_forecast.get("mintemp_c"),
+            "max_temperature": daily_forecast.get("maxtemp_c"),
+            "feels_like": daily_forecast.get("avgtemp_c"),
+            "humidity": daily_forecast.get("avghumidity"),
+            "pressure": None,
+            "wind_speed": wind_speed_mps,
+            "weather_main": daily_forecast["condition"].get("text"),
+            "weather_description": daily_forecast["condition"].get("text"),
+        }
+
+    @staticmethod
+    def _normalize_hourly_forecast(hourly_forecast):
+        """Converte um item 'hour' da WeatherAPI.com para as variáveis da série horária."""
+        wind_speed_kph = hourly_forecast.get("wind_kph")
+        return {
+            "forecast_time": datetime.datetime.fromtimestamp(
+                hourly_forecast["time_epoch"], tz=datetime.timezone.utc
+            ),
+            "temperature": hourly_forecast.get("temp_c"),
+            "feels_like": hourly_forecast.get("feelslike_c"),
+            "precipitation": hourly_forecast.get("precip_mm"),
+            "precipitation_probability": hourly_forecast.get("chance_of_rain"),
+            "humidity": hourly_forecast.get("humidity"),
+            "wind_speed": (
+                round(wind_speed_kph / 3.6, 2) if wind_speed_kph is not None else None
+            ),
+            "weather_code": (hourly_forecast.get("condition") or {}).get("code"),
+        }
 
 
 # Exemplo de uso (para testar diretamente este arquivo)
@@ -0,0 +1,83 @@
+# weather_data/async_http.py
+"""
+Equivalente assíncrono (httpx) de weather_data/http_session.py.
+
+Um httpx.AsyncClient mantém o pool de conexões compartilhado e um
+asyncio.Semaphore limita quantas requisições ficam em andamento ao mesmo tempo.
+A política de timeouts e retentativas é a mesma do cliente síncrono.
+"""
+import asyncio
+
+import httpx
+
+from weather_data.http_session import (
+    DEFAULT_BACKOFF_BASE,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_TIMEOUT,
+    RETRY_STATUS_CODES,
+    compute_backoff,
+    parse_retry_after,
+)
+
+DEFAULT_CONCURRENCY = 100
+
+
+def build_async_client(pool_size=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Cria um httpx.AsyncClient com pool keep-alive dimensionado para `pool_size`."""
+    connect_timeout, read_timeout = timeout
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
+
+async def async_request_with_retry(
+    client,
+    method,
+    url,
+    semaphore=None,
+    timeout=DEFAULT_TIMEOUT,
+    max_retries=DEFAULT_MAX_RETRIES,
+    backoff_base=DEFAULT_BACKOFF_BASE,
+    backoff_max=DEFAULT_BACKOFF_MAX,
+    rate_limiter=None,
+    **kwargs,
+):
+    """
+    Versão assíncrona de request_with_retry. O semáforo (se informado) é mantido
+    apenas durante a requisição, não durante a espera entre tentativas.
+    """
+    connect_timeout, read_timeout = timeout
+    request_timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async()
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    response = await client.request(
+                        method, url, timeout=request_timeout, **kwargs
+                    )
+            else:
+                response = await client.request(
+                    method, url, timeout=request_timeout, **kwargs
+                )
+        except httpx.TransportError:
+            if attempt >= max_retries:
+                raise
+            delay = compute_backoff(attempt, backoff_base, backoff_max)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return response
+            delay = compute_backoff(
+                attempt,
+                backoff_base,
+                backoff_max,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        await asyncio.sleep(delay)
+        attempt += 1
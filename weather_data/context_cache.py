@@ -0,0 +1,98 @@
+# weather_data/context_cache.py
+"""
+Cache do registro mais recente de cada evento, usado pelos endpoints de contexto
+(api/contexto_evento e a consulta do formulário) que são consultados em polling.
+
+As entradas ficam no cache do Django com alias "event_context" (compartilhado entre
+os workers e os comandos de ingestão), com a chave derivada do event_id. Cada
+entrada guarda o registro já serializado, o ETag derivado de (id, load_version,
+loaded_at) e o Last-Modified; a ausência de registro também é guardada. Quem grava
+uma nova versão chama invalidate_event_contexts após o commit, e o TTL
+(EVENT_CONTEXT_CACHE_TTL) limita o tempo de uma entrada desatualizada se alguma
+gravação escapar da invalidação.
+
+A chave da entrada inclui a geração do evento, um valor único trocado a cada
+invalidação. Uma leitura que começou antes da invalidação e termina depois dela
+grava o registro antigo na chave da geração anterior, que ninguém mais consulta,
+em vez de recolocá-lo no lugar da entrada removida.
+"""
+import hashlib
+import uuid
+
+from decouple import config
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = "event_context"
+
+
+def _digest(event_id):
+    return hashlib.sha1(event_id.encode("utf-8")).hexdigest()
+
+
+def _generation_key(event_id):
+    return f"event_context_generation:{_digest(event_id)}"
+
+
+def _key(event_id, generation):
+    return f"event_context:{_digest(event_id)}:{generation}"
+
+
+def _new_generation():
+    # Valor nunca usado antes: continua válido se a chave da geração for descartada
+    # pelo cache (MAX_ENTRIES) e recriada
+    return uuid.uuid4().hex
+
+
+def _current_generation(cache, event_id):
+    generation_key = _generation_key(event_id)
+    generation = cache.get(generation_key)
+    if generation is None:
+        generation = _new_generation()
+        if not cache.add(generation_key, generation, timeout=None):
+            # Outro processo criou (ou invalidou) a geração ao mesmo tempo
+            generation = cache.get(generation_key, generation)
+    return generation
+
+
+def record_etag(record):
+    """ETag forte a partir de id, load_version e loaded_at do registro serializado."""
+    return '"{}-{}-{}"'.format(
+        record["id"], record["load_version"], record["loaded_at"].timestamp()
+    )
+
+
+def get_event_context(event_id, loader):
+    """
+    Retorna a entrada do evento: {"data": registro ou None, "etag", "last_modified"}.
+    Em caso de falta no cache, `loader(event_id)` busca o registro mais recente
+    (dict com id, load_version e loaded_at, ou None) e a entrada é guardada.
+    """
+    cache = caches[CACHE_ALIAS]
+    # A geração é lida antes do banco: uma invalidação no meio troca a geração
+    key = _key(event_id, _current_generation(cache, event_id))
+    entry = cache.get(key)
+    if entry is None:
+        record = loader(event_id)
+        entry = {
+            "data": record,
+            "etag": record_etag(record) if record else None,
+            "last_modified": record["loaded_at"] if record else None,
+        }
+        cache.set(key, entry, config("EVENT_CONTEXT_CACHE_TTL", default=300, cast=int))
+    return entry
+
+
+def invalidate_event_contexts(event_ids):
+    """
+    Troca a geração dos eventos, tornando as entradas atuais inacessíveis (expiram
+    pelo TTL). Dentro de uma transação a troca acontece após o commit, quando a
+    nova versão já está visível para as próximas leituras.
+    """
+    generation_keys = sorted({_generation_key(event_id) for event_id in event_ids})
+    if generation_keys:
+        transaction.on_commit(
+            lambda: caches[CACHE_ALIAS].set_many(
+                {key: _new_generation() for key in generation_keys}, timeout=None
+            )
+        )
@@ -0,0 +1,172 @@
+# weather_data/forecast_cache.py
+"""
+Cache de previsões em duas camadas na frente do WeatherApiClient.
+
+1. LRU em memória (por processo), limitado em número de entradas.
+2. Camada compartilhada via cache do Django (alias "weather_forecast"), vista por
+   todos os workers do gunicorn e pelo comando de ingestão.
+
+As chaves são (localização normalizada, data). Também guardamos entradas
+negativas de curta duração (localização desconhecida, data ausente na resposta)
+para que consultas inválidas repetidas não voltem a chamar a API.
+"""
+import datetime
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from decouple import config
+
+from weather_data.locations import fold_location_name
+
+SHARED_CACHE_ALIAS = "weather_forecast"
+
+# Marcador para entradas negativas (não há previsão para a chave)
+NEGATIVE = "__negative__"
+# "Data" usada para marcar a localização inteira como desconhecida
+UNKNOWN_LOCATION = "*"
+
+
+def normalize_location(location):
+    """Normaliza a localização para uso como chave (acentos, espaços e caixa)."""
+    return fold_location_name(location)
+
+
+def forecast_ttl(forecast_date, today=None):
+    """
+    TTL de uma previsão positiva. Previsões do dia corrente mudam com mais frequência
+    que as dos dias seguintes, e nenhuma entrada sobrevive ao fim do próprio dia.
+    """
+    today = today or datetime.date.today()
+    if forecast_date <= today:
+        ttl = config("WEATHER_CACHE_TTL_TODAY", default=900, cast=int)
+    else:
+        ttl = config("WEATHER_CACHE_TTL_AHEAD", default=3600, cast=int)
+
+    end_of_day = datetime.datetime.combine(
+        forecast_date + datetime.timedelta(days=1), datetime.time.min
+    )
+    seconds_left = int((end_of_day - datetime.datetime.now()).total_seconds())
+    return max(1, min(ttl, seconds_left))
+
+
+class ForecastCache:
+    def __init__(self, max_entries=1024, shared_alias=SHARED_CACHE_ALIAS):
+        self.max_entries = max_entries
+        self.shared_alias = shared_alias
+        self.negative_ttl = config("WEATHER_CACHE_NEGATIVE_TTL", default=300, cast=int)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared(self):
+        """Retorna o cache compartilhado do Django, ou None fora de um projeto configurado."""
+        try:
+            from django.core.cache import caches
+            from django.core.cache.backends.base import InvalidCacheBackendError
+            from django.core.exceptions import ImproperlyConfigured
+
+            try:
+                return caches[self.shared_alias]
+            except (InvalidCacheBackendError, ImproperlyConfigured):
+                return None
+        except ImportError:
+            return None
+
+    @staticmethod
+    def _key(location, forecast_date):
+        digest = hashlib.sha1(normalize_location(location).encode("utf-8")).hexdigest()
+        day = (
+            forecast_date
+            if forecast_date == UNKNOWN_LOCATION
+            else forecast_date.isoformat()
+        )
+        return f"forecast:{digest}:{day}"
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        shared = self._shared()
+        if shared is None:
+            return None
+        entry = shared.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+        # Mantém uma cópia local válida apenas pelo tempo restante no cache compartilhado
+        self._set_local(key, value, remaining)
+        return value
+
+    def _store(self, key, value, ttl):
+        self._set_local(key, value, ttl)
+        shared = self._shared()
+        if shared is not None:
+            shared.set(key, (time.time() + ttl, value), ttl)
+
+    def get(self, location, forecast_date):
+        """
+        Retorna (encontrado, previsão). `encontrado` é True também para entradas
+        negativas, caso em que a previsão é None.
+        """
+        if self.is_unknown_location(location):
+            return True, None
+        value = self._lookup(self._key(location, forecast_date))
+        if value is None:
+            return False, None
+        if value == NEGATIVE:
+            return True, None
+        return True, value
+
+    def set(self, location, forecast_date, forecast):
+        self._store(
+            self._key(location, forecast_date), forecast, forecast_ttl(forecast_date)
+        )
+
+    def set_negative(self, location, forecast_date):
+        """Registra que não há previsão para a data nesta localização."""
+        self._store(self._key(location, forecast_date), NEGATIVE, self.negative_ttl)
+
+    def is_unknown_location(self, location):
+        return self._lookup(self._key(location, UNKNOWN_LOCATION)) == NEGATIVE
+
+    def set_unknown_location(self, location):
+        """Registra que a API não reconhece a localização (qualquer data)."""
+        self._store(self._key(location, UNKNOWN_LOCATION), NEGATIVE, self.negative_ttl)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_forecast_cache():
+    """Instância única por processo, compartilhada por todos os WeatherApiClient."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ForecastCache(
+                max_entries=config("WEATHER_CACHE_MAX_ENTRIES", default=1024, cast=int)
+            )
+        return _default_cache
@@ -0,0 +1,126 @@
+# weather_data/http_session.py
+"""
+Sessão HTTP compartilhada para as APIs de clima (WeatherAPI.com e Open-Meteo).
+
+Concentra o pool de conexões keep-alive, os timeouts padrão e a política de
+retentativas com backoff exponencial (com jitter) para respostas 429/5xx.
+Este módulo não depende do Django, para que o script data_ingestion/weather_ingestor.py
+também possa reutilizá-lo.
+"""
+import datetime
+import email.utils
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status HTTP que indicam falha temporária no servidor ou limite de requisições
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) em segundos
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+_shared_sessions = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def build_session(pool_size=DEFAULT_POOL_SIZE):
+    """Cria uma requests.Session com pool de conexões keep-alive do tamanho informado."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_shared_session(name, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Retorna a sessão compartilhada do processo para o provedor `name`, criando-a
+    na primeira chamada. Assim, instâncias criadas por requisição (como nas views)
+    reaproveitam as mesmas conexões abertas.
+    """
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(name)
+        if session is None:
+            session = build_session(pool_size)
+            _shared_sessions[name] = session
+        return session
+
+
+def parse_retry_after(value):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+def compute_backoff(
+    attempt,
+    backoff_base=DEFAULT_BACKOFF_BASE,
+    backoff_max=DEFAULT_BACKOFF_MAX,
+    retry_after=None,
+):
+    """
+    Calcula a espera antes da próxima tentativa: backoff exponencial com "full jitter",
+    ou o valor de Retry-After quando o servidor o informa (limitado a backoff_max).
+    """
+    if retry_after is not None:
+        return min(retry_after, backoff_max)
+    return random.uniform(0, min(backoff_max, backoff_base * (2**attempt)))
+
+
+def request_with_retry(
+    session,
+    method,
+    url,
+    timeout=DEFAULT_TIMEOUT,
+    max_retries=DEFAULT_MAX_RETRIES,
+    backoff_base=DEFAULT_BACKOFF_BASE,
+    backoff_max=DEFAULT_BACKOFF_MAX,
+    rate_limiter=None,
+    **kwargs,
+):
+    """
+    Executa a requisição com timeout e retentativas em erros de conexão, timeouts
+    e respostas 429/5xx. A última resposta (ou exceção) é devolvida ao chamador,
+    que continua responsável por chamar raise_for_status().
+    Com `rate_limiter`, cada tentativa espera por um token do limitador compartilhado.
+    """
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= max_retries:
+                raise
+            delay = compute_backoff(attempt, backoff_base, backoff_max)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return response
+            delay = compute_backoff(
+                attempt,
+                backoff_base,
+                backoff_max,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+            response.close()
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,205 @@
+# weather_data/ingestion.py
+"""
+Gravação das previsões obtidas pelo WeatherApiClient no WeatherRecord.
+
+Usado pelo comando ingest_weather (evento único e modo --from-file): cada bloco de
+resultados é gravado com bulk_create em uma única transação, com as versões
+atribuídas em lote por weather_data.versioning. Previsões idênticas à última
+versão gravada geram apenas um log UNCHANGED, sem nova linha no WeatherRecord.
+As previsões hora a hora (ingest_weather --hourly) vão para o WeatherSeries, uma
+linha por versão com todas as horas empacotadas (weather_data.series).
+Os logs da carga são entregues ao LoadLogSink (weather_data.log_sink), que os grava
+em lote depois do commit. Cada nova versão invalida o cache dos endpoints de
+contexto do evento (weather_data.context_cache).
+"""
+import re
+
+from django.db import transaction
+
+from weather_data.context_cache import invalidate_event_contexts
+from weather_data.log_sink import get_default_log_sink
+from weather_data.models import WeatherLoadLog, WeatherRecord, WeatherSeries
+from weather_data.series import HOURLY_VARIABLES, pack_samples, series_fingerprint
+from weather_data.versioning import (
+    assign_load_versions,
+    forecast_fingerprint,
+    version_key,
+)
+
+DEFAULT_API_SOURCE = "WeatherAPI.com"
+
+# Situação de cada resultado gravado (mesmos valores do log_level do WeatherLoadLog)
+SUCCESS = "SUCCESS"
+UNCHANGED = "UNCHANGED"
+ERROR = "ERROR"
+
+
+def build_event_id(event_name, city_name, event_date):
+    """
+    ID do evento no formato NOME_CIDADE_AAAAMMDD (ex: EDUARDOCOSTA_CUIABA_20250810).
+    Usa a cidade como informada, mantendo apenas [a-zA-Z0-9] ("São Paulo" ->
+    "SOPAULO"): é a mesma regra dos IDs já gravados, que não podem mudar.
+    """
+    sanitized_event_name = re.sub(r"[^a-zA-Z0-9]", "", event_name).upper()
+    sanitized_city = re.sub(r"[^a-zA-Z0-9]", "", city_name).upper()
+    return f"{sanitized_event_name}_{sanitized_city}_{event_date.strftime('%Y%m%d')}"
+
+
+def persist_forecasts(results, api_source=DEFAULT_API_SOURCE):
+    """
+    Grava uma lista de (evento, previsão normalizada) e os respectivos logs.
+    O evento é um dicionário com event_id, event_name, city e event_date; previsão
+    None gera apenas um log de ERROR.
+    Retorna uma lista de (situação, versão) alinhada com `results`; a versão é
+    None para ERROR e UNCHANGED.
+    """
+    records = []
+    logs = []
+    outcomes = []
+
+    with transaction.atomic():
+        successful = [
+            (event, forecast_fingerprint(weather_data_raw))
+            for event, weather_data_raw in results
+            if weather_data_raw
+        ]
+        new_versions = iter(
+            assign_load_versions(
+                [
+                    version_key(event["event_id"], event["city"], event["event_date"])
+                    for event, _ in successful
+                ],
+                [content_hash for _, content_hash in successful],
+            )
+        )
+        content_hashes = iter(content_hash for _, content_hash in successful)
+
+        for event, weather_data_raw in results:
+            event_date_str = event["event_date"].isoformat()
+            if not weather_data_raw:
+                outcomes.append((ERROR, None))
+                logs.append(
+                    WeatherLoadLog(
+                        event_id=event["event_id"],
+                        log_level=ERROR,
+                        message=f"Não foi possível obter dados meteorológicos para {event['city']} em {event_date_str}.",
+                        event_name=event["event_name"],
+                        event_location=event["city"],
+                        event_date=event["event_date"],
+                        data_imported_count=0,
+                    )
+                )
+                continue
+
+            new_version = next(new_versions)
+            content_hash = next(content_hashes)
+            if new_version is None:
+                outcomes.append((UNCHANGED, None))
+                logs.append(
+                    WeatherLoadLog(
+                        event_id=event["event_id"],
+                        log_level=UNCHANGED,
+                        message=f"Previsão para {event['city']} em {event_date_str} sem alterações desde a última versão.",
+                        event_name=event["event_name"],
+                        event_location=event["city"],
+                        event_date=event["event_date"],
+                        data_imported_count=0,
+                        unchanged_count=1,
+                    )
+                )
+                continue
+
+            outcomes.append((SUCCESS, new_version))
+            records.append(
+                WeatherRecord(
+                    event_id=event["event_id"],
+                    event_name=event["event_name"],
+                    event_location=event["city"],
+                    event_date=event["event_date"],
+                    temperature=weather_data_raw.get("temperature"),
+                    feels_like=weather_data_raw.get("feels_like"),
+                    min_temperature=weather_data_raw.get("min_temperature"),
+                    max_temperature=weather_data_raw.get("max_temperature"),
+                    humidity=weather_data_raw.get("humidity"),
+                    pressure=weather_data_raw.get("pressure"),
+                    wind_speed=weather_data_raw.get("wind_speed"),
+                    weather_main=weather_data_raw.get("weather_main"),
+                    weather_description=weather_data_raw.get("weather_description"),
+                    api_source=api_source,
+                    content_hash=content_hash,
+                    load_version=new_version,
+                )
+            )
+            logs.append(
+                WeatherLoadLog(
+                    event_id=event["event_id"],
+                    log_level=SUCCESS,
+                    message=f"Dados para {event['city']} em {event_date_str} ingeridos com sucesso. Versão: {new_version}",
+                    event_name=event["event_name"],
+                    event_location=event["city"],
+                    event_date=event["event_date"],
+                    data_imported_count=1,
+                )
+            )
+
+        WeatherRecord.objects.bulk_create(records)
+        invalidate_event_contexts(record.event_id for record in records)
+        get_default_log_sink().emit_many(logs)
+
+    return outcomes
+
+
+def persist_hourly_forecast(event, hours, api_source=DEFAULT_API_SOURCE):
+    """
+    Grava as horas da janela do evento (lista devolvida por
+    WeatherApiClient.get_hourly_forecast) como uma versão do WeatherSeries e o log
+    da carga. Como em persist_forecasts, uma série idêntica à última versão gera
+    apenas um log UNCHANGED, e `hours` vazio ou None gera um log de ERROR.
+    Retorna (situação, versão).
+    """
+    event_date_str = event["event_date"].isoformat()
+    log = WeatherLoadLog(
+        event_id=event["event_id"],
+        event_name=event["event_name"],
+        event_location=event["city"],
+        event_date=event["event_date"],
+        data_imported_count=0,
+    )
+    if not hours:
+        log.log_level = ERROR
+        log.message = f"Não foi possível obter a previsão horária para {event['city']} em {event_date_str}."
+        get_default_log_sink().emit(log)
+        return ERROR, None
+
+    start_time, length, data = pack_samples(hours, HOURLY_VARIABLES)
+    content_hash = series_fingerprint(start_time, 3600, data)
+    with transaction.atomic():
+        (new_version,) = assign_load_versions(
+            [version_key(event["event_id"], event["city"], event["event_date"])],
+            [content_hash],
+            model=WeatherSeries,
+        )
+        if new_version is None:
+            log.log_level = UNCHANGED
+            log.message = f"Previsão horária para {event['city']} em {event_date_str} sem alterações desde a última versão."
+            log.unchanged_count = 1
+            get_default_log_sink().emit(log)
+            return UNCHANGED, None
+
+        WeatherSeries.objects.create(
+            event_id=event["event_id"],
+            event_location=event["city"],
+            event_date=event["event_date"],
+            start_time=start_time,
+            step_seconds=3600,
+            length=length,
+            data=data,
+            api_source=api_source,
+            content_hash=content_hash,
+            load_version=new_version,
+        )
+        log.log_level = SUCCESS
+        log.message = f"Previsão horária para {event['city']} em {event_date_str} ingerida com sucesso: {len(hours)} horas. Versão: {new_version}"
+        log.data_imported_count = len(hours)
+        get_default_log_sink().emit(log)
+    return SUCCESS, new_version
@@ -0,0 +1,294 @@
+# weather_data/jobs.py
+"""
+Fila de ingestão no PostgreSQL (tabela IngestionJob).
+
+Produtores (ingest_weather --enqueue, weather_scheduler --enqueue) registram um job
+por (localização, data); eventos da mesma cidade e data são agrupados no job já
+pendente. Os workers (`manage.py weather_worker`) pegam lotes de jobs com
+SELECT ... FOR UPDATE SKIP LOCKED, então vários processos (ou máquinas) consomem a
+fila sem disputar as mesmas linhas. Cada job pego recebe um lease: se o worker
+morrer, o job volta a ficar disponível quando o lease expira. Falhas são repetidas
+com backoff até max_attempts, quando o job fica como FAILED para inspeção.
+"""
+import datetime
+import logging
+import os
+import socket
+
+from django.db import IntegrityError, InterfaceError, OperationalError
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from weather_data.api_client import WeatherApiClient
+from weather_data.http_session import compute_backoff
+from weather_data.ingestion import persist_forecasts
+from weather_data.models import IngestionJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+FAILED = "FAILED"
+
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_LEASE_SECONDS = 300
+# Espera entre tentativas de um job (backoff exponencial com jitter, em segundos)
+RETRY_BACKOFF_BASE = 30
+RETRY_BACKOFF_MAX = 3600
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# --- Produtores ---
+
+
+def _enqueue_job(event_location, event_date, job_events, run_after):
+    """Cria o job pendente da chave ou acrescenta os eventos ao que já existe."""
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                # FOR UPDATE: um worker não pega o job enquanto os eventos são anexados
+                job = (
+                    IngestionJob.objects.select_for_update()
+                    .filter(
+                        status=PENDING,
+                        event_location=event_location,
+                        event_date=event_date,
+                    )
+                    .first()
+                )
+                if job is not None:
+                    known_ids = {event["event_id"] for event in job.events}
+                    new_events = [
+                        event
+                        for event in job_events
+                        if event["event_id"] not in known_ids
+                    ]
+                    if new_events:
+                        job.events = job.events + new_events
+                        job.save(update_fields=["events", "updated_at"])
+                    return False
+                IngestionJob.objects.create(
+                    event_location=event_location,
+                    event_date=event_date,
+                    events=job_events,
+                    run_after=run_after or timezone.now(),
+                )
+                return True
+        except IntegrityError:
+            # Outro produtor criou o job pendente ao mesmo tempo: anexa a ele
+            if attempt:
+                raise
+    return False
+
+
+def enqueue_events(events, run_after=None):
+    """
+    Enfileira eventos (dicionários com event_id, event_name, city e event_date),
+    um job por (city, event_date). Retorna quantos jobs novos foram criados.
+    """
+    events_by_key = {}
+    for event in events:
+        job_events = events_by_key.setdefault((event["city"], event["event_date"]), [])
+        job_event = {"event_id": event["event_id"], "event_name": event["event_name"]}
+        if job_event not in job_events:
+            job_events.append(job_event)
+
+    created_count = 0
+    for (event_location, event_date), job_events in events_by_key.items():
+        if _enqueue_job(event_location, event_date, job_events, run_after):
+            created_count += 1
+    return created_count
+
+
+# --- Workers ---
+
+
+def claim_jobs(
+    worker_id, limit=DEFAULT_BATCH_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS
+):
+    """
+    Pega até `limit` jobs disponíveis (pendentes e vencidos, ou com lease expirado)
+    e os marca como RUNNING para este worker.
+    """
+    now = timezone.now()
+    leased_until = now + datetime.timedelta(seconds=lease_seconds)
+    with transaction.atomic():
+        jobs = list(
+            IngestionJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=PENDING, run_after__lte=now)
+                | Q(status=RUNNING, leased_until__lt=now)
+            )
+            .order_by("run_after")[:limit]
+        )
+        if not jobs:
+            return []
+        IngestionJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=RUNNING,
+            leased_until=leased_until,
+            locked_by=worker_id,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+    for job in jobs:
+        job.status = RUNNING
+        job.leased_until = leased_until
+        job.locked_by = worker_id
+        job.attempts += 1
+    return jobs
+
+
+def _job_results(job, forecasts):
+    return [
+        (
+            {
+                "event_id": event["event_id"],
+                "event_name": event["event_name"],
+                "city": job.event_location,
+                "event_date": job.event_date,
+            },
+            forecasts.get(job.event_date),
+        )
+        for event in job.events
+    ]
+
+
+def _fail_job(job, worker_id, error):
+    """Falha definitiva: grava os logs de ERROR dos eventos e marca o job como FAILED."""
+    logger.error(
+        f"Job {job.pk} ({job.event_location}, {job.event_date}) falhou: {error}"
+    )
+    persist_forecasts(_job_results(job, {}))
+    IngestionJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status=FAILED, leased_until=None, last_error=error, updated_at=timezone.now()
+    )
+
+
+def _retry_job(job, worker_id, error):
+    """Devolve o job à fila com backoff, ou o marca como FAILED após max_attempts."""
+    if job.attempts >= job.max_attempts:
+        _fail_job(job, worker_id, error)
+        return
+    delay = compute_backoff(job.attempts - 1, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IngestionJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+                status=PENDING,
+                leased_until=None,
+                locked_by=None,
+                last_error=error,
+                run_after=now + datetime.timedelta(seconds=delay),
+                updated_at=now,
+            )
+    except IntegrityError:
+        # Já existe outro job pendente para a mesma chave: os eventos vão para ele
+        enqueue_events(
+            [
+                {
+                    "event_id": event["event_id"],
+                    "event_name": event["event_name"],
+                    "city": job.event_location,
+                    "event_date": job.event_date,
+                }
+                for event in job.events
+            ]
+        )
+        IngestionJob.objects.filter(pk=job.pk, locked_by=worker_id).delete()
+
+
+def process_job(client, job, worker_id):
+    """
+    Busca a previsão do job e grava os eventos. Jobs concluídos são removidos da
+    fila (o histórico fica no WeatherLoadLog). Retorna True em caso de sucesso.
+    """
+    if job.attempts > job.max_attempts:
+        _fail_job(job, worker_id, "Lease expirado após o número máximo de tentativas.")
+        return False
+    if not client.is_in_forecast_window(job.event_date):
+        _fail_job(job, worker_id, "Data fora da janela de previsão.")
+        return False
+
+    try:
+        forecasts = client.get_location_forecast(job.event_location)
+        error = "Não foi possível obter a previsão da WeatherAPI.com."
+    except Exception as e:
+        forecasts = None
+        error = f"Erro inesperado ao buscar previsão: {e}"
+    if forecasts is None:
+        _retry_job(job, worker_id, error)
+        return False
+
+    persist_forecasts(_job_results(job, forecasts))
+    IngestionJob.objects.filter(pk=job.pk, locked_by=worker_id).delete()
+    return True
+
+
+def _handle_job_error(job, worker_id, error):
+    """
+    Erro inesperado ao processar um job já pego (ex.: IntegrityError ou DataError ao
+    gravar): o job volta para a fila com backoff (ou fica FAILED após max_attempts)
+    e o worker segue com o restante do lote.
+    """
+    logger.error(
+        f"Erro ao processar o job {job.pk} ({job.event_location}, {job.event_date}) "
+        f"no worker {worker_id}: {error}",
+        exc_info=error,
+    )
+    if isinstance(error, (OperationalError, InterfaceError)):
+        # Conexão perdida: descarta para reconectar antes de devolver o job
+        connection.close()
+    try:
+        _retry_job(job, worker_id, f"Erro ao processar o job: {error}")
+    except Exception as e:
+        # O job fica com o lease e volta para a fila quando ele expirar
+        logger.error(f"Não foi possível devolver o job {job.pk} para a fila: {e}")
+        if isinstance(e, (OperationalError, InterfaceError)):
+            connection.close()
+
+
+def run_worker(
+    stop_event,
+    worker_id=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+    poll_interval=2.0,
+    burst=False,
+    client=None,
+):
+    """
+    Laço de um worker: pega lotes de jobs até `stop_event` ser sinalizado. Com
+    `burst`, termina quando a fila estiver vazia. Retorna (concluídos, falhas).
+    """
+    worker_id = worker_id or default_worker_id()
+    client = client or WeatherApiClient()
+    done_count = 0
+    failed_count = 0
+    while not stop_event.is_set():
+        try:
+            jobs = claim_jobs(worker_id, batch_size, lease_seconds)
+        except (OperationalError, InterfaceError) as e:
+            # Conexão perdida: descarta para reconectar na próxima volta
+            logger.error(f"Erro de banco de dados no worker {worker_id}: {e}")
+            connection.close()
+            jobs = []
+        for job in jobs:
+            try:
+                succeeded = process_job(client, job, worker_id)
+            except Exception as e:
+                # Um job com problema não derruba o worker nem o resto do lote
+                _handle_job_error(job, worker_id, e)
+                succeeded = False
+            if succeeded:
+                done_count += 1
+            else:
+                failed_count += 1
+        if not jobs:
+            if burst:
+                break
+            stop_event.wait(poll_interval)
+    return done_count, failed_count
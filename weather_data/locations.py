@@ -0,0 +1,124 @@
+# weather_data/locations.py
+"""
+Resolução e canonicalização de localizações.
+
+O texto livre de event_location ("Cuiaba, Brazil", "CUIABÁ", "cuiaba") é normalizado
+(acentos, caixa e espaços) e resolvido uma única vez na WeatherAPI.com. O resultado
+fica nas tabelas Location/LocationAlias e em um índice em memória, para que clientes,
+chaves de cache e linhas do WeatherRecord usem sempre o mesmo nome canônico.
+"""
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+from decimal import Decimal
+
+ResolvedLocation = namedtuple(
+    "ResolvedLocation", ["canonical_name", "name", "latitude", "longitude"]
+)
+
+
+def fold_location_name(location):
+    """
+    Normaliza o texto da localização para comparação: remove acentos, ignora
+    caixa, pontuação e espaços repetidos ("  Cuiabá,  Brazil " -> "cuiaba brazil").
+    """
+    decomposed = unicodedata.normalize("NFKD", str(location))
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", without_accents.casefold()).split())
+
+
+def location_query(resolved):
+    """Parâmetro `q` da WeatherAPI.com para uma localização resolvida (lat,lon)."""
+    return f"{resolved.latitude},{resolved.longitude}"
+
+
+class LocationResolver:
+    def __init__(self):
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def resolve_cached(self, location):
+        """Consulta apenas o índice em memória (seguro em contextos assíncronos)."""
+        with self._lock:
+            return self._index.get(fold_location_name(location))
+
+    def resolve(self, location, search):
+        """
+        Resolve a localização usando, nesta ordem, o índice em memória, a tabela
+        LocationAlias e, por fim, `search(texto)`, que deve devolver a lista de
+        resultados do endpoint search.json da WeatherAPI.com.
+        Retorna um ResolvedLocation ou None se a localização não for encontrada.
+        """
+        alias = fold_location_name(location)
+        if not alias:
+            return None
+
+        resolved = self.resolve_cached(location)
+        if resolved is not None:
+            return resolved
+
+        resolved = self._resolve_from_db(alias)
+        if resolved is None:
+            results = search(location)
+            if not results:
+                return None
+            resolved = self._store(alias, results[0])
+
+        with self._lock:
+            self._index[alias] = resolved
+            self._index[fold_location_name(resolved.canonical_name)] = resolved
+        return resolved
+
+    @staticmethod
+    def _to_resolved(location):
+        return ResolvedLocation(
+            location.canonical_name,
+            location.name,
+            location.latitude,
+            location.longitude,
+        )
+
+    def _resolve_from_db(self, alias):
+        from weather_data.models import LocationAlias
+
+        alias_row = (
+            LocationAlias.objects.select_related("location").filter(alias=alias).first()
+        )
+        return self._to_resolved(alias_row.location) if alias_row else None
+
+    def _store(self, alias, result):
+        """Grava a localização devolvida pela API (ou reaproveita a existente) e o alias."""
+        from weather_data.models import Location, LocationAlias
+
+        parts = [result.get("name"), result.get("region"), result.get("country")]
+        canonical_name = ", ".join(part for part in parts if part)
+        location, _ = Location.objects.get_or_create(
+            canonical_name=canonical_name,
+            defaults={
+                "name": result.get("name") or canonical_name,
+                "region": result.get("region") or None,
+                "country": result.get("country") or None,
+                "latitude": round(Decimal(str(result["lat"])), 6),
+                "longitude": round(Decimal(str(result["lon"])), 6),
+            },
+        )
+        # Registra também o próprio nome canônico como alias
+        for name in {alias, fold_location_name(canonical_name)}:
+            LocationAlias.objects.get_or_create(
+                alias=name, defaults={"location": location}
+            )
+        return self._to_resolved(location)
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_default_location_resolver():
+    """Instância única por processo, compartilhada por todos os WeatherApiClient."""
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = LocationResolver()
+        return _default_resolver
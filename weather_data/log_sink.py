@@ -0,0 +1,248 @@
+# weather_data/log_sink.py
+"""
+Gravação em segundo plano do WeatherLoadLog.
+
+Em vez de um INSERT por log no caminho da ingestão e do save_weather_data, os logs
+são entregues ao LoadLogSink: ficam em um buffer em memória e um thread os grava com
+bulk_create quando o lote atinge WEATHER_LOG_BATCH_SIZE ou quando o log mais antigo
+espera WEATHER_LOG_FLUSH_INTERVAL segundos, e uma última vez quando o processo
+termina (atexit). Logs emitidos dentro de uma transação só entram no buffer depois
+do commit, então uma transação desfeita não deixa log.
+
+O buffer é limitado a WEATHER_LOG_MAX_BUFFER logs. Cheio, vale a política
+WEATHER_LOG_OVERFLOW_POLICY: "block" faz o produtor esperar até
+WEATHER_LOG_BLOCK_TIMEOUT segundos por espaço (backpressure) e descarta o log se o
+tempo acabar; "drop" descarta na hora. Descartes são contados e registrados no
+logger. Com WEATHER_LOG_BUFFERED=False, ou depois que o sink foi fechado, os logs
+são gravados na hora no thread de quem os emitiu, e um erro do bulk_create chega a
+ele como no INSERT direto (a conexão, que pode estar em um atomic() do chamador,
+não é tocada). No thread do sink, um erro de conexão é repetido uma vez com uma
+conexão nova; outros erros (ex.: IntegrityError) descartam o lote na hora.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from decouple import config
+from django.db import InterfaceError, OperationalError, connection, transaction
+
+from weather_data.models import WeatherLoadLog
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+DROP = "drop"
+
+
+class LoadLogSink:
+    def __init__(
+        self,
+        batch_size=200,
+        flush_interval=2.0,
+        max_buffer=10000,
+        overflow_policy=BLOCK,
+        block_timeout=5.0,
+        buffered=True,
+    ):
+        if overflow_policy not in (BLOCK, DROP):
+            raise ValueError(
+                f"Política de buffer cheio desconhecida: {overflow_policy}"
+            )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.buffered = buffered
+        self.written_count = 0
+        self.write_count = 0  # comandos bulk_create bem-sucedidos
+        self.dropped_count = 0
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0  # logs retirados do buffer e ainda não gravados
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+
+    def emit(self, log):
+        """Entrega um WeatherLoadLog (não salvo) para gravação."""
+        self.emit_many([log])
+
+    def emit_many(self, logs):
+        """Entrega vários WeatherLoadLog; dentro de uma transação, só após o commit."""
+        logs = list(logs)
+        if logs:
+            # Fora de transação, on_commit executa na hora
+            transaction.on_commit(lambda: self._enqueue(logs))
+
+    def flush(self, timeout=None):
+        """Grava o que está no buffer e espera a gravação terminar."""
+        if not self.buffered:
+            return True
+        with self._condition:
+            if self._thread is None:
+                return not self._buffer
+            self._flush_requested = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(
+                lambda: not self._buffer and not self._in_flight, timeout
+            )
+            self._flush_requested = False
+            return done
+
+    def close(self, timeout=10.0):
+        """Grava os logs pendentes e encerra o thread de gravação."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "buffered": len(self._buffer) + self._in_flight,
+                "written": self.written_count,
+                "writes": self.write_count,
+                "dropped": self.dropped_count,
+            }
+
+    def _enqueue(self, logs):
+        if self.buffered and self._buffer_logs(logs):
+            return
+        # Gravação no thread do chamador: erros são propagados, sem nova tentativa
+        self._count_written(WeatherLoadLog.objects.bulk_create(logs))
+
+    def _buffer_logs(self, logs):
+        """
+        Coloca os logs no buffer. Retorna False se o sink já foi fechado: nenhum
+        thread vai esvaziar o buffer, então o chamador grava os logs na hora.
+        """
+        dropped = 0
+        with self._condition:
+            if self._closed:
+                return False
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="weather-load-log-sink", daemon=True
+                )
+                self._thread.start()
+            for log in logs:
+                if len(self._buffer) >= self.max_buffer and not self._wait_for_space():
+                    dropped += 1
+                    continue
+                self._buffer.append(log)
+            self.dropped_count += dropped
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+        if dropped:
+            logger.warning(
+                f"Buffer de logs de carga cheio: {dropped} logs descartados."
+            )
+        return True
+
+    def _wait_for_space(self):
+        """Com a política "block", espera o thread liberar espaço no buffer."""
+        if self.overflow_policy == DROP or self._closed or self._thread is None:
+            return False
+        self._condition.notify_all()
+        return self._condition.wait_for(
+            lambda: len(self._buffer) < self.max_buffer, self.block_timeout
+        )
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not (
+                    self._closed
+                    or self._flush_requested
+                    or len(self._buffer) >= self.batch_size
+                ):
+                    # Espera o lote encher ou o intervalo passar
+                    self._condition.wait(self.flush_interval)
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(len(self._buffer), self.batch_size))
+                ]
+                if not batch and self._closed:
+                    break
+                self._in_flight = len(batch)
+            if batch:
+                self._write(batch)
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+        connection.close()
+
+    def _write(self, logs):
+        """Grava um lote no thread do sink; só erros de conexão são repetidos."""
+        for attempt in range(2):
+            try:
+                self._count_written(WeatherLoadLog.objects.bulk_create(logs))
+                return
+            except (OperationalError, InterfaceError) as e:
+                # Descarta a conexão do thread do sink; a próxima tentativa reconecta
+                connection.close()
+                error = e
+                if attempt == 0:
+                    logger.warning(
+                        f"Erro ao gravar {len(logs)} logs de carga, tentando de novo: {e}"
+                    )
+            except Exception as e:
+                # Erro nos dados (ex.: IntegrityError): repetir não adianta
+                error = e
+                break
+        logger.error(f"Erro ao gravar {len(logs)} logs de carga: {error}")
+        with self._condition:
+            self.dropped_count += len(logs)
+
+    def _count_written(self, created):
+        with self._condition:
+            self.written_count += len(created)
+            self.write_count += 1
+
+
+_default_sink = None
+_default_sink_lock = threading.Lock()
+
+
+def get_default_log_sink():
+    """Instância única por processo, configurada pelas variáveis WEATHER_LOG_*."""
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is None:
+            _default_sink = LoadLogSink(
+                batch_size=config("WEATHER_LOG_BATCH_SIZE", default=200, cast=int),
+                flush_interval=config(
+                    "WEATHER_LOG_FLUSH_INTERVAL", default=2.0, cast=float
+                ),
+                max_buffer=config("WEATHER_LOG_MAX_BUFFER", default=10000, cast=int),
+                overflow_policy=config("WEATHER_LOG_OVERFLOW_POLICY", default=BLOCK),
+                block_timeout=config(
+                    "WEATHER_LOG_BLOCK_TIMEOUT", default=5.0, cast=float
+                ),
+                buffered=config("WEATHER_LOG_BUFFERED", default=True, cast=bool),
+            )
+        return _default_sink
+
+
+def close_default_log_sink():
+    """Grava os logs pendentes da instância do processo (chamada também no atexit)."""
+    with _default_sink_lock:
+        sink = _default_sink
+    if sink is not None:
+        sink.close()
+
+
+def _reset_after_fork():
+    # O processo filho não herda o thread de gravação: começa com uma instância nova
+    global _default_sink, _default_sink_lock
+    _default_sink = None
+    _default_sink_lock = threading.Lock()
+
+
+atexit.register(close_default_log_sink)
+os.register_at_fork(after_in_child=_reset_after_fork)
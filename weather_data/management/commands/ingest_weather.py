@@ -1,11 +1,23 @@
 # weather_data/management/commands/ingest_weather.py
 
 from django.core.management.base import BaseCommand, CommandError
-from weather_data.models import WeatherRecord, WeatherLoadLog
+from weather_data.models import WeatherLoadLog
 from weather_data.api_client import WeatherApiClient
-from datetime import date  # Importe datetime para usar timedelta
+from weather_data.ingestion import (
+    ERROR,
+    SUCCESS,
+    UNCHANGED,
+    persist_forecasts,
+    persist_hourly_forecast,
+)
+from weather_data.jobs import enqueue_events
+from weather_data.log_sink import get_default_log_sink
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import csv
 import logging
-import json  # Não está sendo usado, pode ser removido se não for necessário
+import json
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +30,84 @@ class Command(BaseCommand):
             "--city",
             type=str,
             help="Nome da cidade para a qual ingerir dados meteorológicos.",
-            required=True,
         )
         parser.add_argument(
             "--date",
             type=str,  # Mantém como string na entrada do comando
             help="Data do evento no formato YYYY-MM-DD (ex: 2025-08-10).",
-            required=True,
         )
         parser.add_argument(
             "--event_id",
             type=str,
             help="ID único do evento (ex: EDUARDO_COSTA_SAO_PAULO_20250810).",
-            required=True,
         )
         parser.add_argument(
             "--event_name",
             type=str,
             help="Nome do evento (ex: Eduardo Costa).",
-            required=True,
+        )
+        parser.add_argument(
+            "--from-file",
+            type=str,
+            help=(
+                "Arquivo CSV, JSONL ou JSON (lista de objetos) com vários eventos "
+                "(colunas/chaves: event_id, event_name, city, date). Substitui "
+                "--city/--date/--event_id/--event_name."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Número máximo de requisições simultâneas à WeatherAPI.com no modo --from-file.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Quantidade de eventos gravados por transação no modo --from-file.",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Enfileira os eventos para o weather_worker em vez de buscar as previsões aqui.",
+        )
+        parser.add_argument(
+            "--hourly",
+            action="store_true",
+            help="Ingere a previsão hora a hora da janela do evento (--start-time/--end-time).",
+        )
+        parser.add_argument(
+            "--start-time",
+            type=str,
+            default="00:00",
+            help="Início do evento (HH:MM, horário local) no modo --hourly.",
+        )
+        parser.add_argument(
+            "--end-time",
+            type=str,
+            default="23:00",
+            help="Fim do evento (HH:MM, horário local) no modo --hourly; antes do início, termina no dia seguinte.",
         )
 
     def handle(self, *args, **options):
+        if options["hourly"] and (options["from_file"] or options["enqueue"]):
+            raise CommandError(
+                "--hourly não pode ser usado com --from-file ou --enqueue."
+            )
+        if options["from_file"]:
+            return self._handle_batch(options)
+
+        missing = [
+            f"--{name}"
+            for name in ("city", "date", "event_id", "event_name")
+            if not options[name]
+        ]
+        if missing:
+            raise CommandError(
+                f"Argumentos obrigatórios ausentes: {', '.join(missing)} (ou use --from-file)."
+            )
+
         city = options["city"]
         event_date_str = options["date"]
         event_id = options["event_id"]
@@ -60,6 +128,36 @@ class Command(BaseCommand):
         )
 
         client = WeatherApiClient()
+        resolved_location = client.resolve_location(city)
+        if resolved_location:
+            # Grava sempre o nome canônico da localização
+            city = resolved_location.canonical_name
+
+        if options["hourly"]:
+            return self._handle_hourly(
+                client,
+                {
+                    "event_id": event_id,
+                    "event_name": event_name,
+                    "city": city,
+                    "event_date": event_date,
+                },
+                options,
+            )
+
+        if options["enqueue"]:
+            return self._enqueue(
+                client,
+                [
+                    {
+                        "event_id": event_id,
+                        "event_name": event_name,
+                        "city": city,
+                        "event_date": event_date,
+                    }
+                ],
+            )
+
         try:
             # PASSA O OBJETO datetime.date (event_date), NÃO A STRING (event_date_str)
             weather_data_raw = client.get_weather_forecast(
@@ -70,66 +168,48 @@ class Command(BaseCommand):
                 # Modificado para logar um erro mais específico se a API retornar None
                 error_msg = f"Não foi possível obter dados meteorológicos para {city} em {event_date_str}. Verifique a data (limite de 3 dias do plano free) ou a localização."
                 self.stderr.write(self.style.ERROR(error_msg))
-                WeatherLoadLog.objects.create(
-                    event_id=event_id,
-                    log_level="ERROR",  # Mudado para ERROR para falha na obtenção
-                    message=error_msg,
-                    event_name=event_name,
-                    event_location=city,
-                    event_date=event_date,
-                    data_imported_count=0,
+                get_default_log_sink().emit(
+                    WeatherLoadLog(
+                        event_id=event_id,
+                        log_level="ERROR",  # Mudado para ERROR para falha na obtenção
+                        message=error_msg,
+                        event_name=event_name,
+                        event_location=city,
+                        event_date=event_date,
+                        data_imported_count=0,
+                    )
                 )
                 raise CommandError(
                     error_msg
                 )  # Levanta CommandError para parar o comando
 
-            # Lógica de versionamento: Encontra a última versão e incrementa
-            # (Este bloco pode ser adicionado aqui para versionamento)
-            latest_record = (
-                WeatherRecord.objects.filter(
-                    event_id=event_id, event_location=city, event_date=event_date
+            # Versão atribuída pelo serviço de versionamento (com trava por chave)
+            ((status, new_version),) = persist_forecasts(
+                [
+                    (
+                        {
+                            "event_id": event_id,
+                            "event_name": event_name,
+                            "city": city,
+                            "event_date": event_date,
+                        },
+                        weather_data_raw,
+                    )
+                ]
+            )
+
+            if status == UNCHANGED:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Previsão para {event_id} sem alterações desde a última versão; nenhuma versão nova gravada."
+                    )
                 )
-                .order_by("-load_version")
-                .first()
-            )
-
-            new_version = 1
-            if latest_record:
-                new_version = latest_record.load_version + 1
-
-            WeatherRecord.objects.create(
-                event_id=event_id,
-                event_name=event_name,
-                event_location=city,
-                event_date=event_date,
-                temperature=weather_data_raw.get("temperature"),
-                feels_like=weather_data_raw.get("feels_like"),
-                min_temperature=weather_data_raw.get("min_temperature"),
-                max_temperature=weather_data_raw.get("max_temperature"),
-                humidity=weather_data_raw.get("humidity"),
-                pressure=weather_data_raw.get("pressure"),
-                wind_speed=weather_data_raw.get("wind_speed"),
-                weather_main=weather_data_raw.get("weather_main"),
-                weather_description=weather_data_raw.get("weather_description"),
-                api_source="WeatherAPI.com",
-                load_version=new_version,  # Usando a nova versão
-            )
-
-            WeatherLoadLog.objects.create(
-                event_id=event_id,
-                log_level="SUCCESS",
-                message=f"Dados para {city} em {event_date_str} ingeridos com sucesso. Versão: {new_version}",
-                event_name=event_name,
-                event_location=city,
-                event_date=event_date,
-                data_imported_count=1,
-            )
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Dados meteorológicos para {event_id} ingeridos e logados com sucesso! Versão: {new_version}"
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Dados meteorológicos para {event_id} ingeridos e logados com sucesso! Versão: {new_version}"
+                    )
                 )
-            )
 
         except CommandError as e:
             # CommandError já é tratado e logado no início do bloco try
@@ -138,13 +218,228 @@ class Command(BaseCommand):
             # Este é para erros inesperados não capturados por CommandError
             error_message = f"Erro inesperado durante a ingestão: {e}"
             self.stderr.write(self.style.ERROR(error_message))
-            WeatherLoadLog.objects.create(
-                event_id=event_id,
-                log_level="ERROR",  # Mudado para ERROR
-                message=error_message,
-                event_name=event_name,
-                event_location=city,
-                event_date=event_date,
-                data_imported_count=0,
+            get_default_log_sink().emit(
+                WeatherLoadLog(
+                    event_id=event_id,
+                    log_level="ERROR",  # Mudado para ERROR
+                    message=error_message,
+                    event_name=event_name,
+                    event_location=city,
+                    event_date=event_date,
+                    data_imported_count=0,
+                )
             )
             raise  # Re-lança a exceção para que o comando falhe
+
+    # --- Previsão hora a hora (--hourly) ---
+
+    def _handle_hourly(self, client, event, options):
+        try:
+            start_time = datetime.strptime(options["start_time"], "%H:%M").time()
+            end_time = datetime.strptime(options["end_time"], "%H:%M").time()
+        except ValueError:
+            raise CommandError("Formato de horário inválido. Use HH:MM.")
+        window_start = datetime.combine(event["event_date"], start_time)
+        window_end = datetime.combine(event["event_date"], end_time)
+        if window_end < window_start:
+            window_end += timedelta(days=1)
+
+        hours = client.get_hourly_forecast(event["city"], window_start, window_end)
+        status, new_version = persist_hourly_forecast(event, hours)
+        if status == ERROR:
+            raise CommandError(
+                f"Não foi possível obter a previsão horária para {event['city']} entre {window_start} e {window_end}."
+            )
+        if status == UNCHANGED:
+            message = f"Previsão horária de {event['event_id']} sem alterações desde a última versão; nenhuma versão nova gravada."
+        else:
+            message = f"Previsão horária de {event['event_id']} ingerida: {len(hours)} horas entre {window_start:%Y-%m-%d %H:%M} e {window_end:%Y-%m-%d %H:%M}. Versão: {new_version}"
+        self.stdout.write(self.style.SUCCESS(message))
+
+    # --- Modo em lote (--from-file) ---
+
+    def _handle_batch(self, options):
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers e --chunk-size devem ser maiores que zero.")
+
+        started = time.monotonic()
+        events, invalid_count = self._read_events_file(options["from_file"])
+        if not events:
+            raise CommandError(
+                f"Nenhum evento válido encontrado em {options['from_file']}."
+            )
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Iniciando ingestão em lote de {len(events)} eventos com {options['workers']} workers..."
+            )
+        )
+
+        client = WeatherApiClient()
+
+        # Troca o texto livre de cada cidade pelo nome canônico (uma resolução por
+        # texto distinto), para que variações da mesma cidade sejam agrupadas.
+        canonical_names = {}
+        for event in events:
+            if event["city"] not in canonical_names:
+                resolved_location = client.resolve_location(event["city"])
+                canonical_names[event["city"]] = (
+                    resolved_location.canonical_name
+                    if resolved_location
+                    else event["city"]
+                )
+            event["city"] = canonical_names[event["city"]]
+
+        if options["enqueue"]:
+            return self._enqueue(client, events, invalid_count)
+
+        # Agrupa os eventos por localização: uma única chamada (days=3) atende
+        # todos os eventos da mesma cidade dentro da janela de previsão.
+        events_by_city = {}
+        for event in events:
+            if client.is_in_forecast_window(event["event_date"]):
+                events_by_city.setdefault(event["city"], []).append(event)
+
+        def fetch(city):
+            try:
+                return city, client.get_location_forecast(city)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao buscar previsão para {city}: {e}")
+                return city, None
+
+        fetched_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            forecasts_by_city = dict(executor.map(fetch, events_by_city))
+        fetch_elapsed = time.monotonic() - fetched_at
+
+        results = [
+            (
+                event,
+                (forecasts_by_city.get(event["city"]) or {}).get(event["event_date"]),
+            )
+            for event in events
+        ]
+
+        imported_count = 0
+        unchanged_count = 0
+        failed_count = 0
+        chunk_size = options["chunk_size"]
+        for start in range(0, len(results), chunk_size):
+            imported, unchanged, failed = self._persist_batch(
+                results[start : start + chunk_size]
+            )
+            imported_count += imported
+            unchanged_count += unchanged
+            failed_count += failed
+
+        elapsed = time.monotonic() - started
+        rate = imported_count / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ingestão em lote concluída: {imported_count} importados, "
+                f"{unchanged_count} sem alterações, {failed_count} falhas, {invalid_count} linhas inválidas em {elapsed:.2f}s "
+                f"({len(events_by_city)} chamadas à API em {fetch_elapsed:.2f}s, {rate:.1f} registros/s)."
+            )
+        )
+
+    def _enqueue(self, client, events, invalid_count=0):
+        """Enfileira os eventos da janela de previsão; os demais são logados como falha."""
+        in_window = []
+        out_of_window = []
+        for event in events:
+            if client.is_in_forecast_window(event["event_date"]):
+                in_window.append(event)
+            else:
+                out_of_window.append(event)
+        if out_of_window:
+            persist_forecasts([(event, None) for event in out_of_window])
+
+        created_count = enqueue_events(in_window)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(in_window)} eventos enfileirados ({created_count} jobs novos), "
+                f"{len(out_of_window)} fora da janela de previsão, {invalid_count} linhas inválidas."
+            )
+        )
+
+    def _read_events_file(self, path):
+        """
+        Lê os eventos de um arquivo CSV (com cabeçalho), JSONL (um objeto por linha)
+        ou JSON (uma lista de objetos).
+        Retorna a lista de eventos válidos e a quantidade de linhas descartadas.
+        """
+        lower_path = path.lower()
+        try:
+            with open(path, encoding="utf-8", newline="") as f:
+                if lower_path.endswith((".jsonl", ".ndjson")):
+                    rows = [
+                        (line_number, line)
+                        for line_number, line in enumerate(f, start=1)
+                        if line.strip()
+                    ]
+                elif lower_path.endswith(".json"):
+                    rows = self._read_json_array(f, path)
+                else:
+                    # Linha 1 é o cabeçalho
+                    rows = list(enumerate(csv.DictReader(f), start=2))
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler o arquivo {path}: {e}")
+
+        events = []
+        invalid_count = 0
+        for line_number, row in rows:
+            try:
+                if isinstance(row, str):
+                    row = json.loads(row)
+                if not isinstance(row, dict):
+                    raise CommandError(
+                        f"Linha {line_number} de {path}: esperado um objeto JSON, "
+                        f"encontrado {type(row).__name__}."
+                    )
+                city = row.get("city") or row.get("event_location")
+                date_str = row.get("date") or row.get("event_date")
+                event_id = row.get("event_id")
+                event_name = row.get("event_name")
+                if not all([city, date_str, event_id, event_name]):
+                    raise ValueError("campos obrigatórios ausentes")
+                event_date = date.fromisoformat(str(date_str))
+            except ValueError as e:
+                invalid_count += 1
+                self.stderr.write(
+                    self.style.WARNING(f"Linha {line_number} ignorada: {e}")
+                )
+                continue
+            events.append(
+                {
+                    "event_id": event_id,
+                    "event_name": event_name,
+                    "city": city,
+                    "event_date": event_date,
+                }
+            )
+        return events, invalid_count
+
+    @staticmethod
+    def _read_json_array(f, path):
+        """Lê um arquivo .json com uma lista de eventos; retorna pares (item, evento)."""
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise CommandError(f"JSON inválido em {path}: {e}")
+        if not isinstance(data, list):
+            raise CommandError(
+                f"{path}: esperada uma lista de eventos no nível superior "
+                "(use .jsonl para um objeto por linha)."
+            )
+        return list(enumerate(data, start=1))
+
+    def _persist_batch(self, results):
+        """Grava um bloco de resultados em uma única transação (ver weather_data.ingestion)."""
+        statuses = [status for status, _ in persist_forecasts(results)]
+        imported_count = statuses.count(SUCCESS)
+        unchanged_count = statuses.count(UNCHANGED)
+        return (
+            imported_count,
+            unchanged_count,
+            len(statuses) - imported_count - unchanged_count,
+        )
@@ -0,0 +1,37 @@
+# weather_data/management/commands/weather_quota.py
+
+from django.core.management.base import BaseCommand
+from weather_data.rate_limit import list_rate_limiter_snapshots
+import json
+
+
+class Command(BaseCommand):
+    help = "Exibe os contadores de uso (por minuto e por dia) dos limitadores das APIs de clima."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Imprime os contadores em JSON (para ferramentas de monitoramento).",
+        )
+
+    def handle(self, *args, **options):
+        snapshots = list_rate_limiter_snapshots()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(snapshots))
+            return
+
+        if not snapshots:
+            self.stdout.write(
+                self.style.WARNING("Nenhuma requisição registrada pelos limitadores.")
+            )
+            return
+
+        for snapshot in snapshots:
+            self.stdout.write(
+                f"{snapshot['name']}: {snapshot['minute_count']} no minuto {snapshot['minute']} "
+                f"(limite {snapshot['per_minute_limit']}/min), {snapshot['day_count']} no dia "
+                f"{snapshot['day']}, {snapshot['tokens_available']} tokens disponíveis, "
+                f"{snapshot['waits']} esperas."
+            )
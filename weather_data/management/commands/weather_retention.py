@@ -0,0 +1,93 @@
+# weather_data/management/commands/weather_retention.py
+
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from weather_data.partitions import (
+    DEFAULT_MONTHS_AHEAD,
+    PARTITIONED_TABLES,
+    add_months,
+    drop_expired_partitions,
+    ensure_partitions,
+    is_partitioned,
+    month_start,
+)
+import datetime
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as partições mensais dos próximos meses e remove as partições expiradas "
+        "do WeatherRecord e do WeatherLoadLog (DROP TABLE em vez de DELETE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--record-months",
+            type=int,
+            default=config("WEATHER_RETENTION_RECORD_MONTHS", default=24, cast=int),
+            help="Meses de WeatherRecord mantidos (por event_date), contando o atual.",
+        )
+        parser.add_argument(
+            "--log-months",
+            type=int,
+            default=config("WEATHER_RETENTION_LOG_MONTHS", default=6, cast=int),
+            help="Meses de WeatherLoadLog mantidos (por loaded_at), contando o atual.",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=DEFAULT_MONTHS_AHEAD,
+            help="Quantidade de meses futuros com partição criada antecipadamente.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra o que seria removido.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("O particionamento só está disponível no PostgreSQL.")
+        for name in ("record_months", "log_months"):
+            if options[name] < 1:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} deve ser maior que zero."
+                )
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead não pode ser negativo.")
+
+        current = month_start(datetime.date.today())
+        keep_months = {
+            "weather_data_weatherrecord": options["record_months"],
+            "weather_data_weatherloadlog": options["log_months"],
+        }
+
+        for table in PARTITIONED_TABLES:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if not is_partitioned(cursor, table):
+                    self.stderr.write(
+                        self.style.WARNING(
+                            f"{table} não é particionada; rode as migrações."
+                        )
+                    )
+                    continue
+                cutoff = add_months(current, -(keep_months[table] - 1))
+                created = []
+                if not options["dry_run"]:
+                    created = ensure_partitions(
+                        cursor, table, current, options["months_ahead"]
+                    )
+                dropped, deleted_count = drop_expired_partitions(
+                    cursor, table, cutoff, dry_run=options["dry_run"]
+                )
+
+            prefix = "[dry-run] " if options["dry_run"] else ""
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{prefix}{table}: mantidos os dados a partir de {cutoff:%Y-%m}; "
+                    f"{len(created)} partições criadas, {len(dropped)} removidas "
+                    f"({', '.join(dropped) or 'nenhuma'}), {deleted_count} linhas "
+                    f"antigas na partição default."
+                )
+            )
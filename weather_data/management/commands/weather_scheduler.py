@@ -0,0 +1,74 @@
+# weather_data/management/commands/weather_scheduler.py
+
+from django.core.management.base import BaseCommand, CommandError
+from weather_data.scheduler import RefreshScheduler
+import logging
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mantém atualizadas as previsões dos eventos dentro da janela de 3 dias da "
+        "WeatherAPI.com (processo de longa duração)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--calls-per-minute",
+            type=int,
+            help="Máximo de chamadas à WeatherAPI.com por minuto feitas pelo agendador (padrão: WEATHER_SCHEDULER_CALLS_PER_MINUTE ou 30).",
+        )
+        parser.add_argument(
+            "--reload-interval",
+            type=int,
+            help="Intervalo, em segundos, para reler os eventos da janela (padrão: WEATHER_SCHEDULER_RELOAD_INTERVAL ou 300).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Atualiza apenas os eventos já vencidos e termina.",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Enfileira os eventos vencidos para o weather_worker em vez de buscar as previsões aqui.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("calls_per_minute", "reload_interval"):
+            if options[name] is not None and options[name] < 1:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} deve ser maior que zero."
+                )
+
+        scheduler = RefreshScheduler(
+            calls_per_minute=options["calls_per_minute"],
+            reload_interval=options["reload_interval"],
+            enqueue=options["enqueue"],
+        )
+
+        if options["once"]:
+            imported, unchanged, failed = scheduler.run_pending()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Atualização concluída: {len(scheduler)} eventos na janela, {imported} importados, "
+                    f"{unchanged} sem alterações, {failed} falhas."
+                )
+            )
+            return
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            logger.info("Sinal recebido, encerrando o agendador...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(self.style.NOTICE("Agendador de previsões iniciado."))
+        scheduler.run_forever(stop_event)
+        self.stdout.write(self.style.SUCCESS("Agendador de previsões encerrado."))
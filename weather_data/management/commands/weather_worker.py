@@ -0,0 +1,100 @@
+# weather_data/management/commands/weather_worker.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from weather_data.jobs import DEFAULT_BATCH_SIZE, DEFAULT_LEASE_SECONDS, run_worker
+from weather_data.log_sink import close_default_log_sink
+import logging
+import multiprocessing
+import signal
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_process(stop_event, options):
+    # Cada processo abre a própria conexão com o banco e o próprio pool HTTP
+    done, failed = run_worker(
+        stop_event,
+        batch_size=options["batch_size"],
+        lease_seconds=options["lease_seconds"],
+        poll_interval=options["poll_interval"],
+        burst=options["burst"],
+    )
+    # Processos do multiprocessing não executam o atexit: grava os logs pendentes aqui
+    close_default_log_sink()
+    logger.info(f"Worker encerrado: {done} jobs concluídos, {failed} não concluídos.")
+
+
+class Command(BaseCommand):
+    help = "Consome a fila de ingestão (IngestionJob) com um ou mais processos worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Número de processos worker.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Quantidade de jobs pegos por vez por cada worker.",
+        )
+        parser.add_argument(
+            "--lease-seconds",
+            type=int,
+            default=DEFAULT_LEASE_SECONDS,
+            help="Tempo após o qual um job de um worker que parou de responder volta para a fila.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Segundos de espera quando a fila está vazia.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Processa os jobs disponíveis e termina quando a fila estiver vazia.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("concurrency", "batch_size", "lease_seconds"):
+            if options[name] < 1:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} deve ser maior que zero."
+                )
+
+        # "fork": os processos filhos herdam o Django já configurado
+        context = multiprocessing.get_context("fork")
+        stop_event = context.Event()
+
+        def stop(signum, frame):
+            logger.info("Sinal recebido, encerrando os workers...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Iniciando {options['concurrency']} worker(s) da fila de ingestão..."
+            )
+        )
+
+        if options["concurrency"] == 1:
+            _worker_process(stop_event, options)
+        else:
+            # Conexões abertas não podem ser compartilhadas com os processos filhos
+            connections.close_all()
+            processes = [
+                context.Process(target=_worker_process, args=(stop_event, options))
+                for _ in range(options["concurrency"])
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS("Workers da fila de ingestão encerrados."))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0002_location_locationalias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="weatherloadlog",
+            name="unchanged_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="weatherrecord",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0004_ingestionjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeatherHourlyRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_id", models.CharField(max_length=255)),
+                ("event_location", models.CharField(max_length=255)),
+                ("forecast_time", models.DateTimeField()),
+                ("temperature", models.FloatField(blank=True, null=True)),
+                ("feels_like", models.FloatField(blank=True, null=True)),
+                ("precipitation", models.FloatField(blank=True, null=True)),
+                (
+                    "precipitation_probability",
+                    models.SmallIntegerField(blank=True, null=True),
+                ),
+                ("humidity", models.SmallIntegerField(blank=True, null=True)),
+                ("wind_speed", models.FloatField(blank=True, null=True)),
+                ("weather_code", models.SmallIntegerField(blank=True, null=True)),
+                ("api_source", models.CharField(max_length=100)),
+                ("loaded_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["event_id", "forecast_time"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="weatherhourlyrecord",
+            constraint=models.UniqueConstraint(
+                fields=("event_id", "forecast_time"), name="unique_hourly_forecast"
+            ),
+        ),
+    ]
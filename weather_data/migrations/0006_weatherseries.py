@@ -0,0 +1,49 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0005_weatherhourlyrecord"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeatherSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_id", models.CharField(max_length=255)),
+                ("event_location", models.CharField(max_length=255)),
+                ("event_date", models.DateField()),
+                ("start_time", models.DateTimeField()),
+                ("step_seconds", models.IntegerField(default=3600)),
+                ("length", models.IntegerField()),
+                ("data", models.BinaryField()),
+                ("api_source", models.CharField(max_length=100)),
+                (
+                    "content_hash",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("load_version", models.IntegerField(default=1)),
+                ("loaded_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["event_id", "event_date", "load_version"],
+                "unique_together": {
+                    ("event_id", "event_location", "event_date", "load_version")
+                },
+            },
+        ),
+        migrations.DeleteModel(
+            name="WeatherHourlyRecord",
+        ),
+    ]
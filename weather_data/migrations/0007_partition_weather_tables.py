@@ -0,0 +1,36 @@
+# Particiona WeatherRecord (por mês de event_date) e WeatherLoadLog (por mês de
+# loaded_at) no PostgreSQL. Ver weather_data/partitions.py.
+
+from django.db import migrations
+
+from weather_data.partitions import (
+    PARTITIONED_TABLES,
+    partition_table,
+    unpartition_table,
+)
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            partition_table(cursor, table)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            unpartition_table(cursor, table)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0006_weatherseries"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0007_partition_weather_tables"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="weatherloadlog",
+            name="loaded_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
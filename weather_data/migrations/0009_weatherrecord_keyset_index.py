@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0008_weatherloadlog_loaded_at_default"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="weatherrecord",
+            index=models.Index(
+                fields=["event_date", "event_id", "load_version", "id"],
+                name="weather_dat_event_d_b19859_idx",
+            ),
+        ),
+    ]
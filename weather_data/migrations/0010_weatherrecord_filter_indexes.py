@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather_data", "0009_weatherrecord_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="weatherrecord",
+            index=models.Index(
+                fields=["event_location", "event_date"],
+                name="weather_dat_event_l_f4c031_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="weatherrecord",
+            index=models.Index(
+                fields=["api_source", "event_date"],
+                name="weather_dat_api_sou_3dfb05_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="weatherrecord",
+            index=models.Index(
+                fields=["event_id"],
+                name="weatherrecord_event_id_like",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
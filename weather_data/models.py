@@ -1,5 +1,9 @@
 # weather_data/models.py
+import numpy as np
 from django.db import models
+from django.utils import timezone
+
+from weather_data.series import unpack_series
 
 
 class WeatherRecord(models.Model):
@@ -31,6 +35,8 @@ class WeatherRecord(models.Model):
     weather_main = models.CharField(max_length=100, null=True, blank=True)
     weather_description = models.CharField(max_length=255, null=True, blank=True)
     api_source = models.CharField(max_length=100)
+    # SHA-256 da previsão normalizada; versões idênticas à anterior não são gravadas
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
     load_version = models.IntegerField(
         default=1
     )  # Este campo é crucial para o versionamento
@@ -45,6 +51,18 @@ class WeatherRecord(models.Model):
             "event_date",
             "load_version",
         ]  # Opcional: para ordenar resultados
+        indexes = [
+            # Ordenação da paginação por cursor de /api/weather-records/
+            models.Index(fields=["event_date", "event_id", "load_version", "id"]),
+            # Filtros da API (api/filters.py); o modo latest usa a restrição única acima
+            models.Index(fields=["event_location", "event_date"]),
+            models.Index(fields=["api_source", "event_date"]),
+            models.Index(
+                fields=["event_id"],
+                name="weatherrecord_event_id_like",
+                opclasses=["varchar_pattern_ops"],  # LIKE 'prefixo%'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.event_name} ({self.event_location}) - {self.event_date} (V{self.load_version})"
@@ -53,29 +71,120 @@ class WeatherRecord(models.Model):
 # Certifique-se de que WeatherLoadLog também está como esperado
 class WeatherLoadLog(models.Model):
     event_id = models.CharField(max_length=255)
-    log_level = models.CharField(max_length=50)  # SUCCESS, FAILED, ERROR
+    log_level = models.CharField(max_length=50)  # SUCCESS, UNCHANGED, FAILED, ERROR
     message = models.TextField()
     event_name = models.CharField(max_length=255, null=True, blank=True)
     event_location = models.CharField(max_length=255, null=True, blank=True)
     event_date = models.DateField(null=True, blank=True)
     data_imported_count = models.IntegerField(default=0)
-    loaded_at = models.DateTimeField(auto_now_add=True)
+    # Previsões que chegaram idênticas à última versão (log_level UNCHANGED)
+    unchanged_count = models.IntegerField(default=0)
+    # Horário em que o log foi emitido (não o da gravação em lote pelo LoadLogSink)
+    loaded_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return f"[{self.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}] {self.log_level}: {self.message}"
 
 
-class WeatherLoadLog(models.Model):
+class WeatherSeries(models.Model):
+    """
+    Série temporal (hora a hora ou diária) de uma versão da previsão de um evento.
+    Todas as variáveis ficam empacotadas em `data` (ver weather_data.series): uma
+    linha por (evento, versão) em vez de uma linha por hora.
+    """
+
     event_id = models.CharField(max_length=255)
-    log_level = models.CharField(max_length=50)
-    message = models.TextField()
-    event_name = models.CharField(max_length=255, null=True, blank=True)
-    event_location = models.CharField(max_length=255, null=True, blank=True)
-    event_date = models.DateField(null=True, blank=True)
-    data_imported_count = models.IntegerField(default=0)
-    loaded_at = models.DateTimeField(
-        auto_now_add=True
-    )  # <-- Esta linha deve estar aqui!
+    event_location = models.CharField(max_length=255)
+    event_date = models.DateField()
+    start_time = models.DateTimeField()  # Horário da primeira amostra
+    step_seconds = models.IntegerField(default=3600)
+    length = models.IntegerField()  # Número de amostras de cada variável
+    data = models.BinaryField()
+    api_source = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+    load_version = models.IntegerField(default=1)
+    loaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("event_id", "event_location", "event_date", "load_version")
+        ordering = ["event_id", "event_date", "load_version"]
+
+    def arrays(self):
+        """Variáveis da série como arrays NumPy somente leitura, sem copiar `data`."""
+        return unpack_series(self.data)
+
+    def times(self):
+        """Horário (UTC, datetime64[s]) de cada amostra."""
+        start = np.datetime64(int(self.start_time.timestamp()), "s")
+        return start + np.arange(self.length) * np.timedelta64(self.step_seconds, "s")
 
     def __str__(self):
-        return f"[{self.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}] {self.log_level}: {self.message}"
+        return f"{self.event_id} - {self.event_date} ({self.length} amostras, V{self.load_version})"
+
+
+class Location(models.Model):
+    """Localização canônica resolvida na WeatherAPI.com (uma linha por cidade real)."""
+
+    canonical_name = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
+    region = models.CharField(max_length=255, null=True, blank=True)
+    country = models.CharField(max_length=255, null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    resolved_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.canonical_name} ({self.latitude}, {self.longitude})"
+
+
+class LocationAlias(models.Model):
+    """Variações de texto (já normalizadas) que apontam para a mesma Location."""
+
+    alias = models.CharField(max_length=255, unique=True)
+    location = models.ForeignKey(
+        Location, on_delete=models.CASCADE, related_name="aliases"
+    )
+
+    def __str__(self):
+        return f"{self.alias} -> {self.location.canonical_name}"
+
+
+class IngestionJob(models.Model):
+    """
+    Job da fila de ingestão: buscar a previsão de uma (localização, data) e gravá-la
+    para os eventos listados em `events`. Consumido pelo comando weather_worker.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendente"),
+        ("RUNNING", "Em Execução"),
+        ("FAILED", "Falha"),
+    ]
+
+    event_location = models.CharField(max_length=255)
+    event_date = models.DateField()
+    # [{"event_id": ..., "event_name": ...}] atendidos pela mesma previsão
+    events = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Deduplicação: no máximo um job pendente por (localização, data)
+            models.UniqueConstraint(
+                fields=["event_location", "event_date"],
+                condition=models.Q(status="PENDING"),
+                name="unique_pending_ingestion_job",
+            )
+        ]
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.event_location} - {self.event_date} ({self.status}, tentativa {self.attempts})"
@@ -0,0 +1,272 @@
+# weather_data/partitions.py
+"""
+Particionamento declarativo (PostgreSQL) das tabelas que crescem sem limite.
+
+WeatherRecord é particionado por mês de event_date e WeatherLoadLog por mês de
+loaded_at (PARTITION BY RANGE). Cada mês fica em <tabela>_pAAAAMM; a partição
+<tabela>_default recebe as linhas de meses que ainda não têm partição, então uma
+gravação nunca falha por falta de partição. Consultas filtradas pela coluna de
+particionamento só leem as partições do período (partition pruning), e o comando
+weather_retention remove meses expirados com DROP TABLE em vez de DELETE (sem
+linhas mortas para o vacuum e sem índices inchados).
+
+A chave primária passa a ser (id, coluna de particionamento), como o PostgreSQL
+exige; o id continua único, gerado pela mesma identidade de antes.
+"""
+import datetime
+
+# tabela -> (coluna de particionamento, tipo da coluna)
+PARTITIONED_TABLES = {
+    "weather_data_weatherrecord": ("event_date", "date"),
+    "weather_data_weatherloadlog": ("loaded_at", "timestamptz"),
+}
+
+DEFAULT_MONTHS_AHEAD = 3
+
+
+def _quote(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+def month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _as_month(value):
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return month_start(value)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def _bound(table, month):
+    """Limite da partição como literal SQL (meia-noite UTC para timestamptz)."""
+    _, column_type = PARTITIONED_TABLES[table]
+    if column_type == "timestamptz":
+        return f"'{month.isoformat()} 00:00:00+00'"
+    return f"'{month.isoformat()}'"
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [_quote(table)]
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(cursor, table):
+    """Partições mensais existentes da tabela, como [(mês, nome)] em ordem."""
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        """,
+        [_quote(table)],
+    )
+    prefix = f"{table}_p"
+    partitions = []
+    for (name,) in cursor.fetchall():
+        if not name.startswith(prefix):
+            continue
+        try:
+            month = datetime.datetime.strptime(name[len(prefix) :], "%Y%m").date()
+        except ValueError:
+            continue
+        partitions.append((month, name))
+    return sorted(partitions)
+
+
+def create_month_partition(cursor, table, month):
+    """
+    Cria a partição do mês, se ainda não existir. Linhas do mês que já estejam na
+    partição default são movidas para a nova partição antes do ATTACH.
+    Retorna True se a partição foi criada.
+    """
+    name = partition_name(table, month)
+    cursor.execute("SELECT to_regclass(%s)", [_quote(name)])
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    column, _ = PARTITIONED_TABLES[table]
+    start, end = _bound(table, month), _bound(table, add_months(month, 1))
+    cursor.execute(
+        f"CREATE TABLE {_quote(name)} (LIKE {_quote(table)} INCLUDING DEFAULTS)"
+    )
+    cursor.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM {_quote(default_partition_name(table))}
+            WHERE {_quote(column)} >= {start} AND {_quote(column)} < {end}
+            RETURNING *
+        )
+        INSERT INTO {_quote(name)} SELECT * FROM moved
+        """
+    )
+    cursor.execute(
+        f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(name)} "
+        f"FOR VALUES FROM ({start}) TO ({end})"
+    )
+    return True
+
+
+def ensure_partitions(cursor, table, today=None, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Garante as partições do mês atual e dos `months_ahead` meses seguintes."""
+    current = month_start(today or datetime.date.today())
+    return [
+        partition_name(table, add_months(current, offset))
+        for offset in range(months_ahead + 1)
+        if create_month_partition(cursor, table, add_months(current, offset))
+    ]
+
+
+def drop_expired_partitions(cursor, table, cutoff, dry_run=False):
+    """
+    Remove (DROP TABLE) as partições mensais anteriores ao mês `cutoff` e apaga da
+    partição default as linhas anteriores a ele. Retorna os nomes das partições
+    removidas e a quantidade de linhas apagadas da default.
+    """
+    expired = [name for month, name in list_partitions(cursor, table) if month < cutoff]
+    column, _ = PARTITIONED_TABLES[table]
+    default_filter = (
+        f"FROM {_quote(default_partition_name(table))} "
+        f"WHERE {_quote(column)} < {_bound(table, cutoff)}"
+    )
+    if dry_run:
+        cursor.execute(f"SELECT COUNT(*) {default_filter}")
+        return expired, cursor.fetchone()[0]
+
+    for name in expired:
+        cursor.execute(f"DROP TABLE {_quote(name)}")
+    cursor.execute(f"DELETE {default_filter}")
+    return expired, cursor.rowcount
+
+
+def _table_constraints(cursor, table):
+    """Chave primária e restrições UNIQUE da tabela: [(nome, tipo, definição)]."""
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+        ORDER BY contype, conname
+        """,
+        [_quote(table)],
+    )
+    return cursor.fetchall()
+
+
+def _table_indexes(cursor, table):
+    """Índices que não pertencem a restrições: [(nome, único, método e colunas)]."""
+    cursor.execute(
+        """
+        SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid)
+        FROM pg_index
+        JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+        WHERE pg_index.indrelid = to_regclass(%s)
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint WHERE conindid = pg_index.indexrelid
+          )
+        """,
+        [_quote(table)],
+    )
+    # "CREATE [UNIQUE] INDEX nome ON public.tabela USING btree (...)"
+    return [
+        (
+            name,
+            definition.startswith("CREATE UNIQUE"),
+            definition.split(" USING ", 1)[1],
+        )
+        for name, definition in cursor.fetchall()
+    ]
+
+
+def _rebuild_table(cursor, table, partitioned):
+    """
+    Recria a tabela (particionada ou comum) com as mesmas colunas, dados, restrições,
+    índices e sequência do id. As restrições e os índices são criados depois da
+    cópia dos dados, já com os nomes originais.
+    """
+    column, column_type = PARTITIONED_TABLES[table]
+    old_table = f"{table}_old"
+    constraints = _table_constraints(cursor, table)
+    indexes = _table_indexes(cursor, table)
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM " + _quote(table))
+    max_id = cursor.fetchone()[0]
+
+    cursor.execute(f"ALTER TABLE {_quote(table)} RENAME TO {_quote(old_table)}")
+    partition_clause = f" PARTITION BY RANGE ({_quote(column)})" if partitioned else ""
+    cursor.execute(
+        f"CREATE TABLE {_quote(table)} (LIKE {_quote(old_table)} INCLUDING DEFAULTS)"
+        + partition_clause
+    )
+
+    if partitioned:
+        cursor.execute(
+            f"CREATE TABLE {_quote(default_partition_name(table))} "
+            f"PARTITION OF {_quote(table)} DEFAULT"
+        )
+        # Uma partição por mês com dados e para o mês atual e os próximos
+        cursor.execute(
+            f"SELECT DISTINCT {_quote(column)} FROM {_quote(old_table)}"
+            if column_type == "date"
+            else f"SELECT DISTINCT date_trunc('month', {_quote(column)} AT TIME ZONE 'UTC') FROM {_quote(old_table)}"
+        )
+        months = {_as_month(value) for (value,) in cursor.fetchall()}
+        ensure_partitions(cursor, table)
+        for month in sorted(months):
+            create_month_partition(cursor, table, month)
+
+    cursor.execute(f"INSERT INTO {_quote(table)} SELECT * FROM {_quote(old_table)}")
+    # Remove a tabela antiga (e sua sequência de identidade) para liberar os nomes
+    cursor.execute(f"DROP TABLE {_quote(old_table)} CASCADE")
+
+    cursor.execute(
+        f"ALTER TABLE {_quote(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+    )
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+        [_quote(table), max(max_id, 1), max_id > 0],
+    )
+    for name, constraint_type, definition in constraints:
+        if constraint_type == "p":
+            # Em tabelas particionadas a chave primária precisa incluir a coluna de particionamento
+            definition = (
+                f"PRIMARY KEY (id, {_quote(column)})"
+                if partitioned
+                else "PRIMARY KEY (id)"
+            )
+        cursor.execute(
+            f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}"
+        )
+    for name, unique, definition in indexes:
+        cursor.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {_quote(name)} "
+            f"ON {_quote(table)} USING {definition}"
+        )
+
+
+def partition_table(cursor, table):
+    """Converte a tabela comum em particionada por mês (uso pela migração)."""
+    if not is_partitioned(cursor, table):
+        _rebuild_table(cursor, table, partitioned=True)
+
+
+def unpartition_table(cursor, table):
+    """Desfaz partition_table, voltando a uma tabela comum."""
+    if is_partitioned(cursor, table):
+        _rebuild_table(cursor, table, partitioned=False)
@@ -0,0 +1,325 @@
+# weather_data/providers.py
+"""
+Provedores de previsão (WeatherAPI.com e Open-Meteo) atrás da mesma interface.
+
+Cada provedor devolve {datetime.date: campos do WeatherRecord} para os dias da
+janela de previsão e mantém médias móveis exponenciais (EWMA) de latência e taxa
+de erro. O HedgedForecastFetcher consulta primeiro o provedor com melhor histórico;
+se ele não responder dentro do orçamento de latência (WEATHER_HEDGE_AFTER_MS),
+dispara a mesma consulta no próximo provedor e fica com a primeira resposta válida.
+O provedor vencedor é informado para ser gravado em WeatherRecord.api_source.
+"""
+import datetime
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import requests
+from decouple import config
+
+from weather_data.api_client import FORECAST_WINDOW_DAYS, WeatherApiClient
+from weather_data.http_session import get_shared_session, request_with_retry
+from weather_data.rate_limit import get_rate_limiter
+from weather_data.weather_codes import describe_weather_code
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """EWMA de latência (segundos) e de taxa de erro das chamadas a um provedor."""
+
+    def __init__(self, prior_latency, alpha=0.2):
+        self.alpha = alpha
+        self.prior_latency = prior_latency
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.calls += 1
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+            self.error_rate = (
+                self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+            )
+
+    def score(self):
+        """
+        Custo esperado de uma chamada (menor é melhor): a latência média dividida
+        pela chance de sucesso. Sem histórico, usa a latência de referência.
+        """
+        with self._lock:
+            latency = self.latency if self.latency is not None else self.prior_latency
+            return latency / max(0.05, 1.0 - self.error_rate)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "latency_ms": (
+                    round(self.latency * 1000, 1) if self.latency is not None else None
+                ),
+                "error_rate": round(self.error_rate, 3),
+            }
+
+
+class WeatherProvider(ABC):
+    """Interface comum dos provedores de previsão."""
+
+    name = None
+    api_source = None
+
+    def __init__(self, prior_latency):
+        self.stats = ProviderStats(
+            prior_latency,
+            alpha=config("WEATHER_PROVIDER_EWMA_ALPHA", default=0.2, cast=float),
+        )
+
+    def supports(self, location, resolved):
+        """Indica se o provedor consegue atender a localização."""
+        return True
+
+    @abstractmethod
+    def fetch_location_forecast(self, location, resolved):
+        """Retorna {datetime.date: dados normalizados} ou None em caso de falha."""
+
+    def timed_fetch(self, location, resolved):
+        """Executa fetch_location_forecast registrando latência e sucesso no EWMA."""
+        started = time.monotonic()
+        try:
+            forecasts = self.fetch_location_forecast(location, resolved)
+        except Exception as e:
+            logger.error(f"Erro inesperado no provedor {self.name}: {e}")
+            forecasts = None
+        self.stats.record(time.monotonic() - started, bool(forecasts))
+        return forecasts
+
+
+class WeatherApiProvider(WeatherProvider):
+    name = "weatherapi"
+    api_source = "WeatherAPI.com"
+
+    def __init__(self, client, prior_latency):
+        super().__init__(prior_latency)
+        self.client = client
+
+    def fetch_location_forecast(self, location, resolved):
+        return self.client.get_location_forecast(location)
+
+
+class OpenMeteoProvider(WeatherProvider):
+    name = "openmeteo"
+    api_source = "Open-Meteo"
+
+    DAILY_VARIABLES = (
+        "temperature_2m_mean,temperature_2m_max,temperature_2m_min,"
+        "apparent_temperature_mean,relative_humidity_2m_mean,pressure_msl_mean,"
+        "wind_speed_10m_max,weather_code"
+    )
+
+    def __init__(self, prior_latency):
+        super().__init__(prior_latency)
+        self.base_url = config(
+            "OPENMETEO_BASE_URL", default="https://api.open-meteo.com/v1/forecast"
+        )
+        self.timeout = (
+            config("OPENMETEO_CONNECT_TIMEOUT", default=3.05, cast=float),
+            config("OPENMETEO_READ_TIMEOUT", default=10.0, cast=float),
+        )
+        self.max_retries = config("OPENMETEO_MAX_RETRIES", default=3, cast=int)
+        self.session = get_shared_session(
+            "openmeteo", config("OPENMETEO_POOL_SIZE", default=10, cast=int)
+        )
+        self.rate_limiter = get_rate_limiter(
+            "openmeteo",
+            config("OPENMETEO_RATE_LIMIT_PER_MINUTE", default=500, cast=int),
+            config("OPENMETEO_RATE_LIMIT_BURST", default=50, cast=int),
+        )
+
+    def supports(self, location, resolved):
+        # A Open-Meteo só aceita coordenadas
+        return resolved is not None
+
+    def fetch_location_forecast(self, location, resolved):
+        today = datetime.date.today()
+        try:
+            response = request_with_retry(
+                self.session,
+                "GET",
+                self.base_url,
+                params={
+                    "latitude": resolved.latitude,
+                    "longitude": resolved.longitude,
+                    "daily": self.DAILY_VARIABLES,
+                    "wind_speed_unit": "ms",
+                    "timezone": "auto",
+                    "start_date": today.isoformat(),
+                    "end_date": (
+                        today + timedelta(days=FORECAST_WINDOW_DAYS - 1)
+                    ).isoformat(),
+                },
+                timeout=self.timeout,
+                max_retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro na requisição à Open-Meteo: {e}")
+            return None
+
+        daily = (data or {}).get("daily") or {}
+        if "time" not in daily:
+            logger.error(f"Resposta inesperada da Open-Meteo: {data}")
+            return None
+
+        def value(name, index):
+            values = daily.get(name) or []
+            return values[index] if index < len(values) else None
+
+        forecasts = {}
+        for index, day in enumerate(daily["time"]):
+            weather_code = value("weather_code", index)
+            description = (
+                describe_weather_code(int(weather_code))
+                if weather_code is not None
+                else None
+            )
+            forecasts[datetime.date.fromisoformat(day)] = {
+                "temperature": value("temperature_2m_mean", index),
+                "min_temperature": value("temperature_2m_min", index),
+                "max_temperature": value("temperature_2m_max", index),
+                "feels_like": value("apparent_temperature_mean", index),
+                "humidity": value("relative_humidity_2m_mean", index),
+                "pressure": value("pressure_msl_mean", index),
+                "wind_speed": value("wind_speed_10m_max", index),
+                "weather_main": description,
+                "weather_description": description,
+            }
+        return forecasts
+
+
+# Valores aceitos em WeatherRecord.api_source para dados vindos dos provedores
+PROVIDER_API_SOURCES = {WeatherApiProvider.api_source, OpenMeteoProvider.api_source}
+
+
+class HedgedForecastFetcher:
+    def __init__(self, client=None, providers=None, hedge_after=None, max_workers=None):
+        self.client = client or WeatherApiClient()
+        if hedge_after is None:
+            hedge_after = config("WEATHER_HEDGE_AFTER_MS", default=800, cast=int) / 1000
+        self.hedge_after = hedge_after
+        if providers is None:
+            providers = self._providers_from_config()
+        self.providers = providers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers
+            or config("WEATHER_HEDGE_MAX_WORKERS", default=16, cast=int),
+            thread_name_prefix="forecast-provider",
+        )
+
+    def _providers_from_config(self):
+        """Provedores na ordem de preferência de WEATHER_PROVIDERS (desempate)."""
+        names = config("WEATHER_PROVIDERS", default="weatherapi,openmeteo")
+        providers = []
+        for name in (name.strip() for name in names.split(",")):
+            if name == WeatherApiProvider.name:
+                providers.append(WeatherApiProvider(self.client, self.hedge_after))
+            elif name == OpenMeteoProvider.name:
+                providers.append(OpenMeteoProvider(self.hedge_after))
+            elif name:
+                logger.warning(
+                    f"Provedor de previsão desconhecido em WEATHER_PROVIDERS: {name}"
+                )
+        return providers
+
+    def ranked_providers(self, location=None, resolved=None):
+        """Provedores aptos ordenados pelo custo esperado (sort estável: mantém a ordem em empates)."""
+        return sorted(
+            (
+                provider
+                for provider in self.providers
+                if provider.supports(location, resolved)
+            ),
+            key=lambda provider: provider.stats.score(),
+        )
+
+    def get_location_forecast(self, location, resolved=None):
+        """
+        Consulta os provedores com hedging e retorna (previsões, provedor) da primeira
+        resposta válida, ou (None, None) se todos falharem. Um provedor extra é
+        disparado quando o orçamento de latência estoura ou quando todas as
+        consultas em andamento falharam.
+        """
+        remaining = self.ranked_providers(location, resolved)
+        pending = {}
+
+        def launch_next():
+            provider = remaining.pop(0)
+            future = self._executor.submit(provider.timed_fetch, location, resolved)
+            pending[future] = provider
+
+        if remaining:
+            launch_next()
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=self.hedge_after if remaining else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                logger.info(
+                    f"Previsão para {location} acima de {self.hedge_after:.2f}s; consultando também {remaining[0].name}."
+                )
+                launch_next()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                forecasts = future.result()
+                if forecasts:
+                    # As consultas que perderam terminam em segundo plano e só alimentam o EWMA
+                    return forecasts, provider
+            if not pending and remaining:
+                launch_next()
+        return None, None
+
+    def get_weather_forecast(self, location, forecast_date):
+        """
+        Retorna (previsão normalizada, api_source do provedor vencedor) para a data,
+        ou (None, None) se nenhum provedor tiver a previsão.
+        """
+        if not self.client.is_in_forecast_window(forecast_date):
+            logger.warning(
+                f"A data {forecast_date} está fora da janela de previsão de {FORECAST_WINDOW_DAYS} dias."
+            )
+            return None, None
+        # Resolve antes de disparar os provedores: nos threads a localização já
+        # está no índice em memória e não há acesso ao banco
+        resolved = self.client.resolve_location(location)
+        forecasts, provider = self.get_location_forecast(location, resolved)
+        if not forecasts or forecast_date not in forecasts:
+            return None, None
+        return forecasts[forecast_date], provider.api_source
+
+    def stats(self):
+        return {provider.name: provider.stats.snapshot() for provider in self.providers}
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_default_forecast_fetcher():
+    """Instância única por processo: o EWMA dos provedores é compartilhado entre requisições."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = HedgedForecastFetcher()
+        return _default_fetcher
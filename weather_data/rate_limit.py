@@ -0,0 +1,170 @@
+# weather_data/rate_limit.py
+"""
+Limitador de requisições (token bucket) compartilhado entre processos.
+
+O estado de cada provedor fica em um arquivo JSON protegido por flock, então todos
+os processos da mesma máquina (workers do gunicorn, comandos de ingestão, o script
+data_ingestion/weather_ingestor.py) consomem do mesmo balde sem serviços extras.
+Quando não há token disponível o chamador espera na fila em vez de falhar.
+
+O mesmo arquivo guarda contadores por minuto e por dia, lidos por snapshot()
+(e pelo comando `manage.py weather_quota`) para monitoramento.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+
+DEFAULT_STATE_DIR = os.getenv("RATE_LIMIT_DIR", "/tmp/weather_rate_limits")
+
+
+class FileTokenBucket:
+    def __init__(self, name, per_minute, burst=None, state_dir=DEFAULT_STATE_DIR):
+        if per_minute < 1:
+            raise ValueError(
+                f"Limite do provedor '{name}' deve ser de ao menos 1 requisição por "
+                f"minuto (recebido: {per_minute})."
+            )
+        self.name = name
+        self.rate = per_minute / 60.0  # tokens por segundo
+        self.capacity = float(burst or max(1, per_minute // 6))
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"{name}.json")
+
+    def _read_state(self, f):
+        f.seek(0)
+        content = f.read()
+        try:
+            return json.loads(content) if content else {}
+        except ValueError:
+            return {}
+
+    def _write_state(self, f, state):
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(state))
+        f.flush()
+
+    def _open(self):
+        # "a+" cria o arquivo se necessário sem truncar o estado de outros processos
+        return open(self.path, "a+", encoding="utf-8")
+
+    @staticmethod
+    def _roll_counters(state, now):
+        minute = time.strftime("%Y-%m-%dT%H:%M", time.gmtime(now))
+        day = time.strftime("%Y-%m-%d", time.gmtime(now))
+        if state.get("minute") != minute:
+            state["minute"], state["minute_count"] = minute, 0
+        if state.get("day") != day:
+            state["day"], state["day_count"] = day, 0
+
+    def try_acquire(self):
+        """
+        Tenta consumir um token. Retorna 0 se conseguiu, ou quantos segundos
+        esperar até o próximo token ficar disponível.
+        """
+        with self._open() as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                state = self._read_state(f)
+                now = time.time()
+                elapsed = max(0.0, now - state.get("updated_at", now))
+                tokens = min(
+                    self.capacity,
+                    state.get("tokens", self.capacity) + elapsed * self.rate,
+                )
+                self._roll_counters(state, now)
+                state["updated_at"] = now
+                state["per_minute"] = round(self.rate * 60)
+                state["burst"] = self.capacity
+
+                if tokens >= 1:
+                    state["tokens"] = tokens - 1
+                    state["minute_count"] += 1
+                    state["day_count"] += 1
+                    wait = 0.0
+                else:
+                    state["tokens"] = tokens
+                    state["waits"] = state.get("waits", 0) + 1
+                    wait = (1 - tokens) / self.rate
+                self._write_state(f, state)
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Bloqueia até conseguir um token (fila em vez de erro)."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Versão assíncrona de acquire: o flock e a leitura/gravação do arquivo rodam
+        em uma thread e a espera usa asyncio.sleep, sem bloquear o loop.
+        """
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def snapshot(self):
+        """Contadores atuais (minuto/dia corrente, tokens disponíveis e esperas)."""
+        with self._open() as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                state = self._read_state(f)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        now = time.time()
+        self._roll_counters(state, now)
+        # Limites gravados pelo último processo que usou o balde (podem diferir dos locais)
+        per_minute = state.get("per_minute", round(self.rate * 60))
+        capacity = state.get("burst", self.capacity)
+        elapsed = max(0.0, now - state.get("updated_at", now))
+        tokens = state.get("tokens", capacity) + elapsed * per_minute / 60.0
+        return {
+            "name": self.name,
+            "per_minute_limit": per_minute,
+            "burst": capacity,
+            "tokens_available": round(min(capacity, tokens), 2),
+            "minute": state["minute"],
+            "minute_count": state["minute_count"],
+            "day": state["day"],
+            "day_count": state["day_count"],
+            "waits": state.get("waits", 0),
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name, per_minute, burst=None):
+    """Retorna o limitador do provedor `name` (um por processo e por provedor)."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = FileTokenBucket(name, per_minute, burst)
+            _limiters[name] = limiter
+        return limiter
+
+
+def list_rate_limiter_snapshots(state_dir=DEFAULT_STATE_DIR):
+    """Lê os contadores de todos os provedores que já registraram estado em state_dir."""
+    if not os.path.isdir(state_dir):
+        return []
+    snapshots = []
+    for filename in sorted(os.listdir(state_dir)):
+        if filename.endswith(".json"):
+            name = filename[: -len(".json")]
+            limiter = _limiters.get(name) or FileTokenBucket(
+                name, 60, state_dir=state_dir
+            )
+            snapshots.append(limiter.snapshot())
+    return snapshots
@@ -0,0 +1,279 @@
+# weather_data/scheduler.py
+"""
+Agendador de atualizações das previsões de eventos próximos.
+
+Mantém uma fila de prioridade (heapq) com os eventos dentro da janela de previsão
+da WeatherAPI.com, vindos do WeatherRecord e, quando o app `events` está instalado,
+da tabela Event. Eventos mais próximos são atualizados com mais frequência, as
+chamadas são espaçadas para caber na cota e todos os eventos vencidos da mesma
+cidade são atendidos por uma única chamada (days=3).
+
+Usado pelo comando `manage.py weather_scheduler`, que roda em um único processo
+e reaproveita o mesmo cliente (pool HTTP) e a mesma conexão com o banco. Com
+--enqueue, os eventos vencidos são enviados à fila do weather_worker.
+"""
+import datetime
+import heapq
+import itertools
+import logging
+import time
+
+from decouple import config
+from django.apps import apps
+from django.db import OperationalError, InterfaceError, connection
+from django.db.models import Max
+
+from weather_data.api_client import FORECAST_WINDOW_DAYS, WeatherApiClient
+from weather_data.ingestion import SUCCESS, UNCHANGED, build_event_id, persist_forecasts
+from weather_data.jobs import enqueue_events
+from weather_data.models import WeatherRecord
+from weather_data.versioning import version_key
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_interval(event_date, today=None):
+    """Intervalo (segundos) entre atualizações: menor quanto mais próximo o evento."""
+    today = today or datetime.date.today()
+    days_ahead = (event_date - today).days
+    if days_ahead <= 0:
+        return config("WEATHER_SCHEDULER_INTERVAL_TODAY", default=900, cast=int)
+    if days_ahead == 1:
+        return config("WEATHER_SCHEDULER_INTERVAL_TOMORROW", default=3600, cast=int)
+    return config("WEATHER_SCHEDULER_INTERVAL_AHEAD", default=10800, cast=int)
+
+
+class RefreshScheduler:
+    def __init__(
+        self, client=None, calls_per_minute=None, reload_interval=None, enqueue=False
+    ):
+        self.client = client or WeatherApiClient()
+        # Com enqueue, os eventos vencidos vão para a fila do weather_worker
+        self.enqueue = enqueue
+        if calls_per_minute is None:
+            calls_per_minute = config(
+                "WEATHER_SCHEDULER_CALLS_PER_MINUTE", default=30, cast=int
+            )
+        # Espaçamento mínimo entre chamadas, para não consumir a cota em rajadas
+        self.min_call_interval = 60.0 / max(1, calls_per_minute)
+        self.reload_interval = reload_interval or config(
+            "WEATHER_SCHEDULER_RELOAD_INTERVAL", default=300, cast=int
+        )
+        self._queue = []  # heap de (vencimento, sequência, chave)
+        # chave -> vencimento atual (entradas antigas do heap são ignoradas)
+        self._due_at = {}
+        self._events = {}  # chave -> evento
+        self._sequence = itertools.count()
+        self._next_reload = 0.0
+        self._last_call = 0.0
+
+    def __len__(self):
+        return len(self._events)
+
+    # --- Fila ---
+
+    def schedule(self, event, due_at):
+        key = version_key(event["event_id"], event["city"], event["event_date"])
+        self._events[key] = event
+        self._due_at[key] = due_at
+        heapq.heappush(self._queue, (due_at, next(self._sequence), key))
+
+    def unschedule(self, key):
+        self._events.pop(key, None)
+        self._due_at.pop(key, None)
+
+    def pop_due(self, now):
+        """Remove e retorna os eventos vencidos até `now`."""
+        due_events = []
+        while self._queue and self._queue[0][0] <= now:
+            due_at, _, key = heapq.heappop(self._queue)
+            if self._due_at.get(key) != due_at:
+                continue  # reagendado ou removido depois de entrar no heap
+            del self._due_at[key]
+            due_events.append(self._events[key])
+        return due_events
+
+    def seconds_until_next(self, now):
+        """Segundos até o próximo vencimento ou recarga da lista de eventos."""
+        next_due = self._next_reload
+        while self._queue and self._due_at.get(self._queue[0][2]) != self._queue[0][0]:
+            heapq.heappop(self._queue)
+        if self._queue:
+            next_due = min(next_due, self._queue[0][0])
+        return max(0.0, next_due - now)
+
+    # --- Eventos da janela de previsão ---
+
+    def _window(self):
+        today = datetime.date.today()
+        return today, today + datetime.timedelta(days=FORECAST_WINDOW_DAYS - 1)
+
+    def _events_from_records(self, start, end):
+        """Eventos já ingeridos na janela, com o horário da última carga."""
+        rows = (
+            WeatherRecord.objects.filter(event_date__range=(start, end))
+            .order_by()
+            .values("event_id", "event_location", "event_date")
+            .annotate(last_loaded_at=Max("loaded_at"), event_name=Max("event_name"))
+        )
+        events = {}
+        for row in rows:
+            event = {
+                "event_id": row["event_id"],
+                "event_name": row["event_name"],
+                "city": row["event_location"],
+                "event_date": row["event_date"],
+            }
+            key = version_key(event["event_id"], event["city"], event["event_date"])
+            events[key] = (event, row["last_loaded_at"])
+        return events
+
+    def _events_from_event_table(self, start, end):
+        """Eventos publicados da tabela Event (app `events`) que caem na janela."""
+        try:
+            event_model = apps.get_model("events", "Event")
+        except LookupError:
+            return []
+
+        events = []
+        resolved_by_text = {}
+        rows = event_model.objects.filter(
+            published=True,
+            start_date__date__range=(start, end),
+            location__isnull=False,
+        ).values_list("name", "location", "start_date__date")
+        for name, location, event_date in rows:
+            if location not in resolved_by_text:
+                resolved_by_text[location] = self.client.resolve_location(location)
+            resolved_location = resolved_by_text[location]
+            if resolved_location is None:
+                logger.warning(
+                    f"Localização do evento '{name}' não encontrada: {location}"
+                )
+                continue
+            events.append(
+                {
+                    "event_id": build_event_id(name, location, event_date),
+                    "event_name": name,
+                    "city": resolved_location.canonical_name,
+                    "event_date": event_date,
+                }
+            )
+        return events
+
+    def reload_events(self, now=None):
+        """
+        Atualiza a fila com os eventos da janela: agenda os novos (vencendo na última
+        carga + intervalo, ou imediatamente se nunca carregados) e remove os que saíram.
+        """
+        now = now or time.time()
+        start, end = self._window()
+        candidates = self._events_from_records(start, end)
+        for event in self._events_from_event_table(start, end):
+            key = version_key(event["event_id"], event["city"], event["event_date"])
+            if key not in candidates:
+                candidates[key] = (event, None)
+
+        for key in [key for key in self._events if key not in candidates]:
+            self.unschedule(key)
+
+        for key, (event, last_loaded_at) in candidates.items():
+            if key in self._due_at:
+                continue
+            due_at = now
+            if last_loaded_at is not None:
+                due_at = last_loaded_at.timestamp() + refresh_interval(
+                    event["event_date"]
+                )
+            self.schedule(event, due_at)
+
+        self._next_reload = now + self.reload_interval
+        logger.info(f"Agendador: {len(self._events)} eventos na janela de previsão.")
+
+    # --- Atualização ---
+
+    def _pace(self, stop_event=None):
+        """Espera o espaçamento mínimo desde a última chamada à API."""
+        wait = self._last_call + self.min_call_interval - time.monotonic()
+        if wait > 0:
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+        self._last_call = time.monotonic()
+
+    def _reschedule(self, events):
+        now = time.time()
+        for event in events:
+            if self.client.is_in_forecast_window(event["event_date"]):
+                self.schedule(event, now + refresh_interval(event["event_date"]))
+            else:
+                self.unschedule(
+                    version_key(event["event_id"], event["city"], event["event_date"])
+                )
+
+    def refresh(self, events, stop_event=None):
+        """
+        Atualiza os eventos informados (uma chamada por cidade), grava os resultados e
+        os reagenda. Retorna (importados, sem alterações, falhas).
+        No modo enqueue apenas enfileira os eventos e retorna (0, 0, 0).
+        """
+        if self.enqueue:
+            created_count = enqueue_events(events)
+            logger.info(
+                f"Agendador: {len(events)} eventos enfileirados ({created_count} jobs novos)."
+            )
+            self._reschedule(events)
+            return 0, 0, 0
+
+        events_by_city = {}
+        for event in events:
+            events_by_city.setdefault(event["city"], []).append(event)
+
+        counts = {SUCCESS: 0, UNCHANGED: 0}
+        failed_count = 0
+        for city, city_events in events_by_city.items():
+            self._pace(stop_event)
+            try:
+                forecasts = self.client.get_location_forecast(city) or {}
+            except Exception as e:
+                logger.error(f"Erro inesperado ao buscar previsão para {city}: {e}")
+                forecasts = {}
+
+            results = [
+                (event, forecasts.get(event["event_date"])) for event in city_events
+            ]
+            for status, _ in persist_forecasts(results):
+                if status in counts:
+                    counts[status] += 1
+                else:
+                    failed_count += 1
+            self._reschedule(city_events)
+        return counts[SUCCESS], counts[UNCHANGED], failed_count
+
+    def run_pending(self, stop_event=None):
+        """Recarrega a lista de eventos quando necessário e atualiza os vencidos."""
+        now = time.time()
+        if now >= self._next_reload:
+            self.reload_events(now)
+        due_events = self.pop_due(now)
+        if not due_events:
+            return 0, 0, 0
+        return self.refresh(due_events, stop_event)
+
+    def run_forever(self, stop_event, max_sleep=60):
+        """Laço principal: roda até `stop_event` ser sinalizado."""
+        while not stop_event.is_set():
+            try:
+                imported, unchanged, failed = self.run_pending(stop_event)
+                if imported or unchanged or failed:
+                    logger.info(
+                        f"Agendador: {imported} importados, {unchanged} sem alterações, {failed} falhas."
+                    )
+            except (OperationalError, InterfaceError) as e:
+                # Conexão perdida: descarta para reconectar na próxima volta
+                logger.error(f"Erro de banco de dados no agendador: {e}")
+                connection.close()
+            except Exception as e:
+                logger.error(f"Erro inesperado no agendador: {e}", exc_info=True)
+            stop_event.wait(min(max_sleep, self.seconds_until_next(time.time())))
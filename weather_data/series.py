@@ -0,0 +1,120 @@
+# weather_data/series.py
+"""
+Formato compacto das séries temporais do WeatherSeries (hora a hora ou diárias).
+
+Todas as variáveis de uma versão da previsão de um evento ficam em um único bytea:
+
+    cabeçalho   "<2sBBI"  "WS", versão do formato, nº de variáveis, nº de amostras
+    variáveis   "<31sc"   nome (ASCII) e tipo: b"f" float32 ou b"h" int16
+    dados       arrays little-endian, na ordem das variáveis
+
+Os float32 vêm antes dos int16 e os blocos do cabeçalho têm tamanho múltiplo de 4,
+então todo array fica alinhado. unpack_series devolve visões np.frombuffer sobre o
+buffer lido do banco (sem cópia, somente leitura). Valores ausentes são NaN nos
+float32 e INT16_MISSING nos int16.
+"""
+import hashlib
+import struct
+
+import numpy as np
+
+SERIES_MAGIC = b"WS"
+SERIES_FORMAT_VERSION = 1
+INT16_MISSING = -32768
+
+_HEADER = struct.Struct("<2sBBI")
+_VARIABLE = struct.Struct("<31sc")
+
+DTYPES = {b"f": np.dtype("<f4"), b"h": np.dtype("<i2")}
+
+# Variáveis da previsão hora a hora e o tipo em que são armazenadas
+HOURLY_VARIABLES = {
+    "temperature": b"f",
+    "feels_like": b"f",
+    "precipitation": b"f",
+    "wind_speed": b"f",
+    "precipitation_probability": b"h",
+    "humidity": b"h",
+    "weather_code": b"h",
+}
+
+
+def _to_array(values, kind):
+    if kind == b"f":
+        return np.array(
+            [np.nan if value is None else value for value in values],
+            dtype=DTYPES[kind],
+        )
+    return np.array(
+        [INT16_MISSING if value is None else round(value) for value in values],
+        dtype=DTYPES[kind],
+    )
+
+
+def pack_series(columns, kinds=HOURLY_VARIABLES):
+    """
+    Empacota {variável: valores} (listas de mesmo tamanho, None para ausentes)
+    no formato descrito acima e devolve os bytes.
+    """
+    # float32 antes de int16: mantém todos os arrays alinhados
+    names = sorted(columns, key=lambda name: -DTYPES[kinds[name]].itemsize)
+    lengths = {len(columns[name]) for name in names}
+    if len(lengths) > 1:
+        raise ValueError("Todas as variáveis da série devem ter o mesmo tamanho.")
+    length = lengths.pop() if lengths else 0
+
+    parts = [_HEADER.pack(SERIES_MAGIC, SERIES_FORMAT_VERSION, len(names), length)]
+    parts.extend(_VARIABLE.pack(name.encode("ascii"), kinds[name]) for name in names)
+    parts.extend(_to_array(columns[name], kinds[name]).tobytes() for name in names)
+    return b"".join(parts)
+
+
+def unpack_series(buffer):
+    """
+    Lê o buffer empacotado (bytes ou memoryview, como o devolvido pelo
+    BinaryField) e retorna {variável: array NumPy} sem copiar os dados.
+    """
+    magic, version, count, length = _HEADER.unpack_from(buffer, 0)
+    if magic != SERIES_MAGIC or version != SERIES_FORMAT_VERSION:
+        raise ValueError("Formato de série desconhecido.")
+
+    arrays = {}
+    offset = _HEADER.size + count * _VARIABLE.size
+    for index in range(count):
+        name, kind = _VARIABLE.unpack_from(
+            buffer, _HEADER.size + index * _VARIABLE.size
+        )
+        dtype = DTYPES[kind]
+        arrays[name.rstrip(b"\0").decode("ascii")] = np.frombuffer(
+            buffer, dtype=dtype, count=length, offset=offset
+        )
+        offset += dtype.itemsize * length
+    return arrays
+
+
+def pack_samples(samples, kinds=HOURLY_VARIABLES, step_seconds=3600):
+    """
+    Monta a série a partir de amostras {forecast_time: datetime, variável: valor}
+    (ex.: WeatherApiClient.get_hourly_forecast, não vazia). Cada amostra vai para a
+    posição do seu horário; intervalos sem amostra ficam como ausentes.
+    Retorna (horário da primeira amostra, nº de amostras, bytes empacotados).
+    """
+    start_time = min(sample["forecast_time"] for sample in samples)
+    positions = [
+        int((sample["forecast_time"] - start_time).total_seconds() // step_seconds)
+        for sample in samples
+    ]
+    length = max(positions) + 1
+    columns = {name: [None] * length for name in kinds}
+    for position, sample in zip(positions, samples):
+        for name in kinds:
+            columns[name][position] = sample.get(name)
+    return start_time, length, pack_series(columns, kinds)
+
+
+def series_fingerprint(start_time, step_seconds, data):
+    """SHA-256 (hex) da série: início, passo e bytes empacotados."""
+    digest = hashlib.sha256()
+    digest.update(f"{start_time.isoformat()}|{step_seconds}|".encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
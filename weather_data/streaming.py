@@ -0,0 +1,133 @@
+# weather_data/streaming.py
+"""
+Leitura incremental (ijson) das previsões hora a hora da WeatherAPI.com e da Open-Meteo.
+
+Respostas horárias de vários dias (e, na Open-Meteo, de várias localizações em uma
+só requisição) são grandes. Em vez de response.json(), o corpo é percorrido como um
+fluxo de eventos JSON e apenas as horas dentro da janela do evento ficam em memória.
+Os horários da janela são comparados no horário local da localização, no mesmo
+formato devolvido pelas APIs.
+Este módulo não depende do Django, para que o script data_ingestion/weather_ingestor.py
+também possa reutilizá-lo.
+"""
+import ijson
+
+WEATHERAPI_HOUR_FORMAT = "%Y-%m-%d %H:%M"
+OPENMETEO_HOUR_FORMAT = "%Y-%m-%dT%H:%M"
+
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+
+def open_stream(response):
+    """Corpo de uma resposta requests (stream=True) como arquivo, já descomprimido."""
+    response.raw.decode_content = True
+    return response.raw
+
+
+def iter_weatherapi_hours(stream, window_start, window_end):
+    """
+    Percorre forecast.forecastday[].hour[] de uma resposta da WeatherAPI.com e devolve
+    os itens 'hour' cujo horário local está entre window_start e window_end
+    (datetime, inclusive). Como as horas vêm em ordem, a leitura para na primeira
+    hora depois da janela.
+    """
+    start = window_start.strftime(WEATHERAPI_HOUR_FORMAT)
+    end = window_end.strftime(WEATHERAPI_HOUR_FORMAT)
+    for hour in ijson.items(
+        stream, "forecast.forecastday.item.hour.item", use_float=True
+    ):
+        hour_time = hour.get("time") or ""
+        if hour_time > end:
+            break
+        if hour_time >= start:
+            yield hour
+
+
+class _OpenMeteoHourlyColumns:
+    """Colunas do bloco 'hourly' de uma localização, restritas às horas da janela."""
+
+    def __init__(self, window):
+        self.meta = {}
+        self.times = []
+        self._start, self._end = (
+            bound.strftime(OPENMETEO_HOUR_FORMAT) for bound in window
+        )
+        # índice na resposta -> posição em self.times (definido ao ler hourly.time)
+        self._positions = None
+        self._columns = {}
+        # Colunas lidas antes de hourly.time, guardadas inteiras até o alinhamento
+        self._unaligned = {}
+        self._index = 0
+
+    def feed(self, prefix, event, value):
+        if "." not in prefix:
+            if event in _SCALAR_EVENTS:
+                self.meta[prefix] = value
+            return
+        if not prefix.startswith("hourly."):
+            return
+        if event == "start_array":
+            self._index = 0
+            if prefix == "hourly.time":
+                self._positions = {}
+            return
+        if event not in _SCALAR_EVENTS or not prefix.endswith(".item"):
+            return
+
+        index = self._index
+        self._index += 1
+        name = prefix[len("hourly.") : -len(".item")]
+        if name == "time":
+            if self._start <= value <= self._end:
+                self._positions[index] = len(self.times)
+                self.times.append(value)
+        elif self._positions is None:
+            self._unaligned.setdefault(name, []).append(value)
+        elif index in self._positions:
+            self._columns.setdefault(name, {})[self._positions[index]] = value
+
+    def rows(self):
+        """Uma linha {variável: valor} por hora da janela, com a hora em 'time'."""
+        positions = self._positions or {}
+        for name, values in self._unaligned.items():
+            self._columns[name] = {
+                position: values[index]
+                for index, position in positions.items()
+                if index < len(values)
+            }
+        return [
+            dict(
+                {name: column.get(position) for name, column in self._columns.items()},
+                time=hour_time,
+            )
+            for position, hour_time in enumerate(self.times)
+        ]
+
+
+def iter_openmeteo_hourly(stream, windows):
+    """
+    Lê uma resposta da Open-Meteo (um objeto, ou uma lista quando várias coordenadas
+    são consultadas juntas) e devolve, para cada localização, (posição, metadados,
+    linhas). `windows[posição]` é o par (início, fim) de datetimes locais da
+    localização; as linhas trazem apenas as horas dessa janela. Os metadados são os
+    campos simples do objeto (latitude, longitude, timezone, ...).
+    """
+    root = ""
+    position = -1
+    location = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "" and event == "start_array":
+            root = "item"
+        elif prefix == root and event == "start_map":
+            position += 1
+            location = (
+                _OpenMeteoHourlyColumns(windows[position])
+                if position < len(windows)
+                else None
+            )
+        elif prefix == root and event == "end_map":
+            if location is not None:
+                yield position, location.meta, location.rows()
+            location = None
+        elif location is not None:
+            location.feed(prefix[len(root) + 1 :] if root else prefix, event, value)
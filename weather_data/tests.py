@@ -0,0 +1,265 @@
+# weather_data/tests.py
+import datetime
+import threading
+from unittest import mock, skipUnless
+
+from django.db import DataError, IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from weather_data import jobs
+from weather_data.models import IngestionJob
+from weather_data.partitions import (
+    PARTITIONED_TABLES,
+    _table_constraints,
+    _table_indexes,
+    create_month_partition,
+    default_partition_name,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+)
+
+BEFORE_PARTITIONING = [("weather_data", "0006_weatherseries")]
+PARTITIONING = [("weather_data", "0007_partition_weather_tables")]
+RECORD_TABLE = "weather_data_weatherrecord"
+LOG_TABLE = "weather_data_weatherloadlog"
+# Meses com dados antes da migração (cada um deve virar uma partição)
+JANUARY = datetime.date(2025, 1, 1)
+FEBRUARY = datetime.date(2025, 2, 1)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "O particionamento só existe no PostgreSQL."
+)
+class PartitionMigrationTests(TransactionTestCase):
+    """
+    Migração 0007 (weather_data/partitions.py): as tabelas são renomeadas, copiadas
+    e removidas nos dois sentidos, então linhas, sequência do id, restrições e
+    índices precisam sobreviver à ida e à volta.
+    """
+
+    def setUp(self):
+        self.apps = self._migrate(BEFORE_PARTITIONING)
+        record_model = self.apps.get_model("weather_data", "WeatherRecord")
+        for index, event_date in enumerate(
+            [JANUARY, JANUARY.replace(day=20), FEBRUARY.replace(day=10)]
+        ):
+            record_model.objects.create(
+                event_id=f"TEST_{index}",
+                event_name="Teste",
+                event_location="Cuiabá",
+                event_date=event_date,
+                api_source="Teste",
+            )
+            self._create_log(
+                f"TEST_{index}",
+                datetime.datetime.combine(
+                    event_date, datetime.time(12), tzinfo=datetime.timezone.utc
+                ),
+            )
+        # Em 0006 as tabelas só têm restrições; índices avulsos (com opclass e
+        # parciais) precisam ser recriados iguais
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX "test_record_event_id_like" ON "{RECORD_TABLE}" '
+                "(event_id varchar_pattern_ops)"
+            )
+            cursor.execute(
+                f'CREATE INDEX "test_log_errors" ON "{LOG_TABLE}" (event_id) '
+                "WHERE log_level = 'ERROR'"
+            )
+        self.schema = {table: self._schema(table) for table in PARTITIONED_TABLES}
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX IF EXISTS "test_record_event_id_like"')
+            cursor.execute('DROP INDEX IF EXISTS "test_log_errors"')
+        executor = MigrationExecutor(connection)
+        self._migrate(executor.loader.graph.leaf_nodes())
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        executor.loader.build_graph()
+        return executor.loader.project_state(targets).apps
+
+    def _fetch(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _count(self, table):
+        return self._fetch(f'SELECT COUNT(*) FROM "{table}"')[0][0]
+
+    def _schema(self, table):
+        """Nomes das restrições e definições dos índices da tabela."""
+        with connection.cursor() as cursor:
+            constraints = _table_constraints(cursor, table)
+            return {
+                # A chave primária muda de (id) para (id, coluna de particionamento)
+                "primary_key": [name for name, kind, _ in constraints if kind == "p"],
+                "unique": [
+                    (name, sql) for name, kind, sql in constraints if kind == "u"
+                ],
+                "indexes": sorted(_table_indexes(cursor, table)),
+            }
+
+    def _create_record(self, event_id, event_date):
+        record_model = self.apps.get_model("weather_data", "WeatherRecord")
+        return record_model.objects.create(
+            event_id=event_id,
+            event_name="Teste",
+            event_location="Cuiabá",
+            event_date=event_date,
+            api_source="Teste",
+        )
+
+    def _create_log(self, event_id, loaded_at):
+        # No estado histórico loaded_at ainda é auto_now_add: o horário vem no UPDATE
+        log_model = self.apps.get_model("weather_data", "WeatherLoadLog")
+        log = log_model.objects.create(
+            event_id=event_id, log_level="SUCCESS", message="ok"
+        )
+        log_model.objects.filter(pk=log.pk).update(loaded_at=loaded_at)
+
+    def assertTablesPreserved(self, partitioned, expected_counts):
+        for table in PARTITIONED_TABLES:
+            with self.subTest(table=table), connection.cursor() as cursor:
+                self.assertEqual(is_partitioned(cursor, table), partitioned)
+                self.assertEqual(self._count(table), expected_counts[table])
+                self.assertEqual(self._schema(table), self.schema[table])
+
+    def assertSequenceContinues(self):
+        """O próximo id gerado continua depois do maior id existente."""
+        max_id = self._fetch(f'SELECT MAX(id) FROM "{RECORD_TABLE}"')[0][0]
+        record = self._create_record(f"TEST_SEQ_{max_id}", FEBRUARY)
+        self.assertEqual(record.id, max_id + 1)
+
+    def assertUniqueConstraintEnforced(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._create_record("TEST_0", JANUARY)
+
+    def test_migrates_forward_and_backward(self):
+        counts = {RECORD_TABLE: 3, LOG_TABLE: 3}
+
+        self._migrate(PARTITIONING)
+        self.assertTablesPreserved(True, counts)
+        with connection.cursor() as cursor:
+            months = [month for month, _ in list_partitions(cursor, RECORD_TABLE)]
+            self.assertIn(JANUARY, months)
+            self.assertIn(FEBRUARY, months)
+            self.assertIn(
+                JANUARY, [month for month, _ in list_partitions(cursor, LOG_TABLE)]
+            )
+        self.assertEqual(self._count(partition_name(RECORD_TABLE, JANUARY)), 2)
+        self.assertEqual(self._count(partition_name(RECORD_TABLE, FEBRUARY)), 1)
+        self.assertEqual(self._count(partition_name(LOG_TABLE, JANUARY)), 2)
+        self.assertEqual(self._count(default_partition_name(RECORD_TABLE)), 0)
+        self.assertSequenceContinues()
+        self.assertUniqueConstraintEnforced()
+        counts[RECORD_TABLE] += 1
+
+        self._migrate(BEFORE_PARTITIONING)
+        self.assertTablesPreserved(False, counts)
+        self.assertSequenceContinues()
+        self.assertUniqueConstraintEnforced()
+
+    def test_create_month_partition_moves_rows_from_default(self):
+        self._migrate(PARTITIONING)
+        # Mês distante: ainda sem partição, a linha cai na default
+        month = datetime.date(2031, 6, 1)
+        self._create_record("TEST_FUTURE", month.replace(day=15))
+        self._create_log(
+            "TEST_FUTURE",
+            datetime.datetime(2031, 6, 30, 23, tzinfo=datetime.timezone.utc),
+        )
+
+        for table in PARTITIONED_TABLES:
+            with self.subTest(table=table), connection.cursor() as cursor:
+                total = self._count(table)
+                self.assertEqual(self._count(default_partition_name(table)), 1)
+
+                self.assertTrue(create_month_partition(cursor, table, month))
+                self.assertFalse(create_month_partition(cursor, table, month))
+
+                self.assertEqual(self._count(default_partition_name(table)), 0)
+                self.assertEqual(self._count(partition_name(table, month)), 1)
+                self.assertEqual(self._count(table), total)
+
+
+class _StubForecastClient:
+    """Cliente com a previsão de qualquer localização, sem acessar a API."""
+
+    def is_in_forecast_window(self, forecast_date):
+        return True
+
+    def get_location_forecast(self, location):
+        return {datetime.date.today(): {"temperature": 21.0}}
+
+
+class WorkerJobErrorTests(TestCase):
+    def setUp(self):
+        today = datetime.date.today()
+        jobs.enqueue_events(
+            [
+                {
+                    "event_id": f"TEST_{city.upper()}",
+                    "event_name": "Teste",
+                    "city": city,
+                    "event_date": today,
+                }
+                for city in ("Cuiaba", "Recife", "Natal")
+            ]
+        )
+
+    def test_persist_error_does_not_stop_the_worker(self):
+        persisted = []
+
+        def persist_forecasts(results):
+            event, _ = results[0]
+            if event["city"] == "Recife":
+                raise DataError("numeric field overflow")
+            persisted.append(event["city"])
+            return []
+
+        with mock.patch.object(jobs, "persist_forecasts", persist_forecasts):
+            done, failed = jobs.run_worker(
+                threading.Event(),
+                worker_id="test-worker",
+                batch_size=2,
+                burst=True,
+                client=_StubForecastClient(),
+            )
+
+        self.assertEqual((done, failed), (2, 1))
+        self.assertCountEqual(persisted, ["Cuiaba", "Natal"])
+        # O job com erro volta para a fila com backoff, os demais saem dela
+        job = IngestionJob.objects.get()
+        self.assertEqual(job.event_location, "Recife")
+        self.assertEqual(job.status, jobs.PENDING)
+        self.assertIsNone(job.locked_by)
+        self.assertIn("numeric field overflow", job.last_error)
+        self.assertGreater(job.run_after, job.updated_at)
+
+    def test_persist_error_after_max_attempts_fails_the_job(self):
+        IngestionJob.objects.update(max_attempts=1)
+
+        def persist_forecasts(results):
+            # Só a gravação da previsão falha; os logs de ERROR do job são gravados
+            if results[0][1] is not None:
+                raise IntegrityError("duplicate key")
+            return []
+
+        with mock.patch.object(jobs, "persist_forecasts", persist_forecasts):
+            done, failed = jobs.run_worker(
+                threading.Event(),
+                worker_id="test-worker",
+                burst=True,
+                client=_StubForecastClient(),
+            )
+
+        self.assertEqual((done, failed), (0, 3))
+        self.assertEqual(
+            set(IngestionJob.objects.values_list("status", flat=True)), {jobs.FAILED}
+        )
@@ -0,0 +1,154 @@
+# weather_data/versioning.py
+"""
+Atribuição de load_version em lote para o WeatherRecord (e o WeatherSeries, que usa
+a mesma chave).
+
+As versões de um lote inteiro saem de uma única consulta agregada (maior versão
+por chave event_id/event_location/event_date), sem leitura por linha. Para que dois
+ingestores gravando a mesma chave não colidam no unique_together, no PostgreSQL as
+chaves do lote são travadas com advisory locks de transação antes dessa consulta:
+o segundo escritor espera o primeiro fazer commit e então enxerga a versão gravada.
+
+Cada previsão normalizada recebe uma impressão digital (content_hash); quando ela é
+igual à da última versão gravada, nenhuma versão nova é criada.
+"""
+import hashlib
+import json
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import Max, OuterRef, Subquery
+
+from weather_data.models import WeatherRecord
+
+# Primeiro argumento de pg_advisory_xact_lock(int, int), separando estas travas
+# de outras que a aplicação venha a usar no mesmo banco.
+ADVISORY_LOCK_NAMESPACE = 7263
+
+# As travas são pegas em ordem crescente de hash, sempre na mesma ordem entre
+# transações, o que evita deadlock entre lotes que compartilham chaves.
+_LOCK_KEYS_SQL = """
+    SELECT pg_advisory_xact_lock(%s, h)
+    FROM (SELECT DISTINCT hashtext(k) AS h FROM unnest(%s::text[]) AS k) AS keys
+    ORDER BY h
+"""
+
+# Campos da previsão que entram na impressão digital, com as casas decimais
+# usadas no WeatherRecord (None para campos de texto).
+FINGERPRINT_FIELDS = {
+    "temperature": 2,
+    "feels_like": 2,
+    "min_temperature": 2,
+    "max_temperature": 2,
+    "humidity": 2,
+    "pressure": 2,
+    "wind_speed": 2,
+    "weather_main": None,
+    "weather_description": None,
+}
+
+LatestVersion = namedtuple("LatestVersion", ["load_version", "content_hash"])
+
+
+def version_key(event_id, event_location, event_date):
+    """Chave de versionamento de um registro: (event_id, event_location, event_date)."""
+    return (event_id, event_location, event_date)
+
+
+def _fingerprint_value(value, decimal_places):
+    if value is None or decimal_places is None:
+        return value
+    try:
+        # Arredonda como o banco grava, para que 25.1 (API) e Decimal("25.10")
+        # (lido do banco) gerem o mesmo hash
+        return str(Decimal(str(value)).quantize(Decimal(1).scaleb(-decimal_places)))
+    except (InvalidOperation, ValueError):
+        return str(value)
+
+
+def forecast_fingerprint(weather_data):
+    """SHA-256 (hex) dos campos gravados da previsão normalizada."""
+    payload = {
+        field: _fingerprint_value(weather_data.get(field), decimal_places)
+        for field, decimal_places in FINGERPRINT_FIELDS.items()
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def lock_version_keys(keys, model=WeatherRecord):
+    """
+    Trava as chaves do modelo até o fim da transação atual (deve ser chamada dentro
+    de transaction.atomic). Fora do PostgreSQL não faz nada.
+    """
+    if not keys or connection.vendor != "postgresql":
+        return
+    # As chaves de modelos diferentes não disputam a mesma trava
+    prefix = "" if model is WeatherRecord else f"{model._meta.label_lower}|"
+    lock_names = sorted(
+        {
+            f"{prefix}{event_id}|{event_location}|{event_date.isoformat()}"
+            for event_id, event_location, event_date in keys
+        }
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_LOCK_KEYS_SQL, [ADVISORY_LOCK_NAMESPACE, lock_names])
+
+
+def latest_versions(keys, model=WeatherRecord):
+    """
+    Última versão gravada de cada chave (load_version e content_hash), em uma
+    única consulta.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    latest_hash = (
+        model.objects.filter(
+            event_id=OuterRef("event_id"),
+            event_location=OuterRef("event_location"),
+            event_date=OuterRef("event_date"),
+        )
+        .order_by("-load_version")
+        .values("content_hash")[:1]
+    )
+    rows = (
+        model.objects.filter(
+            event_id__in={event_id for event_id, _, _ in keys},
+            event_date__in={event_date for _, _, event_date in keys},
+        )
+        .order_by()
+        .values("event_id", "event_location", "event_date")
+        .annotate(max_version=Max("load_version"), latest_hash=Subquery(latest_hash))
+    )
+    versions = {}
+    for row in rows:
+        key = version_key(row["event_id"], row["event_location"], row["event_date"])
+        if key in keys:
+            versions[key] = LatestVersion(row["max_version"], row["latest_hash"])
+    return versions
+
+
+def assign_load_versions(keys, content_hashes=None, model=WeatherRecord):
+    """
+    Trava as chaves e devolve a próxima load_version de cada uma, na mesma ordem
+    de `keys`. Chaves repetidas no lote recebem versões consecutivas.
+    Com `content_hashes` (alinhado com `keys`), a posição recebe None quando o hash
+    é igual ao da última versão da chave (previsão inalterada).
+    Deve ser chamada dentro da transação que grava os registros (do `model`).
+    """
+    keys = list(keys)
+    content_hashes = list(content_hashes) if content_hashes is not None else None
+    lock_version_keys(keys, model)
+    current = latest_versions(keys, model)
+    versions = []
+    for index, key in enumerate(keys):
+        latest = current.get(key, LatestVersion(0, None))
+        content_hash = content_hashes[index] if content_hashes is not None else None
+        if content_hash is not None and content_hash == latest.content_hash:
+            versions.append(None)
+            continue
+        current[key] = LatestVersion(latest.load_version + 1, content_hash)
+        versions.append(latest.load_version + 1)
+    return versions
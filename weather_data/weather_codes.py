@@ -0,0 +1,44 @@
+# weather_data/weather_codes.py
+"""
+Descrições dos códigos de clima WMO usados pela Open-Meteo.
+Compartilhado pelo script data_ingestion/weather_ingestor.py e pelo provedor
+Open-Meteo de weather_data/providers.py. Este módulo não depende do Django.
+"""
+
+# Exemplo simplificado. Uma implementação completa usaria um dicionário maior.
+# Você pode expandir isso para todos os códigos da documentação.
+WEATHER_CODE_DESCRIPTIONS = {
+    0: "Céu limpo",
+    1: "Principalmente limpo",
+    2: "Parcialmente nublado",
+    3: "Nublado",
+    45: "Nevoeiro",
+    48: "Nevoeiro com deposição de orvalho",
+    51: "Chuvisco leve",
+    53: "Chuvisco moderado",
+    55: "Chuvisco denso",
+    56: "Chuvisco congelante leve",
+    57: "Chuvisco congelante denso",
+    61: "Chuva leve",
+    63: "Chuva moderada",
+    65: "Chuva forte",
+    66: "Chuva congelante leve",
+    67: "Chuva congelante forte",
+    71: "Queda de neve leve",
+    73: "Queda de neve moderada",
+    75: "Queda de neve forte",
+    77: "Grãos de neve",
+    80: "Pancadas de chuva leves",
+    81: "Pancadas de chuva moderadas",
+    82: "Pancadas de chuva violentas",
+    85: "Pancadas de neve leves",
+    86: "Pancadas de neve fortes",
+    95: "Tempestade com chuva leve e moderada",
+    96: "Tempestade com granizo leve",
+    99: "Tempestade com granizo forte",
+}
+
+
+def describe_weather_code(code):
+    """Descrição legível de um código de clima (Fonte: https://www.open-meteo.com/en/docs)."""
+    return WEATHER_CODE_DESCRIPTIONS.get(code, "Desconhecido")